@@ -2,15 +2,16 @@
 """
 # Local imports
 from glymur import version
-from .jp2k import Jp2k
-from .config import (get_option, set_option, reset_option,
+from .jp2k import Jp2k, reindex
+from ._dask import to_dask
+from .config import (get_option, set_option, reset_option, option_context,
                      get_printoptions, set_printoptions,
                      get_parseoptions, set_parseoptions)
-from . import data
+from . import cache, data, source
 
 __version__ = version.version
 
 
-__all__ = [__version__, Jp2k, get_printoptions, set_printoptions,
-           get_parseoptions, set_parseoptions, get_option, set_option,
-           reset_option, data]
+__all__ = [__version__, Jp2k, reindex, to_dask, get_printoptions,
+           set_printoptions, get_parseoptions, set_parseoptions, get_option,
+           set_option, reset_option, option_context, cache, data, source]
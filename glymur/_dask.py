@@ -0,0 +1,140 @@
+"""
+Dask arrays backed by JPEG 2000 files.
+"""
+# Standard library imports ...
+import threading
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+from .jp2k import Jp2k
+
+# Each worker thread decodes through its own Jp2k object for each file, so the
+# file is parsed just once per thread rather than once per chunk.
+_sessions = threading.local()
+
+
+def to_dask(path, chunks='tiles', rlevel=0):
+    """Make a dask array of a JPEG 2000 image.
+
+    The chunks of the array line up with the tiles of the image, so each
+    chunk is decoded from its own tiles.  Nothing is decoded until the array
+    is computed.
+
+    Parameters
+    ----------
+    path : str
+        Path or URL of the file.
+    chunks : str, int, or tuple, optional
+        Either 'tiles' for one tile per chunk, or the number of tiles per
+        chunk along each axis, either as a single int or as a (rows, cols)
+        tuple.
+    rlevel : int, optional
+        Factor by which to reduce the resolution, as in Jp2k.read.  Use -1
+        for the lowest resolution.
+
+    Returns
+    -------
+    dask.array.Array
+        The image data, with the components along the third axis if there
+        is more than one.
+
+    Raises
+    ------
+    IOError
+        If the image components are subsampled, or if the chunks or rlevel
+        are invalid.
+
+    Examples
+    --------
+    >>> import glymur
+    >>> arr = glymur.to_dask(glymur.data.nemo(), rlevel=1)
+    >>> arr.shape, arr.chunksize
+    ((728, 1296, 3), (728, 1296, 3))
+    """
+    import dask.array as da
+    from dask.base import tokenize
+
+    jp2 = Jp2k(path)
+    siz = jp2.codestream.segment[1]
+    if any(x != 1 for x in siz.xrsiz + siz.yrsiz):
+        msg = "Images with subsampled components cannot be made into arrays."
+        raise IOError(msg)
+
+    num_levels = jp2.codestream.segment[2].num_res
+    if rlevel == -1:
+        rlevel = num_levels
+    elif not 0 <= rlevel <= num_levels:
+        msg = "rlevel must be in the range [-1, {0}] for this image."
+        raise IOError(msg.format(num_levels))
+
+    if chunks == 'tiles':
+        chunks = (1, 1)
+    elif isinstance(chunks, int):
+        chunks = (chunks, chunks)
+    if ((len(chunks) != 2 or
+         not all(isinstance(x, int) and x > 0 for x in chunks))):
+        msg = ("chunks must be 'tiles' or a positive number of tiles per "
+               "chunk, not {0}.")
+        raise IOError(msg.format(chunks))
+
+    rows = _boundaries(siz.yosiz, siz.ysiz, siz.ytosiz, siz.ytsiz * chunks[0],
+                       rlevel)
+    cols = _boundaries(siz.xosiz, siz.xsiz, siz.xtosiz, siz.xtsiz * chunks[1],
+                       rlevel)
+
+    def sizes(boundaries):
+        return tuple(_shrink(b, rlevel) - _shrink(a, rlevel)
+                     for a, b in zip(boundaries[:-1], boundaries[1:]))
+
+    array_chunks = (sizes(rows), sizes(cols))
+    if len(jp2.shape) == 3:
+        array_chunks += ((jp2.shape[2],),)
+
+    dtype = jp2.dtype
+    identity = jp2._source.identity
+    name = 'glymur-' + tokenize(path, identity, rlevel, rows, cols)
+    return da.map_blocks(_read_chunk, name=name, chunks=array_chunks,
+                         dtype=dtype,
+                         meta=np.empty((0,) * len(array_chunks), dtype=dtype),
+                         path=path, identity=identity, rows=rows, cols=cols,
+                         rlevel=rlevel)
+
+
+def _shrink(x, rlevel):
+    """Reduce a reference grid coordinate to the given resolution."""
+    return -(-x // 2 ** rlevel)
+
+
+def _boundaries(start, stop, tile_offset, step, rlevel):
+    """Find the edges of the chunks along one axis of the reference grid.
+
+    Edges that would coincide at the reduced resolution are dropped, so that
+    no chunk is empty.
+    """
+    edges = [start]
+    edge = tile_offset + step
+    while edge < stop:
+        if edge > start and _shrink(edge, rlevel) > _shrink(edges[-1], rlevel):
+            edges.append(edge)
+        edge += step
+    if _shrink(stop, rlevel) == _shrink(edges[-1], rlevel) and len(edges) > 1:
+        edges.pop()
+    edges.append(stop)
+    return edges
+
+
+def _read_chunk(path=None, identity=None, rows=None, cols=None, rlevel=0,
+                block_id=None):
+    """Decode one chunk of the array made by to_dask."""
+    sessions = getattr(_sessions, 'jp2k', None)
+    if sessions is None:
+        sessions = _sessions.jp2k = {}
+    jp2 = sessions.get(path)
+    if jp2 is None or jp2._source.identity != identity:
+        jp2 = sessions[path] = Jp2k(path)
+
+    area = (rows[block_id[0]], cols[block_id[1]],
+            rows[block_id[0] + 1], cols[block_id[1] + 1])
+    return jp2._read(rlevel=rlevel, area=area)
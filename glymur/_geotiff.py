@@ -0,0 +1,231 @@
+# -*- coding:  utf-8 -*-
+"""
+Georeferencing information from GeoTIFF UUID boxes, without GDAL.
+"""
+# Standard library imports ...
+from collections import OrderedDict
+
+# Third party library imports ...
+import numpy as np
+
+# Names of the GeoTIFF tags, as mapped by glymur._tiff.
+_MODEL_PIXEL_SCALE = 'ModelPixelScale'
+_MODEL_TIEPOINT = 'ModelTiePoint'
+_MODEL_TRANSFORMATION = 'ModelTransformation'
+_GEO_KEY_DIRECTORY = 'GeoKeyDirectory'
+_GEO_DOUBLE_PARAMS = 'GeoDoubleParams'
+_GEO_ASCII_PARAMS = 'GeoAsciiParams'
+
+# Value of the GTRasterTypeGeoKey signifying that a pixel represents a point
+# rather than an area.
+_RASTER_PIXEL_IS_POINT = 2
+
+_GEOKEY_NAMES = {1024: 'GTModelTypeGeoKey',
+                 1025: 'GTRasterTypeGeoKey',
+                 1026: 'GTCitationGeoKey',
+                 2048: 'GeographicTypeGeoKey',
+                 2049: 'GeogCitationGeoKey',
+                 2050: 'GeogGeodeticDatumGeoKey',
+                 2051: 'GeogPrimeMeridianGeoKey',
+                 2052: 'GeogLinearUnitsGeoKey',
+                 2053: 'GeogLinearUnitSizeGeoKey',
+                 2054: 'GeogAngularUnitsGeoKey',
+                 2055: 'GeogAngularUnitSizeGeoKey',
+                 2056: 'GeogEllipsoidGeoKey',
+                 2057: 'GeogSemiMajorAxisGeoKey',
+                 2058: 'GeogSemiMinorAxisGeoKey',
+                 2059: 'GeogInvFlatteningGeoKey',
+                 2060: 'GeogAzimuthUnitsGeoKey',
+                 2061: 'GeogPrimeMeridianLongGeoKey',
+                 3072: 'ProjectedCSTypeGeoKey',
+                 3073: 'PCSCitationGeoKey',
+                 3074: 'ProjectionGeoKey',
+                 3075: 'ProjCoordTransGeoKey',
+                 3076: 'ProjLinearUnitsGeoKey',
+                 3077: 'ProjLinearUnitSizeGeoKey',
+                 3078: 'ProjStdParallel1GeoKey',
+                 3079: 'ProjStdParallel2GeoKey',
+                 3080: 'ProjNatOriginLongGeoKey',
+                 3081: 'ProjNatOriginLatGeoKey',
+                 3082: 'ProjFalseEastingGeoKey',
+                 3083: 'ProjFalseNorthingGeoKey',
+                 3084: 'ProjFalseOriginLongGeoKey',
+                 3085: 'ProjFalseOriginLatGeoKey',
+                 3086: 'ProjFalseOriginEastingGeoKey',
+                 3087: 'ProjFalseOriginNorthingGeoKey',
+                 3088: 'ProjCenterLongGeoKey',
+                 3089: 'ProjCenterLatGeoKey',
+                 3090: 'ProjCenterEastingGeoKey',
+                 3091: 'ProjCenterNorthingGeoKey',
+                 3092: 'ProjScaleAtNatOriginGeoKey',
+                 3093: 'ProjScaleAtCenterGeoKey',
+                 3094: 'ProjAzimuthAngleGeoKey',
+                 3095: 'ProjStraightVertPoleLongGeoKey',
+                 4096: 'VerticalCSTypeGeoKey',
+                 4097: 'VerticalCitationGeoKey',
+                 4098: 'VerticalDatumGeoKey',
+                 4099: 'VerticalUnitsGeoKey'}
+
+
+class GeoTiffInfo(object):
+    """
+    Georeferencing information decoded from a degenerate GeoTIFF.
+
+    Attributes
+    ----------
+    geokeys : OrderedDict
+        Maps GeoKey names (or numeric IDs if unrecognized) to values.
+    geotransform : tuple or None
+        Affine transformation from pixel/line to model coordinates, in the
+        same order as used by GDAL, i.e. (origin_x, pixel_width, row_rotation,
+        origin_y, column_rotation, pixel_height).  None if the tie points do
+        not define an affine transformation.
+    pixel_scale : ndarray or None
+        Model pixel scale (x, y, z).
+    raster_size : tuple
+        Width and height of the degenerate image.
+    tiepoints : ndarray or None
+        Nx6 array of tie points, each of the form (i, j, k, x, y, z).
+    """
+    def __init__(self, tags):
+        """
+        Parameters
+        ----------
+        tags : mapping
+            TIFF tags as produced by glymur._tiff.tiff_header.
+        """
+        self.raster_size = (tags.get('ImageWidth', 0),
+                            tags.get('ImageLength', 0))
+
+        self.pixel_scale = self._as_array(tags.get(_MODEL_PIXEL_SCALE))
+
+        self.tiepoints = self._as_array(tags.get(_MODEL_TIEPOINT))
+        if self.tiepoints is not None:
+            self.tiepoints = self.tiepoints.reshape(-1, 6)
+
+        self.geokeys = self._parse_geokeys(tags)
+
+        transformation = self._as_array(tags.get(_MODEL_TRANSFORMATION))
+        self.geotransform = self._compute_geotransform(transformation)
+
+    def __str__(self):
+        lst = ['Geographic Keys =']
+        for key, value in self.geokeys.items():
+            if isinstance(value, np.ndarray):
+                value = tuple(value.tolist())
+            lst.append('    {0}:  {1}'.format(key, value))
+
+        if self.geotransform is None:
+            lst.append('No affine transformation.')
+            return '\n'.join(lst)
+
+        fmt = ('Origin = ({origin_x:.15f},{origin_y:.15f})\n'
+               'Pixel Size = ({pixel_x:.15f},{pixel_y:.15f})')
+        lst.append(fmt.format(origin_x=self.geotransform[0],
+                              origin_y=self.geotransform[3],
+                              pixel_x=self.geotransform[1],
+                              pixel_y=self.geotransform[5]))
+
+        width, height = self.raster_size
+        corners = [('Upper Left', 0, 0),
+                   ('Lower Left', 0, height),
+                   ('Upper Right', width, 0),
+                   ('Lower Right', width, height),
+                   ('Center', width / 2.0, height / 2.0)]
+        lst.append('Corner Coordinates:')
+        for corner_name, col, row in corners:
+            x, y = self.pixel_to_model(col, row)
+            line = '{0:<11s} ({1:12.3f},{2:12.3f})'
+            lst.append(line.format(corner_name, x, y))
+
+        return '\n'.join(lst)
+
+    def pixel_to_model(self, col, row):
+        """Transform pixel/line coordinates into model coordinates.
+
+        Parameters
+        ----------
+        col, row : float or ndarray
+            Pixel (column) and line (row) coordinates.
+
+        Returns
+        -------
+        tuple
+            Model x and y coordinates.
+        """
+        if self.geotransform is None:
+            msg = "No affine transformation is available."
+            raise RuntimeError(msg)
+        gt = self.geotransform
+        x = gt[0] + gt[1] * col + gt[2] * row
+        y = gt[3] + gt[4] * col + gt[5] * row
+        return x, y
+
+    @staticmethod
+    def _as_array(value):
+        """Multi-valued tags are arrays, but one-element tags are scalars."""
+        if value is None:
+            return None
+        return np.atleast_1d(np.asarray(value, dtype=np.float64))
+
+    def _parse_geokeys(self, tags):
+        """Resolve each entry of the GeoKey directory into its value."""
+        geokeys = OrderedDict()
+
+        directory = tags.get(_GEO_KEY_DIRECTORY)
+        if directory is None:
+            return geokeys
+        directory = np.atleast_1d(directory)
+        if directory.size < 4:
+            # Not even a header.
+            return geokeys
+
+        double_params = tags.get(_GEO_DOUBLE_PARAMS)
+        if double_params is not None:
+            double_params = np.atleast_1d(double_params)
+        ascii_params = tags.get(_GEO_ASCII_PARAMS)
+
+        # The header is (version, revision, minor revision, number of keys),
+        # followed by each key in the same four-short layout.
+        num_keys = min(int(directory[3]), (directory.size - 4) // 4)
+        entries = directory[4:4 + 4 * num_keys].reshape(-1, 4)
+        for key_id, location, count, value_offset in entries.tolist():
+            if location == 0:
+                value = value_offset
+            elif location == 34736 and double_params is not None:
+                value = double_params[value_offset:value_offset + count]
+                if count == 1:
+                    value = value[0].item()
+            elif location == 34737 and ascii_params is not None:
+                value = ascii_params[value_offset:value_offset + count]
+                value = value.rstrip('|')
+            elif location == 34735:
+                value = directory[value_offset:value_offset + count]
+            else:
+                # Refers to a tag that we do not have.
+                value = None
+            geokeys[_GEOKEY_NAMES.get(key_id, key_id)] = value
+
+        return geokeys
+
+    def _compute_geotransform(self, transformation):
+        """Construct the affine transformation, if possible."""
+        if transformation is not None and transformation.size >= 16:
+            t = transformation
+            gt = [t[3], t[0], t[1], t[7], t[4], t[5]]
+        elif ((self.tiepoints is not None and self.pixel_scale is not None and
+               self.pixel_scale.size >= 2)):
+            i, j, _, x, y, _ = self.tiepoints[0]
+            scale_x, scale_y = self.pixel_scale[0], self.pixel_scale[1]
+            gt = [x - i * scale_x, scale_x, 0.0, y + j * scale_y, 0.0,
+                  -scale_y]
+        else:
+            return None
+
+        if self.geokeys.get('GTRasterTypeGeoKey') == _RASTER_PIXEL_IS_POINT:
+            # The tie point refers to the center of the pixel rather than
+            # its upper left corner.
+            gt[0] -= (gt[1] + gt[2]) * 0.5
+            gt[3] -= (gt[4] + gt[5]) * 0.5
+
+        return tuple(float(item) for item in gt)
@@ -0,0 +1,96 @@
+"""
+Deferred imports, keeping "import glymur" fast.
+"""
+# Standard library imports ...
+import importlib
+import sys
+
+
+def module_exists(name):
+    """Determine if a top-level module can be imported without importing it.
+    """
+    if name in sys.modules:
+        return True
+    try:
+        from importlib.util import find_spec
+    except ImportError:
+        # v2.7
+        import imp
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return False
+        return True
+    return find_spec(name) is not None
+
+
+def lazy_import(name):
+    """Import a module, deferring its execution until first attribute access.
+
+    On Python versions lacking importlib.util.LazyLoader, the module is
+    imported immediately.
+
+    Parameters
+    ----------
+    name : str
+        Absolute name of the module.
+
+    Returns
+    -------
+    module
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        from importlib.util import find_spec, module_from_spec, LazyLoader
+    except ImportError:
+        # v2.7
+        return importlib.import_module(name)
+
+    spec = find_spec(name)
+    if spec is None:
+        raise ImportError('No module named {0}'.format(name))
+    spec.loader = LazyLoader(spec.loader)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def deferred_import(*names):
+    """Stand in for a module that is imported upon first attribute access.
+
+    Unlike lazy_import, nothing is looked up or placed in sys.modules until
+    then, not even the parent packages of a submodule.
+
+    Parameters
+    ----------
+    names : str
+        Absolute names of the module and of any alternatives, in order of
+        preference.  The first one that can be imported is used.
+
+    Returns
+    -------
+    object
+        Proxy for the module.
+    """
+    return _DeferredModule(names)
+
+
+class _DeferredModule(object):
+    """Proxy importing a module on first attribute access."""
+    def __init__(self, names):
+        self._names = names
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            for name in self._names[:-1]:
+                try:
+                    self._module = importlib.import_module(name)
+                    break
+                except ImportError:
+                    pass
+            else:
+                self._module = importlib.import_module(self._names[-1])
+        return getattr(self._module, attr)
@@ -0,0 +1,1011 @@
+# -*- coding:  utf-8 -*-
+"""
+Layout of the packets within a codestream.
+
+The order in which packets appear in a tile follows from the coding
+parameters of the main header and the progression order, see Annex B of
+ISO/IEC 15444-1.  Together with the packet lengths signalled in PLT or PLM
+segments, this locates each packet in the file.
+"""
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+from .core import LRCP, RLCP, RPCL, PCRL, CPRL
+
+# Structured type identifying a packet within a tile.
+PACKET_DTYPE = np.dtype([('layer', np.int32),
+                         ('resolution', np.int32),
+                         ('component', np.int32),
+                         ('precinct', np.int32)])
+
+# Precincts within this many samples of an area (at the precinct's own
+# resolution) are taken to contribute to it, which covers the support of both
+# of the wavelet filters.
+FILTER_MARGIN = 8
+
+
+def _ceil_div(numerator, denominator):
+    """Integer division, rounding up."""
+    return -(-numerator // denominator)
+
+
+class CodingParameters(object):
+    """Coding parameters of the main header that govern the packets.
+
+    Attributes
+    ----------
+    siz : SIZsegment
+        The image and tile size segment.
+    num_layers : int
+        Number of quality layers.
+    progression_order : int
+        Progression order of every tile.
+    mct : int
+        Multiple component transform usage.
+    num_levels : list
+        Number of decomposition levels of each component.
+    precinct_exponents : list
+        For each component, a list of (PPx, PPy) precinct size exponents, one
+        pair per resolution.
+    code_block_exponents : list
+        For each component, the (xcb, ycb) code-block size exponents.
+    code_block_styles : list
+        For each component, the style of the code-block coding passes.
+    sop, eph : bool
+        Whether packets may start with SOP marker segments, and whether
+        packet headers end with EPH markers.
+    num_tiles : tuple
+        Number of tiles across and down the image.
+    """
+    def __init__(self, codestream):
+        """
+        Parameters
+        ----------
+        codestream : Codestream
+            At least the main header.
+        """
+        self.siz = codestream.segment[1]
+
+        main_header = []
+        for segment in codestream.segment:
+            if segment.marker_id == 'SOT':
+                break
+            main_header.append(segment)
+
+        cod = [seg for seg in main_header if seg.marker_id == 'COD'][0]
+        self.num_layers = cod.layers
+        self.progression_order = cod.prog_order
+        self.mct = cod.mct
+        self.sop = (cod.scod & 2) > 0
+        self.eph = (cod.scod & 4) > 0
+
+        num_comps = self.siz.Csiz
+        self.num_levels = [cod.num_res] * num_comps
+        exponents = self._exponents(cod.scod, cod.num_res, cod.precinct_size)
+        self.precinct_exponents = [exponents] * num_comps
+        height, width = cod.code_block_size
+        self.code_block_exponents = [(int(np.log2(width)),
+                                      int(np.log2(height)))] * num_comps
+        self.code_block_styles = [cod.cstyle] * num_comps
+        for coc in [seg for seg in main_header if seg.marker_id == 'COC']:
+            self.num_levels[coc.ccoc] = coc.spcoc[0]
+            self.precinct_exponents[coc.ccoc] = self._exponents(
+                coc.scoc, coc.spcoc[0], coc.precinct_size)
+            self.code_block_exponents[coc.ccoc] = (int(coc.spcoc[1]) + 2,
+                                                   int(coc.spcoc[2]) + 2)
+            self.code_block_styles[coc.ccoc] = int(coc.spcoc[3])
+
+        self.num_tiles = (
+            _ceil_div(self.siz.xsiz - self.siz.xtosiz, self.siz.xtsiz),
+            _ceil_div(self.siz.ysiz - self.siz.ytosiz, self.siz.ytsiz))
+
+    @staticmethod
+    def _exponents(style, num_levels, precinct_size):
+        """Precinct size exponents from the coding style parameters."""
+        if not style & 1:
+            return [(15, 15)] * (num_levels + 1)
+        return [(int(np.log2(width)), int(np.log2(height)))
+                for width, height in precinct_size]
+
+    def restates(self, segment):
+        """Tell whether a tile-part COD or COC segment repeats the defaults.
+
+        Some encoders repeat the coding style in every tile-part header.
+        Only then do the tile's packets follow the main header.
+
+        Parameters
+        ----------
+        segment : CODsegment or COCsegment
+            Marker segment of a tile-part header.
+
+        Returns
+        -------
+        bool
+            True if the segment changes nothing about the packets.
+        """
+        if segment.marker_id == 'COD':
+            if (segment.layers != self.num_layers or
+                    segment.prog_order != self.progression_order or
+                    ((segment.scod & 2) > 0) != self.sop or
+                    ((segment.scod & 4) > 0) != self.eph):
+                return False
+            num_levels = segment.num_res
+            exponents = self._exponents(segment.scod, num_levels,
+                                        segment.precinct_size)
+            height, width = segment.code_block_size
+            code_blocks = (int(np.log2(width)), int(np.log2(height)))
+            style = segment.cstyle
+            components = range(self.siz.Csiz)
+        else:
+            num_levels = segment.spcoc[0]
+            exponents = self._exponents(segment.scoc, num_levels,
+                                        segment.precinct_size)
+            code_blocks = (int(segment.spcoc[1]) + 2,
+                           int(segment.spcoc[2]) + 2)
+            style = int(segment.spcoc[3])
+            components = [segment.ccoc]
+        return all(num_levels == self.num_levels[c] and
+                   exponents == self.precinct_exponents[c] and
+                   code_blocks == self.code_block_exponents[c] and
+                   style == self.code_block_styles[c]
+                   for c in components)
+
+    def changes_layout(self, tile_part):
+        """Tell whether a tile-part header alters the packets of its tile.
+
+        Parameters
+        ----------
+        tile_part : TilePart
+            A tile-part of the codestream.
+
+        Returns
+        -------
+        bool
+            True if the header has POC or PPT segments, or coding styles
+            other than those of the main header.
+        """
+        for segment in tile_part.segments:
+            if segment.marker_id in ('POD', 'PPT'):
+                return True
+            if (segment.marker_id in ('COD', 'COC') and
+                    not self.restates(segment)):
+                return True
+        return False
+
+    def tile_extent(self, tile):
+        """Extent of a tile on the reference grid.
+
+        Returns
+        -------
+        tuple
+            (x0, y0, x1, y1) of the tile.
+        """
+        siz = self.siz
+        p, q = tile % self.num_tiles[0], tile // self.num_tiles[0]
+        x0 = max(siz.xtosiz + p * siz.xtsiz, siz.xosiz)
+        y0 = max(siz.ytosiz + q * siz.ytsiz, siz.yosiz)
+        x1 = min(siz.xtosiz + (p + 1) * siz.xtsiz, siz.xsiz)
+        y1 = min(siz.ytosiz + (q + 1) * siz.ytsiz, siz.ysiz)
+        return x0, y0, x1, y1
+
+    def resolutions(self, tile):
+        """Describe the precinct partition of each tile-component resolution.
+
+        Returns
+        -------
+        list
+            Tuples (component, resolution, levelno, trx0, try0, trx1, try1,
+            ppx, ppy, pw, ph).  The resolution extent is given on the
+            resolution's own grid, and pw, ph are the numbers of precincts
+            across and down.
+        """
+        tx0, ty0, tx1, ty1 = self.tile_extent(tile)
+        lst = []
+        for c in range(self.siz.Csiz):
+            dx, dy = self.siz.xrsiz[c], self.siz.yrsiz[c]
+            tcx0, tcy0 = _ceil_div(tx0, dx), _ceil_div(ty0, dy)
+            tcx1, tcy1 = _ceil_div(tx1, dx), _ceil_div(ty1, dy)
+            num_levels = self.num_levels[c]
+            for r in range(num_levels + 1):
+                levelno = num_levels - r
+                scale = 2 ** levelno
+                trx0, try0 = _ceil_div(tcx0, scale), _ceil_div(tcy0, scale)
+                trx1, try1 = _ceil_div(tcx1, scale), _ceil_div(tcy1, scale)
+                ppx, ppy = self.precinct_exponents[c][r]
+                if trx1 > trx0 and try1 > try0:
+                    pw = _ceil_div(trx1, 2 ** ppx) - (trx0 >> ppx)
+                    ph = _ceil_div(try1, 2 ** ppy) - (try0 >> ppy)
+                else:
+                    pw = ph = 0
+                lst.append((c, r, levelno, trx0, try0, trx1, try1,
+                            ppx, ppy, pw, ph))
+        return lst
+
+    def packets(self, tile):
+        """List the packets of a tile in the order they appear.
+
+        Returns
+        -------
+        ndarray
+            Structured array of type PACKET_DTYPE.
+        """
+        tx0, ty0, _, _ = self.tile_extent(tile)
+
+        fields = {'layer': [], 'resolution': [], 'component': [],
+                  'precinct': [], 'x': [], 'y': []}
+        layers = np.arange(self.num_layers)
+        for item in self.resolutions(tile):
+            c, r, levelno, trx0, try0, _, _, ppx, ppy, pw, ph = item
+            num_precincts = pw * ph
+            if num_precincts == 0:
+                continue
+
+            # Position on the reference grid at which a precinct is reached
+            # by the position-driven progressions.
+            precincts = np.arange(num_precincts)
+            px0 = ((trx0 >> ppx) + precincts % pw) << ppx
+            py0 = ((try0 >> ppy) + precincts // pw) << ppy
+            x = np.maximum(tx0, (px0 << levelno) * self.siz.xrsiz[c])
+            y = np.maximum(ty0, (py0 << levelno) * self.siz.yrsiz[c])
+
+            fields['layer'].append(np.repeat(layers, num_precincts))
+            fields['precinct'].append(np.tile(precincts, self.num_layers))
+            fields['x'].append(np.tile(x, self.num_layers))
+            fields['y'].append(np.tile(y, self.num_layers))
+            count = num_precincts * self.num_layers
+            fields['resolution'].append(np.full(count, r))
+            fields['component'].append(np.full(count, c))
+
+        if len(fields['layer']) == 0:
+            return np.zeros(0, dtype=PACKET_DTYPE)
+        for key in fields:
+            fields[key] = np.concatenate(fields[key])
+
+        l, r, c = fields['layer'], fields['resolution'], fields['component']
+        p, x, y = fields['precinct'], fields['x'], fields['y']
+        keys = {
+            LRCP: (l, r, c, p),
+            RLCP: (r, l, c, p),
+            RPCL: (r, y, x, c, l),
+            PCRL: (y, x, c, r, l),
+            CPRL: (c, y, x, r, l),
+        }[self.progression_order]
+        order = np.lexsort(keys[::-1])
+
+        packets = np.zeros(len(order), dtype=PACKET_DTYPE)
+        for name in PACKET_DTYPE.names:
+            packets[name] = fields[name][order]
+        return packets
+
+    def code_blocks(self, tile):
+        """Count the code-blocks of each precinct of a tile.
+
+        Returns
+        -------
+        dict
+            Maps (component, resolution, precinct) to a list with the number
+            of code-blocks (across, down) of each subband within the
+            precinct, in the order the subbands appear in a packet.
+        """
+        tx0, ty0, tx1, ty1 = self.tile_extent(tile)
+        blocks = {}
+        for item in self.resolutions(tile):
+            c, r, levelno, trx0, try0, _, _, ppx, ppy, pw, ph = item
+            dx, dy = self.siz.xrsiz[c], self.siz.yrsiz[c]
+            tcx0, tcy0 = _ceil_div(tx0, dx), _ceil_div(ty0, dy)
+            tcx1, tcy1 = _ceil_div(tx1, dx), _ceil_div(ty1, dy)
+
+            # Precincts and subbands of the resolution on the subband grid.
+            px0, py0 = (trx0 >> ppx) << ppx, (try0 >> ppy) << ppy
+            if r == 0:
+                bands = [(levelno, 0, 0)]
+                cbgx, cbgy = ppx, ppy
+            else:
+                bands = [(levelno + 1, 1, 0), (levelno + 1, 0, 1),
+                         (levelno + 1, 1, 1)]
+                cbgx, cbgy = ppx - 1, ppy - 1
+                px0, py0 = _ceil_div(px0, 2), _ceil_div(py0, 2)
+            xcb = min(self.code_block_exponents[c][0], cbgx)
+            ycb = min(self.code_block_exponents[c][1], cbgy)
+
+            extents = []
+            for nb, xob, yob in bands:
+                scale = 2 ** nb
+                extents.append((_ceil_div(tcx0 - ((xob << nb) >> 1), scale),
+                                _ceil_div(tcy0 - ((yob << nb) >> 1), scale),
+                                _ceil_div(tcx1 - ((xob << nb) >> 1), scale),
+                                _ceil_div(tcy1 - ((yob << nb) >> 1), scale)))
+
+            for precinct in range(pw * ph):
+                i, j = precinct % pw, precinct // pw
+                counts = []
+                for bx0, by0, bx1, by1 in extents:
+                    x0 = max(bx0, px0 + (i << cbgx))
+                    x1 = min(bx1, px0 + ((i + 1) << cbgx))
+                    y0 = max(by0, py0 + (j << cbgy))
+                    y1 = min(by1, py0 + ((j + 1) << cbgy))
+                    if x1 <= x0 or y1 <= y0:
+                        counts.append((0, 0))
+                    else:
+                        counts.append((_ceil_div(x1, 2 ** xcb) - (x0 >> xcb),
+                                       _ceil_div(y1, 2 ** ycb) - (y0 >> ycb)))
+                blocks[(c, r, precinct)] = counts
+        return blocks
+
+    def precincts_needed(self, tile, area, components, max_levels):
+        """Find the precincts contributing to an area.
+
+        Parameters
+        ----------
+        tile : int
+            Index of the tile.
+        area : tuple
+            (y0, x0, y1, x1) on the reference grid.
+        components : collection
+            Indices of the components wanted.
+        max_levels : list
+            For each component, the number of resolutions that are skipped.
+
+        Returns
+        -------
+        set
+            (component, resolution, precinct) for each precinct needed.
+        """
+        ay0, ax0, ay1, ax1 = area
+        needed = set()
+        for item in self.resolutions(tile):
+            c, r, levelno, trx0, try0, _, _, ppx, ppy, pw, ph = item
+            if c not in components or levelno < max_levels[c]:
+                continue
+
+            # The area on this resolution's grid, widened by the filters.
+            dx, dy = self.siz.xrsiz[c], self.siz.yrsiz[c]
+            scale = 2 ** levelno
+            x0 = _ceil_div(ax0, dx) // scale - FILTER_MARGIN
+            y0 = _ceil_div(ay0, dy) // scale - FILTER_MARGIN
+            x1 = _ceil_div(_ceil_div(ax1, dx), scale) + FILTER_MARGIN
+            y1 = _ceil_div(_ceil_div(ay1, dy), scale) + FILTER_MARGIN
+
+            for j in range(ph):
+                py0 = ((try0 >> ppy) + j) << ppy
+                if py0 >= y1 or py0 + 2 ** ppy <= y0:
+                    continue
+                for i in range(pw):
+                    px0 = ((trx0 >> ppx) + i) << ppx
+                    if px0 >= x1 or px0 + 2 ** ppx <= x0:
+                        continue
+                    needed.add((c, r, j * pw + i))
+        return needed
+
+
+class _BitReader(object):
+    """Reads the bits of a packet header, skipping stuffed bits.
+
+    After a byte of 0xff, the most significant bit of the next byte is a
+    stuffed zero.
+    """
+    def __init__(self, data, pos):
+        self.data = data
+        self.pos = pos
+        self._buffer = 0
+        self._count = 0
+
+    def _next_byte(self):
+        if self.pos >= len(self.data):
+            msg = "A packet header extends past the end of its tile-part."
+            raise IOError(msg)
+        self._buffer = (self._buffer << 8) & 0xffff
+        self._count = 7 if self._buffer == 0xff00 else 8
+        self._buffer |= self.data[self.pos]
+        self.pos += 1
+
+    def bit(self):
+        if self._count == 0:
+            self._next_byte()
+        self._count -= 1
+        return (self._buffer >> self._count) & 1
+
+    def bits(self, num_bits):
+        value = 0
+        for _ in range(num_bits):
+            value = (value << 1) | self.bit()
+        return value
+
+    def align(self):
+        """Move on to the next byte at the end of a packet header."""
+        if (self._buffer & 0xff) == 0xff:
+            self._next_byte()
+        self._count = 0
+
+
+class _TagTree(object):
+    """Tag tree over the code-blocks of a precinct, see B.10.2."""
+    def __init__(self, width, height):
+        self._offsets, self._widths = [], []
+        num_nodes = 0
+        while True:
+            self._offsets.append(num_nodes)
+            self._widths.append(width)
+            num_nodes += width * height
+            if width * height <= 1:
+                break
+            width, height = (width + 1) // 2, (height + 1) // 2
+        self._value = [np.iinfo(np.int32).max] * num_nodes
+        self._low = [0] * num_nodes
+
+    def decode(self, reader, leaf, threshold):
+        """Read whether the value of a leaf is below a threshold."""
+        x, y = leaf % self._widths[0], leaf // self._widths[0]
+        path = []
+        for offset, width in zip(self._offsets, self._widths):
+            path.append(offset + y * width + x)
+            x, y = x >> 1, y >> 1
+
+        low = 0
+        for node in reversed(path):
+            if low > self._low[node]:
+                self._low[node] = low
+            else:
+                low = self._low[node]
+            while low < threshold and low < self._value[node]:
+                if reader.bit():
+                    self._value[node] = low
+                else:
+                    low += 1
+            self._low[node] = low
+        return self._value[path[0]] < threshold
+
+
+class _CodeBlock(object):
+    """What a packet header reader knows of a code-block.
+
+    Attributes
+    ----------
+    lblock : int
+        Number of bits signalling a codeword segment length.
+    segments : list
+        [num_passes, max_passes] of each codeword segment so far.
+    """
+    def __init__(self):
+        self.lblock = 3
+        self.segments = []
+
+    def new_segment(self, style):
+        """Start a codeword segment, see Table D-9."""
+        if style & 0x04:
+            # Termination on each coding pass.
+            max_passes = 1
+        elif style & 0x01:
+            # Arithmetic coding bypass.
+            if len(self.segments) == 0:
+                max_passes = 10
+            elif self.segments[-1][1] in (1, 10):
+                max_passes = 2
+            else:
+                max_passes = 1
+        else:
+            max_passes = 109
+        self.segments.append([0, max_passes])
+
+
+class PacketScanner(object):
+    """Finds the lengths of the packets of a tile from their headers.
+
+    See Annex B.10 of ISO/IEC 15444-1.  The tile-parts of a tile must be
+    scanned in order, as the headers of later packets depend on earlier
+    ones.
+
+    Attributes
+    ----------
+    tile : int
+        Index of the tile.
+    num_packets_read : int
+        Number of packets of the tile read so far.
+    """
+    def __init__(self, params, tile):
+        """
+        Parameters
+        ----------
+        params : CodingParameters
+            Coding parameters of the codestream.
+        tile : int
+            Index of the tile.
+        """
+        self.tile = tile
+        self._params = params
+        self._packets = params.packets(tile)
+        self._blocks = params.code_blocks(tile)
+        self._precincts = {}
+        self.num_packets_read = 0
+
+    @property
+    def complete(self):
+        """True once every packet of the tile has been read."""
+        return self.num_packets_read == len(self._packets)
+
+    def scan(self, data):
+        """Read the packets making up the data of a tile-part.
+
+        Parameters
+        ----------
+        data : bytes
+            Everything following the SOD marker of the tile-part.
+
+        Returns
+        -------
+        ndarray
+            The lengths of the packets as uint32.  Packets cut short at the
+            end of the data are included with the bytes present.
+
+        Raises
+        ------
+        IOError
+            If there is data left over once all packets of the tile are
+            read.
+        """
+        data = bytearray(data)
+        pos = 0
+        lengths = []
+        while pos < len(data):
+            if self.complete:
+                msg = ("The packet headers of tile {tile} do not account for "
+                       "{num_bytes} bytes of data.")
+                raise IOError(msg.format(tile=self.tile,
+                                         num_bytes=len(data) - pos))
+            packet = self._packets[self.num_packets_read]
+            end = self._read_packet(data, pos, packet)
+            lengths.append(min(end, len(data)) - pos)
+            pos = end
+            self.num_packets_read += 1
+        return np.array(lengths, dtype=np.uint32)
+
+    def _read_packet(self, data, pos, packet):
+        """Read a packet header, returning the offset past the packet."""
+        layer, component = int(packet['layer']), int(packet['component'])
+        key = (component, int(packet['resolution']), int(packet['precinct']))
+        if key not in self._precincts:
+            bands = []
+            for width, height in self._blocks[key]:
+                if width * height > 0:
+                    blocks = [_CodeBlock() for _ in range(width * height)]
+                    bands.append((_TagTree(width, height),
+                                  _TagTree(width, height), blocks))
+            self._precincts[key] = bands
+        style = self._params.code_block_styles[component]
+
+        if self._params.sop and data[pos:pos + 2] == b'\xff\x91':
+            pos += 6
+
+        reader = _BitReader(data, pos)
+        body = 0
+        if reader.bit():
+            for inclusion, zero_planes, blocks in self._precincts[key]:
+                for k, block in enumerate(blocks):
+                    body += _read_code_block(reader, layer, k, inclusion,
+                                             zero_planes, block, style)
+        reader.align()
+        pos = reader.pos
+
+        if self._params.eph and data[pos:pos + 2] == b'\xff\x92':
+            pos += 2
+        return pos + body
+
+
+def _read_code_block(reader, layer, k, inclusion, zero_planes, block, style):
+    """Read what a packet header says about a code-block.
+
+    Returns
+    -------
+    int
+        Number of bytes of the code-block in the packet body.
+    """
+    if len(block.segments) == 0:
+        if not inclusion.decode(reader, k, layer + 1):
+            return 0
+        # The number of missing bit-planes is only needed for decoding.
+        num_planes = 0
+        while not zero_planes.decode(reader, k, num_planes):
+            num_planes += 1
+    elif not reader.bit():
+        return 0
+
+    # Number of coding passes, see Table B-4.
+    if not reader.bit():
+        num_passes = 1
+    elif not reader.bit():
+        num_passes = 2
+    else:
+        num_passes = reader.bits(2)
+        if num_passes < 3:
+            num_passes += 3
+        else:
+            num_passes = reader.bits(5)
+            if num_passes < 31:
+                num_passes += 6
+            else:
+                num_passes = 37 + reader.bits(7)
+
+    while reader.bit():
+        block.lblock += 1
+
+    if len(block.segments) == 0 or (block.segments[-1][0] ==
+                                    block.segments[-1][1]):
+        block.new_segment(style)
+    length = 0
+    while True:
+        segment = block.segments[-1]
+        count = min(segment[1] - segment[0], num_passes)
+        length += reader.bits(block.lblock + count.bit_length() - 1)
+        segment[0] += count
+        num_passes -= count
+        if num_passes == 0:
+            return length
+        block.new_segment(style)
+
+
+def scan_packet_lengths(codestream, fptr, params=None, parts=None):
+    """Find packet lengths that are not signalled by reading packet headers.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    fptr : file
+        The file holding the codestream.
+    params : CodingParameters, optional
+        Coding parameters of the codestream, if already known.
+    parts : list, optional
+        TilePart objects of the codestream, if already known.
+
+    Returns
+    -------
+    list
+        TilePart objects, the packet lengths of which are filled in where
+        possible.  Tiles using packed packet headers, progression order
+        changes or their own coding style are left alone.
+    """
+    if params is None:
+        params = CodingParameters(codestream)
+    if parts is None:
+        parts = tile_parts(codestream)
+
+    if any(seg.marker_id in ('PPM', 'POD') for seg in codestream.segment):
+        return parts
+
+    for tile in sorted(set(tp.tile for tp in parts)):
+        tps = [tp for tp in parts if tp.tile == tile]
+        if _tile_packet_lengths(params, tps) is not None:
+            continue
+        if any(params.changes_layout(tp) for tp in tps):
+            continue
+
+        scanner = PacketScanner(params, tile)
+        for tile_part in tps:
+            fptr.seek(tile_part.data_offset)
+            data = fptr.read(tile_part.end - tile_part.data_offset)
+            tile_part.packet_lengths = scanner.scan(data)
+
+    return parts
+
+
+def decode_packet_lengths(data):
+    """Decode the packet lengths of a PLT or PLM segment.
+
+    Each length is coded in 7-bit groups, most significant first, with the
+    high bit set on all but the last byte.
+
+    Parameters
+    ----------
+    data : bytes
+        The Iplt or Iplm data.
+
+    Returns
+    -------
+    ndarray
+        The packet lengths as uint32.  Bytes of an unterminated length at
+        the end of the data are ignored.
+    """
+    data = np.frombuffer(bytes(data), dtype=np.uint8)
+    last = (data & 0x80) == 0
+    ends = np.flatnonzero(last)
+    if len(ends) == 0:
+        return np.zeros(0, dtype=np.uint32)
+    data = data[:ends[-1] + 1]
+    last = last[:ends[-1] + 1]
+
+    # Each byte is shifted by 7 bits for every byte following it in the
+    # same length.
+    group = np.cumsum(last) - last
+    shift = 7 * (ends[group] - np.arange(len(data)))
+    values = (data & 0x7f).astype(np.uint64) << shift.astype(np.uint64)
+
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    return np.add.reduceat(values, starts).astype(np.uint32)
+
+
+class TilePart(object):
+    """Location of a tile-part and its packets.
+
+    Attributes
+    ----------
+    tile : int
+        Index of the tile.
+    offset : int
+        Offset of the SOT marker in the file.
+    data_offset : int
+        Offset of the first packet, just past the SOD marker.
+    end : int
+        Offset just past the end of the tile-part.
+    packet_lengths : ndarray or None
+        Lengths of the packets in this tile-part, if known.
+    header_segments : list
+        Marker IDs of the tile-part header.
+    segments : list
+        Marker segments of the tile-part header, other than SOT.
+    """
+    def __init__(self, sot, end):
+        self.tile = sot.isot
+        self.offset = sot.offset
+        self.data_offset = None
+        self.end = end
+        self.packet_lengths = None
+        self.header_segments = []
+        self.segments = []
+
+    @property
+    def packet_offsets(self):
+        """File offsets of the packets in this tile-part, if known."""
+        if self.packet_lengths is None:
+            return None
+        lengths = np.asarray(self.packet_lengths, dtype=np.int64)
+        return self.data_offset + np.cumsum(lengths) - lengths
+
+
+def tile_parts(codestream):
+    """Locate the tile-parts of a fully parsed codestream.
+
+    Packet lengths are taken from PLT segments or else from PLM segments in
+    the main header.
+
+    Returns
+    -------
+    list
+        TilePart objects in the order in which they appear.
+    """
+    eoc = codestream.offset + codestream.length - 2
+    lst = []
+    for segment in codestream.segment:
+        if segment.marker_id == 'SOT':
+            if segment.psot == 0:
+                end = eoc
+            else:
+                end = segment.offset + segment.psot
+            lst.append(TilePart(segment, end))
+        elif len(lst) == 0:
+            continue
+        elif segment.marker_id == 'SOD':
+            lst[-1].data_offset = segment.offset + 2
+        elif lst[-1].data_offset is None:
+            lst[-1].header_segments.append(segment.marker_id)
+            lst[-1].segments.append(segment)
+            if segment.marker_id == 'PLT':
+                if lst[-1].packet_lengths is None:
+                    lst[-1].packet_lengths = segment.iplt
+                else:
+                    lst[-1].packet_lengths = np.concatenate(
+                        (lst[-1].packet_lengths, segment.iplt))
+
+    plm = [seg for seg in codestream.segment if seg.marker_id == '0xff57']
+    if len(plm) > 0 and all(tp.packet_lengths is None for tp in lst):
+        # Zplm is the first byte of each segment.
+        plm = sorted(plm, key=lambda seg: bytearray(seg.data)[0])
+        data = bytearray(b''.join(bytes(seg.data[1:]) for seg in plm))
+        pos = 0
+        for tile_part in lst:
+            if pos >= len(data):
+                break
+            nbytes = data[pos]
+            iplm = data[pos + 1:pos + 1 + nbytes]
+            tile_part.packet_lengths = decode_packet_lengths(iplm)
+            pos += 1 + nbytes
+
+    return lst
+
+
+def packet_index(codestream, tile, params=None, parts=None):
+    """Locate each packet of a tile in the file.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    tile : int
+        Index of the tile.
+    params : CodingParameters, optional
+        Coding parameters of the codestream, if already known.
+    parts : list, optional
+        TilePart objects of the codestream, if already known.
+
+    Returns
+    -------
+    ndarray or None
+        Structured array of the packets in the order they appear, with the
+        fields of PACKET_DTYPE plus their file offset and length.  None if
+        the packets cannot be located, such as when packet lengths are not
+        signalled.
+    """
+    if params is None:
+        params = CodingParameters(codestream)
+    if parts is None:
+        parts = tile_parts(codestream)
+
+    if any(seg.marker_id in ('PPM', 'POD') for seg in codestream.segment):
+        return None
+
+    tps = [tp for tp in parts if tp.tile == tile]
+    lengths = _tile_packet_lengths(params, tps)
+    packets = params.packets(tile)
+    if lengths is None or len(lengths) != len(packets):
+        return None
+
+    dtype = np.dtype(PACKET_DTYPE.descr + [('offset', np.int64),
+                                           ('length', np.int64)])
+    index = np.zeros(len(packets), dtype=dtype)
+    for name in PACKET_DTYPE.names:
+        index[name] = packets[name]
+    index['offset'] = _tile_packet_offsets(tps)
+    index['length'] = lengths
+    return index
+
+
+def encode_packet_lengths(lengths):
+    """Code packet lengths as in the Iplt field of a PLT segment.
+
+    Parameters
+    ----------
+    lengths : sequence
+        The packet lengths.
+
+    Returns
+    -------
+    list
+        The coded bytes of each length.
+    """
+    coded = []
+    for length in np.asarray(lengths, dtype=np.int64).tolist():
+        groups = [length & 0x7f]
+        length >>= 7
+        while length > 0:
+            groups.append((length & 0x7f) | 0x80)
+            length >>= 7
+        coded.append(bytes(bytearray(groups[::-1])))
+    return coded
+
+
+def coalesce(ranges):
+    """Merge overlapping or abutting (offset, length) byte ranges."""
+    merged = []
+    for offset, length in sorted(ranges):
+        if length <= 0:
+            continue
+        if merged and offset <= merged[-1][0] + merged[-1][1]:
+            end = max(merged[-1][0] + merged[-1][1], offset + length)
+            merged[-1] = (merged[-1][0], end - merged[-1][0])
+        else:
+            merged.append((offset, length))
+    return merged
+
+
+def plan_read(codestream, area=None, rlevel=0, layer=None, components=None):
+    """Compute the byte ranges of a file needed to decode part of an image.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    area : tuple, optional
+        (first_row, first_col, last_row, last_col) on the reference grid.
+        The last row and column are excluded, as in slicing.
+    rlevel : int, optional
+        Number of resolutions to skip, -1 meaning all but the lowest.
+    layer : int, optional
+        Number of quality layers to decode, all of them by default.
+    components : sequence, optional
+        Indices of the codestream components wanted, all by default.
+
+    Returns
+    -------
+    list
+        (offset, length) tuples, sorted and with no two ranges touching.
+    """
+    params = CodingParameters(codestream)
+    siz = params.siz
+    if area is None:
+        area = (siz.yosiz, siz.xosiz, siz.ysiz, siz.xsiz)
+
+    num_comps = siz.Csiz
+    if components is None:
+        components = set(range(num_comps))
+    else:
+        components = set(components)
+        if params.mct and num_comps >= 3 and components & set([0, 1, 2]):
+            # The first three components are mixed by the transform.
+            components |= set([0, 1, 2])
+
+    if rlevel == -1:
+        rlevel = min(params.num_levels)
+    max_levels = [rlevel] * num_comps
+
+    num_layers = params.num_layers
+    if layer:
+        num_layers = min(layer, num_layers)
+
+    parts = tile_parts(codestream)
+    if len(parts) == 0:
+        return [(0, codestream.offset + codestream.length)]
+
+    # Everything up to the end of the main header, and the EOC marker.
+    ranges = [(0, parts[0].offset), (codestream.offset + codestream.length - 2,
+                                     2)]
+
+    ay0, ax0, ay1, ax1 = area
+    for tile in sorted(set(tp.tile for tp in parts)):
+        tx0, ty0, tx1, ty1 = params.tile_extent(tile)
+        if tx0 >= ax1 or tx1 <= ax0 or ty0 >= ay1 or ty1 <= ay0:
+            continue
+
+        tps = [tp for tp in parts if tp.tile == tile]
+        for tile_part in tps:
+            ranges.append((tile_part.offset,
+                           tile_part.data_offset - tile_part.offset))
+
+        index = packet_index(codestream, tile, params=params, parts=parts)
+        if index is None:
+            # Cannot tell the packets apart, so take the tile-parts whole.
+            for tile_part in tps:
+                ranges.append((tile_part.data_offset,
+                               tile_part.end - tile_part.data_offset))
+            continue
+
+        precincts = params.precincts_needed(tile, area, components,
+                                            max_levels)
+        needed = np.array([_precinct_code(*item) for item in precincts],
+                          dtype=np.int64)
+        codes = _precinct_code(index['component'], index['resolution'],
+                               index['precinct'])
+        keep = (index['layer'] < num_layers) & np.isin(codes, needed)
+
+        ranges.extend(zip(index['offset'][keep].tolist(),
+                          index['length'][keep].tolist()))
+
+    return coalesce(ranges)
+
+
+def _precinct_code(component, resolution, precinct):
+    """Pack the indices identifying a precinct into a single integer."""
+    component = np.asarray(component, dtype=np.int64)
+    return (component << 40) | (np.int64(resolution) << 32) | precinct
+
+
+def _tile_packet_lengths(params, tps):
+    """Concatenate the packet lengths of the tile-parts of a tile.
+
+    Returns None if any tile-part header lacks the lengths or alters the
+    packet layout.
+    """
+    lengths = []
+    for tile_part in tps:
+        if tile_part.packet_lengths is None:
+            return None
+        if params.changes_layout(tile_part):
+            return None
+        lengths.append(np.asarray(tile_part.packet_lengths, dtype=np.int64))
+    if len(lengths) == 0:
+        return None
+    return np.concatenate(lengths)
+
+
+def _tile_packet_offsets(tps):
+    """File offsets of the packets of the tile-parts of a tile."""
+    return np.concatenate([tile_part.packet_offsets for tile_part in tps])
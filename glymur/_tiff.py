@@ -4,9 +4,17 @@ Part of glymur.
 """
 # Standard library imports ...
 from collections import OrderedDict
+try:
+    from collections.abc import Mapping
+except ImportError:
+    # v2.7
+    from collections import Mapping
 import struct
 import warnings
 
+# Third party library imports ...
+import numpy as np
+
 
 def tiff_header(read_buffer):
     """
@@ -36,66 +44,131 @@ def tiff_header(read_buffer):
     return exif.processed_ifd
 
 
+class TiffTags(Mapping):
+    """
+    Read-only mapping of TIFF tags to tag values.
+
+    Each tag payload is only interpreted when that tag is first accessed.
+    Payloads consisting of more than a single numeric value are numpy arrays.
+    """
+    def __init__(self, ifd, keys):
+        """
+        Parameters
+        ----------
+        ifd : Ifd
+            IFD holding the tag entries.
+        keys : list
+            Pairs of tag keys and indices into the IFD entry table.
+        """
+        self._ifd = ifd
+        self._index = OrderedDict(keys)
+        self._cache = {}
+
+    def __getitem__(self, key):
+        idx = self._index[key]
+        try:
+            return self._cache[key]
+        except KeyError:
+            value = self._ifd.materialize(idx)
+            self._cache[key] = value
+            return value
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __repr__(self):
+        items = []
+        for key, value in self.items():
+            if isinstance(value, np.ndarray):
+                value = tuple(value.tolist())
+            items.append((key, value))
+        return 'TiffTags({0})'.format(items)
+
+
 class Ifd(object):
     """
     Attributes
     ----------
     read_buffer : bytes
         Raw byte stream consisting of the UUID data.
-    datatype2fmt : dictionary
-        Class attribute, maps the TIFF enumerated datatype to the python
-        datatype and data width.
+    datatype2dtype : dictionary
+        Class attribute, maps the TIFF enumerated datatype to the numpy
+        datatype and the width of a single value.
     endian : str
         Either '<' for big-endian, or '>' for little-endian.
     num_tags : int
         Number of tags in the IFD.
-    raw_ifd : dictionary
+    entries : numpy structured array
+        The IFD entry table, with fields 'tag', 'datatype', 'count', and
+        'value' (the raw offset/payload field).
+    raw_ifd : TiffTags
         Maps tag number to "mildly-interpreted" tag value.
-    processed_ifd : dictionary
+    processed_ifd : TiffTags
         Maps tag name to "mildly-interpreted" tag value.
     """
-    datatype2fmt = {1: ('B', 1),
-                    2: ('B', 1),
-                    3: ('H', 2),
-                    4: ('I', 4),
-                    5: ('II', 8),
-                    7: ('B', 1),
-                    9: ('i', 4),
-                    10: ('ii', 8),
-                    11: ('f', 4),
-                    12: ('d', 8)}
+    datatype2dtype = {1: ('u1', 1),
+                      2: ('u1', 1),
+                      3: ('u2', 2),
+                      4: ('u4', 4),
+                      5: ('u4', 8),
+                      7: ('u1', 1),
+                      9: ('i4', 4),
+                      10: ('i4', 8),
+                      11: ('f4', 4),
+                      12: ('f8', 8)}
 
     def __init__(self, endian, read_buffer, offset):
         self.endian = endian
         self.read_buffer = read_buffer
-        self.processed_ifd = OrderedDict()
 
         self.num_tags, = struct.unpack(endian + 'H',
                                        read_buffer[offset:offset + 2])
 
-        fmt = self.endian + 'HHII' * self.num_tags
-        ifd_buffer = read_buffer[offset + 2:offset + 2 + self.num_tags * 12]
-        data = struct.unpack(fmt, ifd_buffer)
-        self.raw_ifd = OrderedDict()
-        for j, tag in enumerate(data[0::4]):
-            # The offset to the tag offset/payload is the offset to the IFD
-            # plus 2 bytes for the number of tags plus 12 bytes for each
-            # tag entry plus 8 bytes to the offset/payload itself.
-            toffp = read_buffer[offset + 10 + j * 12:offset + 10 + j * 12 + 4]
-            tag_data = self.parse_tag(data[j * 4 + 1],
-                                      data[j * 4 + 2],
-                                      toffp)
-            self.raw_ifd[tag] = tag_data
+        # Read the entire IFD entry table at once.
+        dtype = np.dtype([('tag', endian + 'u2'),
+                          ('datatype', endian + 'u2'),
+                          ('count', endian + 'u4'),
+                          ('value', 'V4')])
+        try:
+            self.entries = np.frombuffer(read_buffer, dtype=dtype,
+                                         count=self.num_tags,
+                                         offset=offset + 2)
+        except ValueError:
+            msg = ('The IFD at byte offset {offset} claims {num_tags} tags, '
+                   'but the TIFF data is not long enough to hold them.')
+            msg = msg.format(offset=offset, num_tags=self.num_tags)
+            raise IOError(msg)
+
+        valid = np.isin(self.entries['datatype'],
+                        list(self.datatype2dtype.keys()))
+        if not valid.all():
+            datatype = self.entries['datatype'][~valid][0]
+            msg = 'Invalid TIFF tag datatype ({0}).'.format(datatype)
+            raise IOError(msg)
+
+        keys = [(tag, j) for j, tag in enumerate(self.entries['tag'].tolist())]
+        self.raw_ifd = TiffTags(self, keys)
+        self.processed_ifd = TiffTags(self, [])
+
+    def materialize(self, idx):
+        """Interpret the payload of a single entry of the IFD table.
+        """
+        entry = self.entries[idx]
+        return self.parse_tag(int(entry['datatype']), int(entry['count']),
+                              entry['value'].tobytes())
 
     def parse_tag(self, dtype, count, offset_buf):
         """Interpret an Exif image tag data payload.
         """
         try:
-            fmt = self.datatype2fmt[dtype][0] * count
-            payload_size = self.datatype2fmt[dtype][1] * count
+            numpy_dtype, width = self.datatype2dtype[dtype]
         except KeyError:
             msg = 'Invalid TIFF tag datatype ({0}).'.format(dtype)
             raise IOError(msg)
+        payload_size = width * count
 
         if payload_size <= 4:
             # Interpret the payload from the 4 bytes in the tag entry.
@@ -108,28 +181,30 @@ class Ifd(object):
 
         if dtype == 2:
             # ASCII
-            payload = target_buffer.decode('utf-8').rstrip('\x00')
+            return target_buffer.decode('utf-8').rstrip('\x00')
 
-        else:
-            payload = struct.unpack(self.endian + fmt, target_buffer)
-            if dtype == 5 or dtype == 10:
-                # Rational or Signed Rational.  Construct the list of values.
-                rational_payload = []
-                for j in range(count):
-                    value = float(payload[j * 2]) / float(payload[j * 2 + 1])
-                    rational_payload.append(value)
-                payload = rational_payload
-            if count == 1:
-                # If just a single value, then return a scalar instead of a
-                # tuple.
-                payload = payload[0]
+        payload = np.frombuffer(target_buffer, dtype=self.endian + numpy_dtype)
+        if self.endian != np.dtype('=u2').str[0]:
+            # Give the user native byte order.
+            payload = payload.astype(payload.dtype.newbyteorder('='))
+
+        if dtype == 5 or dtype == 10:
+            # Rational or Signed Rational.
+            with np.errstate(divide='ignore', invalid='ignore'):
+                payload = payload[0::2] / payload[1::2].astype(np.float64)
+
+        if count == 1:
+            # If just a single value, then return a scalar instead of an
+            # array.
+            payload = payload[0].item()
 
         return payload
 
     def post_process(self, tagnum2name):
         """Map the tag name instead of tag number to the tag value.
         """
-        for tag, value in self.raw_ifd.items():
+        keys = []
+        for tag, idx in self.raw_ifd._index.items():
             try:
                 tag_name = tagnum2name[tag]
             except KeyError:
@@ -137,7 +212,8 @@ class Ifd(object):
                 msg = 'Unrecognized Exif tag ({tag}).'.format(tag=tag)
                 warnings.warn(msg, UserWarning)
                 tag_name = tag
-            self.processed_ifd[tag_name] = value
+            keys.append((tag_name, idx))
+        self.processed_ifd = TiffTags(self, keys)
 
 
 class ExifImageIfd(Ifd):
@@ -0,0 +1,578 @@
+# -*- coding:  utf-8 -*-
+"""
+Rewriting of codestreams in the compressed domain.
+
+Packets are copied from one codestream into another without being decoded,
+while the marker segments that describe them are rewritten to match.
+"""
+# Standard library imports ...
+from collections import Counter
+import struct
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+from . import _packets
+
+# Largest value of the length field of a marker segment.
+MAX_SEGMENT_LENGTH = 65535
+
+# Marker segments that are regenerated rather than copied.
+_INDEX_SEGMENTS = ('TLM', '0xff57', 'PLT')
+
+# Most bytes of packet data read at once.
+_COPY_SIZE = 1 << 20
+
+
+class OutputTilePart(object):
+    """A tile-part to be written.
+
+    Attributes
+    ----------
+    tile : int
+        Index of the tile.
+    header : bytes
+        Marker segments of the tile-part header, other than SOT, SOD and PLT.
+    offsets, lengths : ndarray
+        Location of the packets in the source file, in the order in which
+        they are to be written.
+    fptr : file
+        Source of the packets.
+    """
+    def __init__(self, tile, header, offsets, lengths, fptr):
+        self.tile = tile
+        self.header = header
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        self.fptr = fptr
+
+
+def raw_segment(fptr, segment):
+    """Read the bytes of a marker segment, marker included."""
+    fptr.seek(segment.offset)
+    return fptr.read(2 + segment.length)
+
+
+def main_header(codestream):
+    """Marker segments of the main header, SOC excluded."""
+    segments = []
+    for segment in codestream.segment[1:]:
+        if segment.marker_id == 'SOT':
+            break
+        segments.append(segment)
+    return segments
+
+
+def rewrite_cod(raw, layers=None, reduce=0, prog_order=None):
+    """Rewrite a COD segment.
+
+    Parameters
+    ----------
+    raw : bytes
+        The COD segment, marker included.
+    layers : int, optional
+        New number of quality layers.
+    reduce : int, optional
+        Number of decomposition levels to remove.
+    prog_order : int, optional
+        New progression order.
+    """
+    raw = bytearray(raw)
+    if prog_order is not None:
+        raw[5] = prog_order
+    if layers is not None:
+        struct.pack_into('>H', raw, 6, layers)
+    if reduce > 0:
+        raw[9] -= reduce
+        if raw[4] & 1:
+            # One precinct size for each resolution.
+            del raw[len(raw) - reduce:]
+        struct.pack_into('>H', raw, 2, len(raw) - 2)
+    return bytes(raw)
+
+
+def rewrite_coc(raw, csiz, reduce=0):
+    """Rewrite a COC segment for fewer decomposition levels."""
+    raw = bytearray(raw)
+    if reduce > 0:
+        pos = 4 + (1 if csiz < 257 else 2)
+        raw[pos + 1] -= reduce
+        if raw[pos] & 1:
+            del raw[len(raw) - reduce:]
+        struct.pack_into('>H', raw, 2, len(raw) - 2)
+    return bytes(raw)
+
+
+def rewrite_quantization(raw, csiz, reduce=0):
+    """Rewrite a QCD or QCC segment for fewer decomposition levels.
+
+    The step sizes of the subbands of the removed levels come last.  With
+    scalar derived quantization there is just the one for the LL subband,
+    from which the others follow.
+    """
+    raw = bytearray(raw)
+    pos = 4
+    if raw[1] == 0x5d:
+        # The component index of QCC.
+        pos += 1 if csiz < 257 else 2
+    style = raw[pos] & 0x1f
+    if reduce > 0 and style != 1:
+        nbytes = 3 * reduce * (1 if style == 0 else 2)
+        del raw[len(raw) - nbytes:]
+        struct.pack_into('>H', raw, 2, len(raw) - 2)
+    return bytes(raw)
+
+
+def reduce_siz(raw, siz, reduce):
+    """Rewrite a SIZ segment for the image at a lower resolution.
+
+    The reference grid shrinks by a factor of two for each level removed.
+    The tile grid must keep the same number of tiles.
+
+    Raises
+    ------
+    IOError
+        If the tiles do not divide evenly.
+    """
+    raw = bytearray(raw)
+    scale = 2 ** reduce
+
+    def shrink(size, offset, tile_size, tile_offset):
+        new_size = _packets._ceil_div(size, scale)
+        new_offset = _packets._ceil_div(offset, scale)
+        new_tile_offset = _packets._ceil_div(tile_offset, scale)
+        num_tiles = _packets._ceil_div(size - tile_offset, tile_size)
+        if num_tiles == 1:
+            new_tile_size = new_size - new_tile_offset
+        elif tile_size % scale == 0:
+            new_tile_size = tile_size // scale
+        else:
+            msg = ("Tiles of size {tile_size} cannot be reduced by "
+                   "{reduce} levels.")
+            raise IOError(msg.format(tile_size=tile_size, reduce=reduce))
+        if ((new_tile_offset + new_tile_size <= new_offset or
+             _packets._ceil_div(new_size - new_tile_offset,
+                                new_tile_size) != num_tiles)):
+            msg = "The tiles of the image vanish at {reduce} levels down."
+            raise IOError(msg.format(reduce=reduce))
+        return new_size, new_offset, new_tile_size, new_tile_offset
+
+    xsiz, xosiz, xtsiz, xtosiz = shrink(siz.xsiz, siz.xosiz, siz.xtsiz,
+                                        siz.xtosiz)
+    ysiz, yosiz, ytsiz, ytosiz = shrink(siz.ysiz, siz.yosiz, siz.ytsiz,
+                                        siz.ytosiz)
+    struct.pack_into('>IIIIIIII', raw, 6, xsiz, ysiz, xosiz, yosiz,
+                     xtsiz, ytsiz, xtosiz, ytosiz)
+    return bytes(raw)
+
+
+def plt_segments(lengths):
+    """PLT marker segments signalling the given packet lengths."""
+    segments = []
+    data = bytearray()
+    for coded in _packets.encode_packet_lengths(lengths):
+        if 3 + len(data) + len(coded) > MAX_SEGMENT_LENGTH:
+            segments.append(data)
+            data = bytearray()
+        data.extend(coded)
+    if len(data) > 0:
+        segments.append(data)
+
+    buffer = bytearray()
+    for zplt, data in enumerate(segments):
+        buffer.extend(struct.pack('>HHB', 0xff58, 3 + len(data), zplt % 256))
+        buffer.extend(data)
+    return bytes(buffer)
+
+
+def tlm_segments(tiles, psots):
+    """TLM marker segments signalling the given tile-part lengths.
+
+    The tile index and tile-part length are stored with 16 and 32 bits.
+    """
+    per_segment = (MAX_SEGMENT_LENGTH - 4) // 6
+    buffer = bytearray()
+    for ztlm, start in enumerate(range(0, len(tiles), per_segment)):
+        pairs = list(zip(tiles[start:start + per_segment],
+                         psots[start:start + per_segment]))
+        buffer.extend(struct.pack('>HHBB', 0xff55, 4 + 6 * len(pairs),
+                                  ztlm % 256, 0x60))
+        for tile, psot in pairs:
+            buffer.extend(struct.pack('>HI', tile, psot))
+    return bytes(buffer)
+
+
+def write_codestream(ofile, header, tile_parts, tlm=False, plt=False):
+    """Write a codestream from copied packets.
+
+    The tile-parts of each tile are numbered in the order given.  Packets
+    that start with an SOP marker segment are renumbered in sequence.
+
+    Parameters
+    ----------
+    ofile : file
+        Output file, positioned where the codestream is to start.
+    header : bytes
+        Marker segments of the main header, SOC excluded.
+    tile_parts : list
+        OutputTilePart objects in the order they are to be written.
+    tlm : bool, optional
+        If true, signal the tile-part lengths in TLM segments.
+    plt : bool, optional
+        If true, signal the packet lengths in PLT segments.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+    """
+    num_parts = Counter(tp.tile for tp in tile_parts)
+
+    headers, psots = [], []
+    for tile_part in tile_parts:
+        tp_header = tile_part.header
+        if plt:
+            tp_header += plt_segments(tile_part.lengths)
+        headers.append(tp_header)
+        psots.append(12 + len(tp_header) + 2 + int(tile_part.lengths.sum()))
+
+    start = ofile.tell()
+    ofile.write(b'\xff\x4f')
+    ofile.write(header)
+    if tlm:
+        ofile.write(tlm_segments([tp.tile for tp in tile_parts], psots))
+
+    tpsot = Counter()
+    nsop = Counter()
+    for tile_part, tp_header, psot in zip(tile_parts, headers, psots):
+        tile = tile_part.tile
+        ofile.write(struct.pack('>HHHIBB', 0xff90, 10, tile, psot,
+                                tpsot[tile], num_parts[tile]))
+        ofile.write(tp_header)
+        ofile.write(b'\xff\x93')
+        tpsot[tile] += 1
+        nsop[tile] = _copy_packets(ofile, tile_part, nsop[tile])
+
+    ofile.write(b'\xff\xd9')
+    return ofile.tell() - start
+
+
+def _copy_packets(ofile, tile_part, sequence):
+    """Copy the packets of a tile-part.
+
+    Packets that follow one another in the source are read together, up to
+    about _COPY_SIZE bytes at a time.
+
+    Returns
+    -------
+    int
+        Sequence number of the next packet of the tile.
+    """
+    offsets, lengths = tile_part.offsets, tile_part.lengths
+    if len(offsets) == 0:
+        return sequence
+
+    ends = np.cumsum(lengths)
+    breaks = ((offsets[1:] != offsets[:-1] + lengths[:-1]) |
+              (ends[1:] // _COPY_SIZE != ends[:-1] // _COPY_SIZE))
+    breaks = np.flatnonzero(breaks) + 1
+    for run in np.split(np.arange(len(offsets)), breaks):
+        first = offsets[run[0]]
+        tile_part.fptr.seek(first)
+        nbytes = int(offsets[run[-1]] + lengths[run[-1]] - first)
+        buffer = bytearray(tile_part.fptr.read(nbytes))
+        for pos in (offsets[run] - first).tolist():
+            # Bytes following 0xff within packets are below 0x90, so this
+            # can only be an SOP marker.
+            if buffer[pos:pos + 2] == b'\xff\x91':
+                struct.pack_into('>H', buffer, pos + 4, sequence % 65536)
+            sequence += 1
+        ofile.write(buffer)
+    return sequence
+
+
+def truncate(codestream, fptr, ofile, max_layers=None, reduce=0):
+    """Write a codestream with fewer quality layers or resolutions.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    fptr : file
+        The file holding the codestream.
+    ofile : file
+        Output file, positioned where the codestream is to start.
+    max_layers : int, optional
+        Number of quality layers to keep, all of them by default.
+    reduce : int, optional
+        Number of the highest resolutions to drop.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+
+    Raises
+    ------
+    IOError
+        If the packets of a tile cannot be located, or the coding parameters
+        do not allow the reduction.
+    """
+    params = _packets.CodingParameters(codestream)
+    siz = params.siz
+    csiz = siz.Csiz
+
+    if reduce < 0 or reduce > min(params.num_levels):
+        msg = ("Cannot drop {reduce} resolutions, the codestream has "
+               "{levels} decomposition levels.")
+        raise IOError(msg.format(reduce=reduce,
+                                 levels=min(params.num_levels)))
+    num_layers = params.num_layers
+    if max_layers is not None:
+        if max_layers < 1:
+            msg = "At least one quality layer must be kept."
+            raise IOError(msg)
+        num_layers = min(max_layers, num_layers)
+
+    def rewrite(segment):
+        """Rewrite a marker segment of a main or tile-part header."""
+        raw = raw_segment(fptr, segment)
+        if segment.marker_id == 'SIZ' and reduce > 0:
+            return reduce_siz(raw, siz, reduce)
+        elif segment.marker_id == 'COD':
+            return rewrite_cod(raw, layers=num_layers, reduce=reduce)
+        elif segment.marker_id == 'COC':
+            return rewrite_coc(raw, csiz, reduce=reduce)
+        elif segment.marker_id in ('QCD', 'QCC'):
+            return rewrite_quantization(raw, csiz, reduce=reduce)
+        return raw
+
+    header = b''.join(rewrite(segment)
+                      for segment in main_header(codestream)
+                      if segment.marker_id not in _INDEX_SEGMENTS)
+    has_tlm = any(seg.marker_id == 'TLM' for seg in codestream.segment)
+    has_plt = any(seg.marker_id in ('PLT', '0xff57')
+                  for seg in codestream.segment)
+
+    parts = _packets.scan_packet_lengths(codestream, fptr, params=params)
+    output = []
+    for tile in sorted(set(tp.tile for tp in parts)):
+        index = _locate_packets(codestream, tile, params, parts)
+
+        max_resolution = np.array(params.num_levels)[index['component']]
+        keep = ((index['layer'] < num_layers) &
+                (index['resolution'] <= max_resolution - reduce))
+
+        tps = [tp for tp in parts if tp.tile == tile]
+        pos = 0
+        for k, tile_part in enumerate(tps):
+            count = len(tile_part.packet_lengths)
+            wanted = keep[pos:pos + count]
+            packets = index[pos:pos + count][wanted]
+            pos += count
+            if len(packets) == 0 and k > 0:
+                # Nothing left of this tile-part.
+                continue
+            tp_header = b''.join(rewrite(segment)
+                                 for segment in tile_part.segments
+                                 if segment.marker_id not in _INDEX_SEGMENTS)
+            output.append(OutputTilePart(tile, tp_header, packets['offset'],
+                                         packets['length'], fptr))
+
+    return write_codestream(ofile, header, output, tlm=has_tlm, plt=has_plt)
+
+
+def reindex(codestream, fptr, ofile):
+    """Write a codestream with TLM and PLT segments.
+
+    Packet lengths not signalled in the codestream are found by reading the
+    packet headers.  The tile-parts and their packets are otherwise copied
+    unchanged.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    fptr : file
+        The file holding the codestream.
+    ofile : file
+        Output file, positioned where the codestream is to start.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+
+    Raises
+    ------
+    IOError
+        If the packets of a tile cannot be located.
+    """
+    params = _packets.CodingParameters(codestream)
+    parts = _packets.scan_packet_lengths(codestream, fptr, params=params)
+
+    for tile in sorted(set(tp.tile for tp in parts)):
+        _locate_packets(codestream, tile, params, parts)
+
+    header = b''.join(raw_segment(fptr, segment)
+                      for segment in main_header(codestream)
+                      if segment.marker_id not in _INDEX_SEGMENTS)
+
+    output = []
+    for tile_part in parts:
+        tp_header = b''.join(raw_segment(fptr, segment)
+                             for segment in tile_part.segments
+                             if segment.marker_id not in _INDEX_SEGMENTS)
+        output.append(OutputTilePart(tile_part.tile, tp_header,
+                                     tile_part.packet_offsets,
+                                     tile_part.packet_lengths, fptr))
+
+    return write_codestream(ofile, header, output, tlm=True, plt=True)
+
+
+def reorder(codestream, fptr, ofile, prog_order):
+    """Write a codestream with its packets in another progression order.
+
+    Each tile is written as a single tile-part.  Packets are copied one tile
+    at a time, so only their offsets and lengths are held in memory.
+
+    Parameters
+    ----------
+    codestream : Codestream
+        The fully parsed codestream.
+    fptr : file
+        The file holding the codestream.
+    ofile : file
+        Output file, positioned where the codestream is to start.
+    prog_order : int
+        The new progression order, such as core.RPCL.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+
+    Raises
+    ------
+    IOError
+        If the packets of a tile cannot be located.
+    """
+    params = _packets.CodingParameters(codestream)
+    target = _packets.CodingParameters(codestream)
+    target.progression_order = prog_order
+
+    def rewrite(segment):
+        """Rewrite a marker segment of a main or tile-part header."""
+        raw = raw_segment(fptr, segment)
+        if segment.marker_id == 'COD':
+            return rewrite_cod(raw, prog_order=prog_order)
+        return raw
+
+    header = b''.join(rewrite(segment)
+                      for segment in main_header(codestream)
+                      if segment.marker_id not in _INDEX_SEGMENTS)
+    has_tlm = any(seg.marker_id == 'TLM' for seg in codestream.segment)
+    has_plt = any(seg.marker_id in ('PLT', '0xff57')
+                  for seg in codestream.segment)
+
+    parts = _packets.scan_packet_lengths(codestream, fptr, params=params)
+    output = []
+    for tile in sorted(set(tp.tile for tp in parts)):
+        index = _locate_packets(codestream, tile, params, parts)
+        packets = target.packets(tile)
+
+        # Match the packets of both orders by sorting each on (layer,
+        # resolution, component, precinct).
+        names = ('precinct', 'component', 'resolution', 'layer')
+        source = np.lexsort([index[name] for name in names])
+        destination = np.lexsort([packets[name] for name in names])
+        order = np.empty(len(index), dtype=np.int64)
+        order[destination] = source
+        index = index[order]
+
+        tp_header = b''.join(rewrite(segment)
+                             for tile_part in parts if tile_part.tile == tile
+                             for segment in tile_part.segments
+                             if segment.marker_id not in _INDEX_SEGMENTS)
+        output.append(OutputTilePart(tile, tp_header, index['offset'],
+                                     index['length'], fptr))
+
+    return write_codestream(ofile, header, output, tlm=has_tlm, plt=has_plt)
+
+
+def stitch(ofile, extent, tiles, tlm=False):
+    """Write a codestream from tiles encoded as codestreams of their own.
+
+    Each tile codestream must hold a single tile, placed on the reference
+    grid just where it belongs in the full image, and must share the coding
+    parameters of the others.  Its packets are then exactly those of the
+    tile in the full image.
+
+    Parameters
+    ----------
+    ofile : file
+        Output file, positioned where the codestream is to start.
+    extent : tuple
+        (Xsiz, Ysiz, XOsiz, YOsiz, XTsiz, YTsiz, XTOsiz, YTOsiz) of the full
+        image.
+    tiles : list
+        Tuples (tile, codestream, fptr) giving the index of each tile in
+        the full image, its fully parsed codestream, and the file holding
+        it.
+    tlm : bool, optional
+        If true, signal the tile-part lengths in TLM segments.
+
+    Returns
+    -------
+    int
+        Number of bytes written.
+    """
+    _, codestream, fptr = tiles[0]
+
+    def rewrite(segment):
+        """Rewrite a marker segment of the main header."""
+        raw = raw_segment(fptr, segment)
+        if segment.marker_id == 'SIZ':
+            raw = bytearray(raw)
+            struct.pack_into('>IIIIIIII', raw, 6, *extent)
+            raw = bytes(raw)
+        return raw
+
+    header = b''.join(rewrite(segment)
+                      for segment in main_header(codestream)
+                      if segment.marker_id not in _INDEX_SEGMENTS)
+
+    output = []
+    for tile, codestream, fptr in tiles:
+        for tile_part in _packets.tile_parts(codestream):
+            # The data of each tile-part is copied whole.  The encoder
+            # writes one tile-part per tile, so any SOP marker segment
+            # found at its start is that of the first packet.
+            tp_header = b''.join(raw_segment(fptr, segment)
+                                 for segment in tile_part.segments
+                                 if segment.marker_id not in _INDEX_SEGMENTS)
+            lengths = np.array([tile_part.end - tile_part.data_offset])
+            output.append(OutputTilePart(tile, tp_header,
+                                         np.array([tile_part.data_offset]),
+                                         lengths, fptr))
+
+    return write_codestream(ofile, header, output, tlm=tlm)
+
+
+def _locate_packets(codestream, tile, params, parts):
+    """Locate the packets of a tile, see _packets.packet_index.
+
+    Raises
+    ------
+    IOError
+        If they cannot be located.
+    """
+    index = _packets.packet_index(codestream, tile, params=params,
+                                  parts=parts)
+    if index is None:
+        msg = ("The packets of tile {tile} cannot be located.  POC, "
+               "packed packet headers, tile-specific coding styles, and "
+               "incomplete tiles are not supported.")
+        raise IOError(msg.format(tile=tile))
+    return index
@@ -0,0 +1,175 @@
+"""
+Lazily indexed views of JPEG 2000 images.
+"""
+# Third party library imports ...
+import numpy as np
+
+
+class Jp2kView(object):
+    """Part of a JPEG 2000 image, decoded only when its data are needed.
+
+    Indexing a view gives another view.  The index is applied to the area,
+    resolution, and components to be decoded rather than to decoded data,
+    so that only the final area is decoded, just once.  As when slicing a
+    Jp2k object, a row and column step (a power of 2) selects a lower
+    resolution rather than every so many samples.  An integer row or column
+    index decodes the data right away.
+
+    Attributes
+    ----------
+    shape : tuple
+        Dimensions of the data.
+    dtype : numpy.dtype
+        Datatype of the data.
+    ndim, size, nbytes : int
+        Number of dimensions, number of samples, and size in bytes of the
+        data.
+
+    Examples
+    --------
+    >>> import glymur, numpy as np
+    >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+    >>> view = jp2.lazy[::2, ::2][100:200, 300:500]
+    >>> view.shape
+    (100, 200, 3)
+    >>> image = np.asarray(view)
+    """
+    def __init__(self, jp2k, rows=None, cols=None, bands=None):
+        """
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The image.
+        rows, cols : slice, optional
+            Rows and columns of the full resolution image, as in Jp2k
+            slicing, with explicit start, stop, and step.  Defaults to all of
+            them.
+        bands : list or int, optional
+            Indices of the components, or a single index to drop the third
+            dimension.  Defaults to all of them.
+        """
+        shape = jp2k.shape
+        self._jp2k = jp2k
+        self._rows = slice(0, shape[0], 1) if rows is None else rows
+        self._cols = slice(0, shape[1], 1) if cols is None else cols
+        if bands is None and len(shape) == 3:
+            bands = list(range(shape[2]))
+        self._bands = bands
+
+    def __repr__(self):
+        def fmt(s):
+            return '{0}:{1}:{2}'.format(s.start, s.stop, s.step)
+
+        index = [fmt(self._rows), fmt(self._cols)]
+        if isinstance(self._bands, int):
+            index.append(str(self._bands))
+        elif self._bands is not None:
+            everything = list(range(self._jp2k.shape[2]))
+            index.append(':' if self._bands == everything
+                         else str(self._bands))
+        return '{0!r}.lazy[{1}]'.format(self._jp2k, ', '.join(index))
+
+    @property
+    def shape(self):
+        shape = (_length(self._rows), _length(self._cols))
+        if isinstance(self._bands, list):
+            shape += (len(self._bands),)
+        return shape
+
+    @property
+    def dtype(self):
+        return self._jp2k.dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    def __array__(self, dtype=None, copy=None):
+        """Decode the image for numpy.asarray and friends.
+
+        The decoded image is always a new array, so it cannot be had without
+        a copy (copy=False), and needs no further copy otherwise.
+        """
+        if copy is False:
+            msg = "Decoding the image always makes a copy."
+            raise ValueError(msg)
+        image = self._decode()
+        return image if dtype is None else image.astype(dtype, copy=False)
+
+    def __getitem__(self, index):
+        """
+        Compose another index with this one.
+        """
+        if not isinstance(index, tuple):
+            index = (index,)
+        if any(x is Ellipsis for x in index):
+            pos = index.index(Ellipsis)
+            fill = (slice(None),) * (self.ndim - len(index) + 1)
+            index = index[:pos] + fill + index[pos + 1:]
+        if len(index) > self.ndim:
+            raise IndexError("Too many indices.")
+        index += (slice(None),) * (self.ndim - len(index))
+
+        if any(isinstance(x, (int, np.integer)) for x in index[:2]):
+            # Rows and columns cannot be picked out at a lower resolution.
+            return np.asarray(self)[index]
+
+        rows, rows_step = self._compose(self._rows, index[0])
+        cols, cols_step = self._compose(self._cols, index[1])
+        if rows_step != cols_step:
+            msg = "Row and column strides must be the same."
+            raise IndexError(msg)
+
+        bands = self._bands
+        if len(index) == 3:
+            bands = np.array(bands)[index[2]].tolist()
+
+        return Jp2kView(self._jp2k, rows=rows, cols=cols, bands=bands)
+
+    def _compose(self, outer, index):
+        """Apply a slice of the rows or columns of this view.
+
+        Returns
+        -------
+        tuple
+            The new full resolution slice and the step of the index.
+        """
+        start, stop, step = index.indices(_length(outer))
+        if step < 1 or step & (step - 1):
+            msg = "Row and column strides must be powers of 2."
+            raise IndexError(msg)
+
+        # Row k of the view is row (first + k) of the image at the reduced
+        # resolution, and so row (first + k) * outer.step at full resolution.
+        first = -(-outer.start // outer.step)
+        stop = max(start, stop)
+        new = slice((first + start) * outer.step,
+                    min((first + stop) * outer.step, outer.stop),
+                    outer.step * step)
+        return new, step
+
+    def _decode(self):
+        """Decode the data of the view."""
+        if self.size == 0:
+            return np.empty(self.shape, dtype=self.dtype)
+
+        if self._bands is None:
+            return self._jp2k[self._rows, self._cols]
+
+        bands = self._bands
+        if bands == list(range(self._jp2k.shape[2])):
+            bands = slice(None)
+        return self._jp2k[self._rows, self._cols, bands]
+
+
+def _length(index):
+    """Number of rows or columns selected by a full resolution slice."""
+    return max(0, -(-index.stop // index.step) - -(-index.start // index.step))
@@ -0,0 +1,798 @@
+"""Codec backends.
+
+A backend wraps the library that does the actual JPEG 2000 coding.  Each
+Jp2k object chooses its backend once, so library version checks are not
+repeated every time that an image is read or written.
+"""
+# Standard library imports ...
+try:
+    from contextlib import ExitStack
+except ImportError:
+    # v2.7, third party library import ...
+    from contextlib2 import ExitStack
+import ctypes
+import mmap
+import struct
+import warnings
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+from . import version
+from .lib import openjpeg as opj, openjp2 as opj2
+
+
+class Backend(object):
+    """Interface between Jp2k and a JPEG 2000 codec.
+
+    Subclasses wrap a specific codec library.  The main header of the
+    codestream is always parsed by glymur itself, so only the decoding of
+    image data and the encoding need be provided.
+
+    Attributes
+    ----------
+    name : str
+        Short name of the backend.
+    version : str
+        Version of the codec library.
+    can_decode, can_encode : bool
+        Whether or not image data can be decoded or encoded at all.
+    can_decode_tiles, can_decode_layers, can_decode_bands : bool
+        Whether or not individual tiles or quality layers can be decoded,
+        and whether or not components with differing subsampling factors
+        can be decoded.
+    can_decode_components : bool
+        Whether or not the codec can skip components that are not wanted.
+        Otherwise all components are decoded and the wanted ones picked out
+        afterwards.
+    can_encode_cinema : bool
+        Whether or not the Cinema2K and Cinema4K profiles can be encoded.
+    """
+    name = None
+
+    def __init__(self, version_str=None):
+        """
+        Parameters
+        ----------
+        version_str : str, optional
+            Version of the codec library.  If not provided, the library
+            itself is queried.
+        """
+        if version_str is None:
+            version_str = self._library_version()
+        self.version = version_str
+        self._version_tuple = version._version_tuple(version_str)
+
+        self.can_decode = self._has_version(1, 5)
+        self.can_encode = self._has_version(1, 5)
+        self.can_decode_tiles = False
+        self.can_decode_layers = False
+        self.can_decode_bands = False
+        self.can_decode_components = False
+        self.can_encode_cinema = False
+
+    def __repr__(self):
+        msg = "{0}('{1}')".format(self.__class__.__name__, self.version)
+        return msg
+
+    def _has_version(self, *minimum):
+        """Is the library at least as recent as the given version?"""
+        return self._version_tuple >= list(minimum)
+
+    def _library_version(self):
+        """Query the library for its version."""
+        return version.openjpeg_version
+
+    def default_decoder_parameters(self):
+        """Create a decompression parameters structure with default values.
+        """
+        raise NotImplementedError()
+
+    def default_encoder_parameters(self):
+        """Create a compression parameters structure with default values.
+        """
+        raise NotImplementedError()
+
+    def create_comptparms(self, num_comps):
+        """Create an array of image component parameter structures.
+        """
+        raise NotImplementedError()
+
+    def decode_header(self, jp2k):
+        """Parse the main header of the codestream.
+
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The JPEG 2000 file.
+
+        Returns
+        -------
+        Codestream
+            Object describing the main header.
+        """
+        return jp2k.get_codestream(header_only=True)
+
+    def decode_region(self, jp2k, dparams, area=None, native=False,
+                      components=None):
+        """Decode an image, or a rectangular region of it.
+
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The JPEG 2000 file.
+        dparams : ctypes struct
+            Decompression parameters.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        native : bool, optional
+            If true, return read-only views of the library's own int32
+            component planes.
+        components : list, optional
+            Sorted indices of the only components wanted.
+
+        Returns
+        -------
+        ndarray or list
+            Either the image as an ndarray or a list of ndarrays, each item
+            corresponding to one band.
+        """
+        raise NotImplementedError()
+
+    def decode_tile(self, jp2k, dparams, tile, native=False, components=None):
+        """Decode a single tile.
+
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The JPEG 2000 file.
+        dparams : ctypes struct
+            Decompression parameters.
+        tile : int
+            Number of tile to decode.
+        native : bool, optional
+            If true, return read-only views of the library's own int32
+            component planes.
+        components : list, optional
+            Sorted indices of the only components wanted.
+
+        Returns
+        -------
+        ndarray or list
+            Either the tile as an ndarray or a list of ndarrays, each item
+            corresponding to one band.
+        """
+        raise NotImplementedError()
+
+    def encode(self, jp2k, img_array, verbose=False):
+        """Encode an image.
+
+        The compression and component parameters must already be populated.
+
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The JPEG 2000 file to be written.
+        img_array : ndarray
+            Image data of shape (rows, columns, components).
+        verbose : bool, optional
+            Print informational messages produced by the codec.
+        """
+        raise NotImplementedError()
+
+    def encode_tiles(self, jp2k, tiles, verbose=False):
+        """Encode an image one tile at a time.
+
+        The compression and component parameters must already be populated,
+        describing the entire image.
+
+        Parameters
+        ----------
+        jp2k : glymur.Jp2k
+            The JPEG 2000 file to be written.
+        tiles : iterable
+            Image data of each tile in raster order, each of shape
+            (rows, columns, components).
+        verbose : bool, optional
+            Print informational messages produced by the codec.
+        """
+        raise NotImplementedError()
+
+
+class _DecodedImage(object):
+    """Image decoded by the codec library.
+
+    The library's image structure is destroyed once this object is no longer
+    referenced, which includes by any arrays viewing the component data.
+
+    Attributes
+    ----------
+    image : ctypes pointer to ImageType
+        The image structure.
+    """
+    def __init__(self, image, destroy):
+        """
+        Parameters
+        ----------
+        image : ctypes pointer to ImageType
+            The image structure.
+        destroy : function
+            Library function that frees the image structure.
+        """
+        self.image = image
+        self._destroy = destroy
+
+    def __del__(self):
+        if self.image:
+            self._destroy(self.image)
+
+    @property
+    def contents(self):
+        return self.image.contents
+
+    def component(self, k, dtype=np.int32, writeable=True):
+        """View the data of a single component without copying it.
+
+        Parameters
+        ----------
+        k : int
+            Index of the component.
+        dtype : data-type, optional
+            Either int32 or uint32, the latter reinterpreting the samples.
+        writeable : bool, optional
+            Whether or not the view may be modified.
+
+        Returns
+        -------
+        ndarray
+            2D array of the component samples.
+        """
+        component = self.image.contents.comps[k]
+        address = ctypes.addressof(component.data.contents)
+        view = _ComponentView(self, address, (component.h, component.w),
+                              dtype, writeable)
+        return np.asarray(view)
+
+
+class _ComponentView(object):
+    """Expose component data to numpy, keeping the decoded image alive.
+    """
+    def __init__(self, owner, address, shape, dtype, writeable):
+        self._owner = owner
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': shape,
+            'typestr': np.dtype(dtype).str,
+            'data': (address, not writeable),
+        }
+
+
+class NumPyBackend(Backend):
+    """Backend for when no codec library is available.
+
+    Only the metadata can be read.
+    """
+    name = 'numpy'
+
+    def __init__(self, version_str='0.0.0'):
+        Backend.__init__(self, version_str)
+        self.can_decode = False
+        self.can_encode = False
+
+
+class OpenJPEGBackend(Backend):
+    """Backend for version 1.5 of the OpenJPEG library.
+    """
+    name = 'openjpeg'
+
+    def _library_version(self):
+        return opj.version()
+
+    def default_decoder_parameters(self):
+        dparams = opj.DecompressionParametersType()
+        opj.set_default_decoder_parameters(ctypes.byref(dparams))
+        return dparams
+
+    def default_encoder_parameters(self):
+        return opj.set_default_encoder_parameters()
+
+    def create_comptparms(self, num_comps):
+        return (opj.ImageComptParmType * num_comps)()
+
+    def _event_manager(self, verbose):
+        """Setup the info, warning, and error handlers.
+
+        Always use the warning and error handler.  Use of an info handler is
+        optional.
+        """
+        event_mgr = opj.EventMgrType()
+        handler = ctypes.cast(_INFO_CALLBACK, ctypes.c_void_p)
+        event_mgr.info_handler = handler if verbose else None
+        event_mgr.warning_handler = ctypes.cast(_WARNING_CALLBACK,
+                                                ctypes.c_void_p)
+        event_mgr.error_handler = ctypes.cast(_ERROR_CALLBACK,
+                                              ctypes.c_void_p)
+        return event_mgr
+
+    def decode_region(self, jp2k, dparams, area=None, native=False,
+                      components=None):
+        # The 1.5 library cannot decode a region.  If the image is tiled, only
+        # the tiles intersecting the area are handed to the library,
+        # otherwise the entire image must be decoded.  Either way, the
+        # result must then be cropped.
+        subset = None
+        if area is not None:
+            subset = _tile_subset(jp2k, area, dparams.cp_reduce)
+
+        with ExitStack() as stack:
+            if subset is None and not jp2k._source.is_local:
+                codec_format = dparams.decod_format
+                origin = (0, 0)
+                src = bytearray(jp2k._source.read(0, jp2k.length))
+            elif subset is None:
+                codec_format = dparams.decod_format
+                origin = (0, 0)
+
+                # Let the library read straight from the file rather than
+                # from a copy of it.
+                fptr = stack.enter_context(open(jp2k.filename, 'rb'))
+                src = mmap.mmap(fptr.fileno(), 0, access=mmap.ACCESS_COPY)
+                stack.callback(src.close)
+            else:
+                codec_format = opj2.CODEC_J2K
+                src, origin = subset
+
+            try:
+                dinfo = opj.create_decompress(codec_format)
+
+                event_mgr = self._event_manager(jp2k.verbose)
+                opj.set_event_mgr(dinfo, ctypes.byref(event_mgr))
+
+                opj.setup_decoder(dinfo, dparams)
+
+                cio = opj.cio_open(dinfo, src)
+
+                raw_image = _DecodedImage(opj.decode(dinfo, cio),
+                                         opj.image_destroy)
+
+                stack.callback(opj.destroy_decompress, dinfo)
+                stack.callback(opj.cio_close, cio)
+
+                image = jp2k._extract_image(raw_image, native=native,
+                                            components=components)
+
+            except ValueError:
+                opj2.check_error(0)
+
+        if area is not None:
+            extent = 2 ** dparams.cp_reduce
+
+            area = [int(round(float(x) / extent + 2 ** -20)) for x in area]
+            rows = slice(area[0] - origin[0], area[2] - origin[0], None)
+            cols = slice(area[1] - origin[1], area[3] - origin[1], None)
+            image = image[rows, cols]
+
+        return image
+
+    def encode(self, jp2k, img_array, verbose=False):
+        with ExitStack() as stack:
+            image = opj.image_create(jp2k._comptparms, jp2k._colorspace)
+            stack.callback(opj.image_destroy, image)
+
+            jp2k._populate_image_struct(image, img_array)
+
+            cinfo = opj.create_compress(jp2k._cparams.codec_fmt)
+            stack.callback(opj.destroy_compress, cinfo)
+
+            event_mgr = self._event_manager(verbose)
+            opj.set_event_mgr(cinfo, ctypes.byref(event_mgr))
+
+            opj.setup_encoder(cinfo, ctypes.byref(jp2k._cparams), image)
+
+            cio = opj.cio_open(cinfo)
+            stack.callback(opj.cio_close, cio)
+
+            if not opj.encode(cinfo, cio, image):
+                raise IOError("Encode error.")
+
+            pos = opj.cio_tell(cio)
+
+            blob = ctypes.string_at(cio.contents.buffer, pos)
+            fptr = open(jp2k.filename, 'wb')
+            stack.callback(fptr.close)
+            fptr.write(blob)
+
+
+class _CallbackStream(object):
+    """Stream that feeds the openjp2 decoder through Python callbacks.
+
+    Subclasses implement _copy, which copies bytes at the current position
+    into the library's buffer and returns how many it copied.
+
+    Attributes
+    ----------
+    stream : STREAM_TYPE_P
+        The stream to be handed to the library.
+    """
+    def __init__(self, length, buffer_size):
+        self._length = length
+        self._pos = 0
+
+        # The library only holds on to the function pointers, so the
+        # callback objects must be kept alive here.
+        self._read_func = opj2.STREAM_READ_FUNC(self._read)
+        self._skip_func = opj2.STREAM_SKIP_FUNC(self._skip)
+        self._seek_func = opj2.STREAM_SEEK_FUNC(self._seek)
+
+        self.stream = opj2.stream_create(buffer_size, True)
+        opj2.stream_set_read_function(self.stream, self._read_func)
+        opj2.stream_set_skip_function(self.stream, self._skip_func)
+        opj2.stream_set_seek_function(self.stream, self._seek_func)
+        opj2.stream_set_user_data_length(self.stream, self._length)
+
+    def _read(self, buffer, nbytes, _):
+        if self._pos >= self._length:
+            return ctypes.c_size_t(-1).value
+        nbytes = min(nbytes, self._length - self._pos)
+        nbytes = self._copy(buffer, nbytes)
+        if nbytes == 0:
+            # The file is shorter than it claimed to be.
+            return ctypes.c_size_t(-1).value
+        self._pos += nbytes
+        return nbytes
+
+    def _skip(self, nbytes, _):
+        if self._pos + nbytes < 0:
+            return -1
+        self._pos += nbytes
+        return nbytes
+
+    def _seek(self, pos, _):
+        if pos < 0:
+            return opj2.FALSE
+        self._pos = pos
+        return opj2.TRUE
+
+
+class _SourceStream(_CallbackStream):
+    """Stream that feeds the openjp2 decoder from a byte source.
+
+    The library skips over the tile-parts it does not need, so those are
+    never fetched.
+    """
+    def __init__(self, source):
+        """
+        Parameters
+        ----------
+        source : glymur.source.ByteSource
+            Where the bytes of the file come from.
+        """
+        self._source = source
+        _CallbackStream.__init__(self, source.size,
+                                 getattr(source, 'block_size', 2 ** 16))
+
+    def _copy(self, buffer, nbytes):
+        data = self._source.read(self._pos, nbytes)
+        ctypes.memmove(buffer, data, len(data))
+        return len(data)
+
+
+class OpenJP2Backend(Backend):
+    """Backend for versions 2.x of the OpenJPEG library.
+    """
+    name = 'openjp2'
+
+    def __init__(self, version_str=None):
+        Backend.__init__(self, version_str)
+        self.can_decode_tiles = True
+        self.can_decode_layers = self._has_version(2, 1)
+        self.can_decode_bands = self._has_version(2, 1)
+        self.can_decode_components = hasattr(opj2.OPENJP2,
+                                             'opj_set_decoded_components')
+        self.can_encode_cinema = self._has_version(2, 1)
+
+    def _library_version(self):
+        return opj2.version()
+
+    def default_decoder_parameters(self):
+        return opj2.set_default_decoder_parameters()
+
+    def default_encoder_parameters(self):
+        return opj2.set_default_encoder_parameters()
+
+    def create_comptparms(self, num_comps):
+        return (opj2.ImageComptParmType * num_comps)()
+
+    def _set_handlers(self, codec, verbose):
+        """Setup the info, warning, and error handlers."""
+        opj2.set_error_handler(codec, _ERROR_CALLBACK)
+        opj2.set_warning_handler(codec, _WARNING_CALLBACK)
+        opj2.set_info_handler(codec, _INFO_CALLBACK if verbose else None)
+
+    def _decode(self, jp2k, dparams, area=None, tile=None, native=False,
+                components=None):
+        """Run the decoder over either a region or a tile."""
+        with ExitStack() as stack:
+            if jp2k._source.is_local:
+                filename = jp2k.filename
+                stream = opj2.stream_create_default_file_stream(filename,
+                                                                True)
+            else:
+                feed = _SourceStream(jp2k._source)
+                stream = feed.stream
+            stack.callback(opj2.stream_destroy, stream)
+            codec = opj2.create_decompress(dparams.decod_format)
+            stack.callback(opj2.destroy_codec, codec)
+
+            self._set_handlers(codec, jp2k.verbose)
+
+            opj2.setup_decoder(codec, dparams)
+            raw_image = _DecodedImage(opj2.read_header(stream, codec),
+                                     opj2.image_destroy)
+
+            if (((components is not None) and
+                 self.can_decode_components and
+                 jp2k._components_are_independent())):
+                opj2.set_decoded_components(codec, components)
+
+            if tile is not None:
+                opj2.get_decoded_tile(codec, stream, raw_image.image, tile)
+            else:
+                if area is None:
+                    area = (0, 0, 0, 0)
+                opj2.set_decode_area(codec, raw_image.image,
+                                     area[1], area[0], area[3], area[2])
+                opj2.decode(codec, stream, raw_image.image)
+
+            opj2.end_decompress(codec, stream)
+
+            image = jp2k._extract_image(raw_image, native=native,
+                                        components=components)
+
+        return image
+
+    def decode_region(self, jp2k, dparams, area=None, native=False,
+                      components=None):
+        return self._decode(jp2k, dparams, area=area, native=native,
+                            components=components)
+
+    def decode_tile(self, jp2k, dparams, tile, native=False, components=None):
+        return self._decode(jp2k, dparams, tile=tile, native=native,
+                            components=components)
+
+    def encode(self, jp2k, img_array, verbose=False):
+        with ExitStack() as stack:
+            image = opj2.image_create(jp2k._comptparms, jp2k._colorspace)
+            stack.callback(opj2.image_destroy, image)
+
+            jp2k._populate_image_struct(image, img_array)
+
+            codec = opj2.create_compress(jp2k._cparams.codec_fmt)
+            stack.callback(opj2.destroy_codec, codec)
+
+            self._set_handlers(codec, verbose)
+
+            opj2.setup_encoder(codec, jp2k._cparams, image)
+
+            strm = opj2.stream_create_default_file_stream(jp2k.filename,
+                                                          False)
+            stack.callback(opj2.stream_destroy, strm)
+
+            opj2.start_compress(codec, image, strm)
+            opj2.encode(codec, strm)
+            opj2.end_compress(codec, strm)
+
+    def encode_tiles(self, jp2k, tiles, verbose=False):
+        # The library expects each tile to be arranged by component, with
+        # each sample occupying the smallest sufficient number of bytes.
+        dtype = np.uint8 if jp2k._comptparms[0].prec <= 8 else np.uint16
+
+        with ExitStack() as stack:
+            image = opj2.image_tile_create(jp2k._comptparms,
+                                           jp2k._colorspace)
+            stack.callback(opj2.image_destroy, image)
+
+            jp2k._populate_image_extent(image, jp2k._comptparms[0].h,
+                                        jp2k._comptparms[0].w)
+
+            codec = opj2.create_compress(jp2k._cparams.codec_fmt)
+            stack.callback(opj2.destroy_codec, codec)
+
+            self._set_handlers(codec, verbose)
+
+            opj2.setup_encoder(codec, jp2k._cparams, image)
+
+            strm = opj2.stream_create_default_file_stream(jp2k.filename,
+                                                          False)
+            stack.callback(opj2.stream_destroy, strm)
+
+            opj2.start_compress(codec, image, strm)
+            for tile_index, tile in enumerate(tiles):
+                if tile.ndim == 2:
+                    tile = tile[:, :, np.newaxis]
+                data = np.ascontiguousarray(tile.transpose(2, 0, 1),
+                                            dtype=dtype)
+                opj2.write_tile(codec, tile_index, data, data.nbytes, strm)
+            opj2.end_compress(codec, strm)
+
+
+def _tile_subset(jp2k, area, rlevel=0):
+    """Extract the tiles intersecting an area into a new codestream.
+
+    The reference grid of the new codestream is shrunk to cover just those
+    tiles, which are renumbered accordingly.
+
+    Parameters
+    ----------
+    jp2k : glymur.Jp2k
+        The JPEG 2000 file.
+    area : tuple
+        Specifies decoding image area,
+        (first_row, first_col, last_row, last_col)
+    rlevel : int, optional
+        Factor by which the resolution will be reduced.
+
+    Returns
+    -------
+    tuple or None
+        The new codestream, and the (row, column) position of its upper left
+        corner in the image at the reduced resolution.  None if every tile
+        intersects the area, or if the image cannot be safely split.
+    """
+    if ((jp2k._codec_format == opj2.CODEC_JP2 and
+         not jp2k.ignore_pclr_cmap_cdef)):
+        # The palette and channel definitions must be applied by the library
+        # to the JP2 file as a whole.
+        if any(jp2k.find('jp2h/' + box_id) is not None
+               for box_id in ('pclr', 'cmap', 'cdef')):
+            return None
+
+    cstr = jp2k.codestream
+    if any(segment.marker_id == 'PPM' for segment in cstr.segment):
+        # The packet headers of all the tiles are in the main header.
+        return None
+
+    siz = cstr.segment[1]
+    if any(x != 1 for x in siz.xrsiz + siz.yrsiz):
+        return None
+
+    # Tile boundaries must still be pixel boundaries at reduced resolution.
+    extent = 2 ** rlevel
+    grid = (siz.xosiz, siz.yosiz, siz.xtsiz, siz.ytsiz, siz.xtosiz,
+            siz.ytosiz)
+    if any(x % extent for x in grid):
+        return None
+
+    x0 = siz.xosiz + area[1]
+    y0 = siz.yosiz + area[0]
+    x1 = min(siz.xosiz + area[3], siz.xsiz)
+    y1 = min(siz.yosiz + area[2], siz.ysiz)
+    if x1 <= x0 or y1 <= y0:
+        return None
+
+    num_tile_cols = -(-(siz.xsiz - siz.xtosiz) // siz.xtsiz)
+    num_tile_rows = -(-(siz.ysiz - siz.ytosiz) // siz.ytsiz)
+    col0 = (x0 - siz.xtosiz) // siz.xtsiz
+    col1 = (x1 - 1 - siz.xtosiz) // siz.xtsiz
+    row0 = (y0 - siz.ytosiz) // siz.ytsiz
+    row1 = (y1 - 1 - siz.ytosiz) // siz.ytsiz
+    num_cols = col1 - col0 + 1
+    if num_cols * (row1 - row0 + 1) == num_tile_cols * num_tile_rows:
+        return None
+
+    # The main header ends where the first tile-part begins.
+    segment = cstr.segment[-1]
+    header_end = segment.offset + 2 + segment.length
+    codestream_end = cstr.offset + cstr.length
+
+    with jp2k._source.open() as fptr:
+        fptr.seek(cstr.offset)
+        header = bytearray(fptr.read(header_end - cstr.offset))
+
+        tile_parts = []
+        offset = header_end
+        while True:
+            fptr.seek(offset)
+            read_buffer = fptr.read(12)
+            if len(read_buffer) < 12:
+                break
+            marker_id, _, isot, psot = struct.unpack('>HHHI',
+                                                     read_buffer[:10])
+            if marker_id != 0xff90:
+                # Must be EOC.
+                break
+            if psot == 0:
+                # The last tile-part extends to the EOC marker.
+                psot = codestream_end - offset - 2
+
+            row, col = divmod(isot, num_tile_cols)
+            if row0 <= row <= row1 and col0 <= col <= col1:
+                tile_part = bytearray(read_buffer)
+                tile_part.extend(fptr.read(psot - 12))
+                isot = (row - row0) * num_cols + (col - col0)
+                struct.pack_into('>H', tile_part, 4, isot)
+                tile_parts.append(tile_part)
+
+            offset += psot
+
+    xtosiz = siz.xtosiz + col0 * siz.xtsiz
+    ytosiz = siz.ytosiz + row0 * siz.ytsiz
+    xosiz = max(siz.xosiz, xtosiz)
+    yosiz = max(siz.yosiz, ytosiz)
+    xsiz = min(siz.xsiz, siz.xtosiz + (col1 + 1) * siz.xtsiz)
+    ysiz = min(siz.ysiz, siz.ytosiz + (row1 + 1) * siz.ytsiz)
+
+    # Skip the marker, Lsiz, and Rsiz.
+    struct.pack_into('>8I', header, siz.offset - cstr.offset + 6,
+                     xsiz, ysiz, xosiz, yosiz, siz.xtsiz, siz.ytsiz,
+                     xtosiz, ytosiz)
+
+    # Tile-part lengths and packet lengths in the main header describe every
+    # tile of the image, not just those kept.
+    for segment in reversed(cstr.segment):
+        if segment.marker_id in ('TLM', '0xff57'):
+            start = segment.offset - cstr.offset
+            del header[start:start + 2 + segment.length]
+
+    codestream = bytes(header) + b''.join(tile_parts) + b'\xff\xd9'
+    origin = ((yosiz - siz.yosiz) // extent, (xosiz - siz.xosiz) // extent)
+    return codestream, origin
+
+
+# Backends are cheap, but there is no need to construct them over and over.
+_BACKENDS = {}
+
+
+def select_backend():
+    """Choose the backend appropriate for the installed OpenJPEG library.
+
+    Returns
+    -------
+    Backend
+        OpenJP2Backend if version 2.x of the library is available,
+        OpenJPEGBackend for version 1.x, and NumPyBackend if no library is
+        available.
+    """
+    version_str = version.openjpeg_version
+    major = version.openjpeg_version_tuple[0]
+    if opj2.OPENJP2 is not None and major >= 2:
+        cls = OpenJP2Backend
+    elif major >= 1:
+        cls = OpenJPEGBackend
+    else:
+        cls = NumPyBackend
+
+    key = (cls, version_str)
+    if key not in _BACKENDS:
+        _BACKENDS[key] = cls(version_str)
+    return _BACKENDS[key]
+
+
+def _default_error_handler(msg, _):
+    """Default error handler callback for libopenjp2."""
+    msg = "OpenJPEG library error:  {0}".format(msg.decode('utf-8').rstrip())
+    opj2.set_error_message(msg)
+
+
+def _default_info_handler(msg, _):
+    """Default info handler callback."""
+    print("[INFO] {0}".format(msg.decode('utf-8').rstrip()))
+
+
+def _default_warning_handler(library_msg, _):
+    """Default warning handler callback."""
+    library_msg = library_msg.decode('utf-8').rstrip()
+    msg = "OpenJPEG library warning:  {0}".format(library_msg)
+    warnings.warn(msg, UserWarning)
+
+
+# Setup the default callback handlers.  See the callback functions subsection
+# in the ctypes section of the Python documentation for a solid explanation of
+# what's going on here.
+_CMPFUNC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p)
+
+_ERROR_CALLBACK = _CMPFUNC(_default_error_handler)
+_INFO_CALLBACK = _CMPFUNC(_default_info_handler)
+_WARNING_CALLBACK = _CMPFUNC(_default_warning_handler)
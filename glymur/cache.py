@@ -0,0 +1,122 @@
+"""Caches shared by all Jp2k objects in the process.
+
+Decoded tiles are kept in the tiles cache as long as the cache.tiles option
+allows, so that reading overlapping windows of a tiled image decodes each
+tile just once.  The parsed metadata of recently opened files is kept in the
+headers cache as long as the cache.headers option allows, so that opening
+such a file again does not parse it.
+"""
+# Standard library imports ...
+from collections import OrderedDict
+import threading
+
+
+class LRUCache(object):
+    """Least recently used items, up to a total size in bytes.
+
+    All methods may be called from several threads at once.
+
+    Attributes
+    ----------
+    hits : int
+        Number of lookups that found their item.
+    misses : int
+        Number of lookups that did not.
+    nbytes : int
+        Total size of the items held.
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        msg = ("glymur.cache.LRUCache(items={0}, nbytes={1}, hits={2}, "
+               "misses={3})")
+        return msg.format(len(self), self.nbytes, self.hits, self.misses)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        """Look up an item, marking it as the most recently used.
+
+        Returns
+        -------
+        object
+            The item, or None if it is not held.
+        """
+        with self._lock:
+            try:
+                value, nbytes = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return None
+            self._items[key] = value, nbytes
+            self.hits += 1
+            return value
+
+    def put(self, key, value, nbytes, max_bytes):
+        """Add an item, evicting the least recently used ones as needed.
+
+        Parameters
+        ----------
+        key : hashable
+            Identifies the item.
+        value : object
+            The item.
+        nbytes : int
+            Size of the item.
+        max_bytes : int
+            Total size not to be exceeded.  An item larger than this is not
+            kept at all.
+        """
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            if nbytes <= max_bytes:
+                self._items[key] = value, nbytes
+                self.nbytes += nbytes
+            self._evict(max_bytes)
+
+    def _evict(self, max_bytes):
+        """Drop the least recently used items until within max_bytes."""
+        while self.nbytes > max_bytes:
+            _, (_, nbytes) = self._items.popitem(last=False)
+            self.nbytes -= nbytes
+
+    def discard(self, predicate):
+        """Drop the items whose keys satisfy a predicate.
+
+        Parameters
+        ----------
+        predicate : callable
+            Takes a key, returning True if its item is to be dropped.
+        """
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                _, nbytes = self._items.pop(key)
+                self.nbytes -= nbytes
+
+    def clear(self):
+        """Drop all items and reset the counters."""
+        with self._lock:
+            self._items.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# Decoded tiles, keyed by file identity, tile, reduction, layer, and
+# components.
+tiles = LRUCache()
+
+# Parsed metadata, keyed by file identity and the options it was parsed with.
+# Each file counts as one byte.
+headers = LRUCache()
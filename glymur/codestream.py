@@ -15,6 +15,7 @@ from .core import (LRCP, RLCP, RPCL, PCRL, CPRL,
                    WAVELET_XFORM_9X7_IRREVERSIBLE,
                    WAVELET_XFORM_5X3_REVERSIBLE)
 from .lib import openjp2 as opj2
+from ._packets import decode_packet_lengths
 
 
 _PROGRESSION_ORDER_DISPLAY = {
@@ -471,20 +472,7 @@ class Codestream(object):
 
         numbytes = length - 3
         read_buffer = fptr.read(numbytes)
-        iplt = np.frombuffer(read_buffer, dtype=np.uint8)
-
-        packet_len = []
-        plen = 0
-        for byte in iplt:
-            plen |= (byte & 0x7f)
-            if byte & 0x80:
-                # Continue by or-ing in the next byte.
-                plen <<= 7
-            else:
-                packet_len.append(plen)
-                plen = 0
-
-        iplt = packet_len
+        iplt = decode_packet_lengths(read_buffer)
 
         return PLTsegment(zplt, iplt, length, offset)
 
@@ -1268,8 +1256,8 @@ class PLTsegment(Segment):
         two bytes constituting the marker.
     zplt : int
         Index of this segment relative to other PLT segments.
-    iplt : list
-        Packet lengths.
+    iplt : ndarray
+        Packet lengths as uint32.
 
     References
     ----------
@@ -1288,7 +1276,7 @@ class PLTsegment(Segment):
         msg = Segment.__str__(self)
         msg += "\n    Index:  {0}"
         msg += "\n    Iplt:  {1}"
-        msg = msg.format(self.zplt, self.iplt)
+        msg = msg.format(self.zplt, np.asarray(self.iplt).tolist())
 
         return msg
 
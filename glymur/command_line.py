@@ -1,5 +1,5 @@
 """
-Entry point for console script jp2dump.
+Entry points for console scripts jp2dump and jp2reindex.
 """
 # Standard library imports ...
 import argparse
@@ -7,7 +7,7 @@ import os
 import warnings
 
 # Local imports ...
-from . import Jp2k, set_option, lib
+from . import Jp2k, set_option, lib, reindex as _reindex
 
 
 def main():
@@ -78,3 +78,19 @@ def main():
                                              warning.lineno,
                                              warning.category.__name__,
                                              warning.message))
+
+
+def reindex():
+    """
+    Entry point for console script jp2reindex.
+    """
+    kwargs = {'description': 'Copy a JPEG2000 file, adding TLM and PLT '
+                             'segments to index its tiles and packets.',
+              'formatter_class': argparse.ArgumentDefaultsHelpFormatter}
+    parser = argparse.ArgumentParser(**kwargs)
+
+    parser.add_argument('src', help='file to be indexed')
+    parser.add_argument('dst', help='file to be created')
+
+    args = parser.parse_args()
+    _reindex(args.src, args.dst)
@@ -1,13 +1,20 @@
 """
 Configure glymur to use installed libraries if possible.
 """
+import contextlib
 import copy
 import ctypes
 from ctypes.util import find_library
 import os
 import platform
 import sys
+import threading
 import warnings
+try:
+    import contextvars
+except ImportError:
+    # Python < 3.7
+    contextvars = None
 
 if sys.hexversion <= 0x03000000:
     from ConfigParser import SafeConfigParser as ConfigParser
@@ -173,6 +180,8 @@ def get_configdir():
 
 
 _original_options = {
+    'cache.headers': 0,
+    'cache.tiles': 0,
     'parse.full_codestream': False,
     'print.xml': True,
     'print.codestream': True,
@@ -181,11 +190,94 @@ _original_options = {
 _options = copy.deepcopy(_original_options)
 
 
+class _ThreadLocalVar(threading.local):
+    """Stand-in for contextvars.ContextVar where that is not available."""
+    value = None
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        token = self.value
+        self.value = value
+        return token
+
+    def reset(self, token):
+        self.value = token
+
+
+# Options set via option_context take precedence over those in _options, but
+# only within the current thread or asyncio task.
+if contextvars is not None:
+    _context_options = contextvars.ContextVar('glymur_options', default=None)
+else:
+    _context_options = _ThreadLocalVar()
+
+
+@contextlib.contextmanager
+def _override_options(overrides):
+    """Temporarily override options in the current context only.
+
+    Parameters
+    ----------
+    overrides : dict or None
+        Maps option names to their values.
+    """
+    if not overrides:
+        yield
+        return
+
+    for key in overrides.keys():
+        if key not in _options.keys():
+            raise KeyError('{key} not valid.'.format(key=key))
+
+    current = _context_options.get()
+    options = {} if current is None else dict(current)
+    options.update(overrides)
+
+    token = _context_options.set(options)
+    try:
+        yield
+    finally:
+        _context_options.reset(token)
+
+
+def option_context(*args):
+    """Context manager for temporarily setting options.
+
+    Unlike set_option, the options are only changed for the current thread
+    (or asyncio task), so concurrent readers are unaffected.
+
+    Parameters
+    ----------
+    args : str, value pairs
+        Option names each followed by the value to set.
+
+    Examples
+    --------
+    >>> import glymur
+    >>> with glymur.option_context('print.short', True):
+    ...     glymur.get_option('print.short')
+    True
+    >>> glymur.get_option('print.short')
+    False
+    """
+    if len(args) % 2 != 0:
+        msg = "Options must be given as pairs of names and values."
+        raise ValueError(msg)
+    return _override_options(dict(zip(args[::2], args[1::2])))
+
+
 def set_option(key, value):
     """Set the value of the specified option.
 
+    This changes the option for all threads, but not in any context in which
+    option_context has overridden it.
+
     Available options:
 
+        cache.headers
+        cache.tiles
         parse.full_codestream
         print.xml
         print.codestream
@@ -200,6 +292,16 @@ def set_option(key, value):
 
     Option Descriptions
     -------------------
+    cache.headers : int
+        Number of files whose parsed boxes and main header are kept in
+        glymur.cache.headers, which is shared by all Jp2k objects.  Opening
+        such a file again, unless it has since changed, then skips parsing.
+        Zero disables the cache. [default: 0]
+    cache.tiles : int
+        Number of bytes of decoded tiles to keep in glymur.cache.tiles, which
+        is shared by all files.  Reading an area of a tiled image then only
+        decodes the tiles not already held.  Zero disables the cache.
+        [default: 0]
     parse.full_codestream : bool
         When False, only the codestream header is parsed for metadata.  This
         can results in faster JP2/JPX parsing.  When True, the entire
@@ -218,7 +320,7 @@ def set_option(key, value):
 
     See also
     --------
-    get_option
+    get_option, option_context
     """
     if key not in _options.keys():
         raise KeyError('{key} not valid.'.format(key=key))
@@ -230,6 +332,8 @@ def get_option(key):
 
     Available options:
 
+        cache.headers
+        cache.tiles
         parse.full_codestream
         print.xml
         print.codestream
@@ -248,6 +352,9 @@ def get_option(key):
     --------
     set_option
     """
+    overrides = _context_options.get()
+    if overrides is not None and key in overrides:
+        return overrides[key]
     return _options[key]
 
 
@@ -259,6 +366,8 @@ def reset_option(key):
 
     Available options:
 
+        cache.headers
+        cache.tiles
         parse.full_codestream
         print.xml
         print.codestream
@@ -386,5 +495,5 @@ def get_printoptions():
                   DeprecationWarning)
     d = {}
     for key in ['short', 'xml', 'codestream']:
-        d[key] = _options['print.' + key]
+        d[key] = get_option('print.' + key)
     return d
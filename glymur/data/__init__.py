@@ -6,7 +6,7 @@ These include:
     goodstuff.j2k:  my favorite bevorage.
 
 """
-import pkg_resources
+import os
 
 
 def nemo():
@@ -17,7 +17,7 @@ def nemo():
     file : str
         Platform-independent path to nemo.jp2.
     """
-    filename = pkg_resources.resource_filename(__name__, "nemo.jp2")
+    filename = os.path.join(os.path.dirname(__file__), "nemo.jp2")
     return filename
 
 
@@ -29,7 +29,7 @@ def goodstuff():
     file : str
         Platform-independent path to goodstuff.j2k.
     """
-    filename = pkg_resources.resource_filename(__name__, "goodstuff.j2k")
+    filename = os.path.join(os.path.dirname(__file__), "goodstuff.j2k")
     return filename
 
 
@@ -41,5 +41,5 @@ def jpxfile():
     file : str
         Platform-independent path to 12-v6.4.jpx
     """
-    filename = pkg_resources.resource_filename(__name__, "heliov.jpx")
+    filename = os.path.join(os.path.dirname(__file__), "heliov.jpx")
     return filename
@@ -24,18 +24,7 @@ from uuid import UUID
 import warnings
 
 # Third party library imports ...
-try:
-    import lxml.etree as ET
-except ImportError:
-    import xml.etree.ElementTree as ET
 import numpy as np
-try:
-    import gdal
-    import osr
-    _HAVE_GDAL = True
-    gdal.UseExceptions()
-except ImportError:
-    _HAVE_GDAL = False
 
 
 # Local imports ...
@@ -45,8 +34,19 @@ from .core import (_COLORSPACE_MAP_DISPLAY, _COLOR_TYPE_MAP_DISPLAY,
                    ENUMERATED_COLORSPACE, RESTRICTED_ICC_PROFILE,
                    ANY_ICC_PROFILE, VENDOR_COLOR_METHOD)
 from ._tiff import tiff_header
+from ._geotiff import GeoTiffInfo
 from . import config
+from .source import FileSource
 from ._iccprofile import _ICCProfile
+from ._lazy import deferred_import, module_exists
+
+# Both lxml and GDAL are slow to import, so defer that until they are
+# actually used.
+ET = deferred_import('lxml.etree', 'xml.etree.ElementTree')
+_HAVE_GDAL = module_exists('gdal') and module_exists('osr')
+if _HAVE_GDAL:
+    gdal = deferred_import('gdal')
+    osr = deferred_import('osr')
 
 
 _COLORSPACE_METHODS = {
@@ -113,6 +113,85 @@ class Jp2kBox(object):
         msg = "Writing not supported for {0} box.".format(self.longname)
         raise NotImplementedError(msg)
 
+    def find(self, path):
+        """Find the first box matching a path of box IDs.
+
+        Parameters
+        ----------
+        path : str
+            Box IDs separated by slashes, each one naming a child of the
+            boxes matched so far, such as 'jp2h/colr'.  '*' matches any box.
+
+        Returns
+        -------
+        Jp2kBox or None
+            The first matching box in file order, or None if there is none.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jp2 = glymur.Jp2k(glymur.data.nemo())
+        >>> ihdr = jp2.find('jp2h/ihdr')
+        >>> ihdr.height, ihdr.width, ihdr.num_components
+        (1456, 2592, 3)
+        """
+        boxes = self.findall(path)
+        return boxes[0] if len(boxes) > 0 else None
+
+    def findall(self, path):
+        """Find all boxes matching a path of box IDs.
+
+        Parameters
+        ----------
+        path : str
+            Box IDs separated by slashes, each one naming a child of the
+            boxes matched so far, such as 'asoc/lbl '.  '*' matches any box.
+
+        Returns
+        -------
+        list
+            The matching boxes in file order.
+        """
+        boxes = [self]
+        for box_id in path.split('/'):
+            found = []
+            for box in boxes:
+                if box_id == '*':
+                    found.extend(getattr(box, 'box', []))
+                else:
+                    found.extend(box.box[j]
+                                 for j in box._box_index().get(box_id, []))
+            boxes = found
+        return boxes
+
+    @property
+    def box(self):
+        try:
+            return self.__dict__['_box']
+        except KeyError:
+            raise AttributeError('box')
+
+    @box.setter
+    def box(self, boxes):
+        # Keep the child boxes in a list that counts its changes, so that the
+        # index of their IDs can tell whether it is out of date.
+        if not isinstance(boxes, _BoxList):
+            boxes = _BoxList(boxes)
+        self._box = boxes
+
+    def _box_index(self):
+        """Map the IDs of the child boxes to their positions.
+
+        The index is kept until the list of child boxes is replaced or
+        changed in any way.
+        """
+        boxes = getattr(self, 'box', _BoxList())
+        index = getattr(self, '_index', None)
+        if index is None or index[0] is not boxes or index[1] != boxes.version:
+            index = boxes, boxes.version, _index_boxes(boxes)
+            self._index = index
+        return index[2]
+
     def _str_superbox(self):
         """__str__ method for all superboxes."""
         msg = Jp2kBox.__str__(self)
@@ -251,7 +330,7 @@ class Jp2kBox(object):
             if box_length == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                num_bytes = os.path.getsize(fptr.name) - fptr.tell() + 8
+                num_bytes = _file_size(fptr) - fptr.tell() + 8
 
             elif box_length == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -288,6 +367,44 @@ class Jp2kBox(object):
         return superbox
 
 
+class _BoxList(list):
+    """List of child boxes with a count of the changes made to it.
+
+    Attributes
+    ----------
+    version : int
+        Incremented by every change to the list.
+    """
+    version = 0
+
+
+def _count_changes(name):
+    """Wrap a list method so that it increments the version."""
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in ['__setitem__', '__delitem__', '__setslice__', '__delslice__',
+              '__iadd__', '__imul__', 'append', 'extend', 'insert', 'pop',
+              'remove', 'reverse', 'sort', 'clear']:
+    if hasattr(list, _name):
+        setattr(_BoxList, _name, _count_changes(_name))
+
+
+def _index_boxes(boxes):
+    """Map box IDs to their positions in a list of boxes."""
+    index = {}
+    for j, box in enumerate(boxes):
+        index.setdefault(box.box_id, []).append(j)
+    return index
+
+
 class ColourSpecificationBox(Jp2kBox):
     """Container for JPEG 2000 color specification box information.
 
@@ -987,18 +1104,20 @@ class ContiguousCodestreamBox(Jp2kBox):
         self.offset = offset
         self.main_header_offset = main_header_offset
 
-        # The filename can be set if lazy loading is desired.
-        self._filename = None
+        # The source of the file can be set if lazy loading is desired.
+        self._source = None
+
+        # Options specific to the file containing this box.
+        self._options = None
 
     @property
     def codestream(self):
-        if config.get_option('parse.full_codestream') is True:
-            header_only = False
-        else:
-            header_only = True
+        with config._override_options(self._options):
+            full_codestream = config.get_option('parse.full_codestream')
+        header_only = full_codestream is not True
         if self._codestream is None:
-            if self._filename is not None:
-                with open(self._filename, 'rb') as fptr:
+            if self._source is not None:
+                with self._source.open() as fptr:
                     fptr.seek(self.main_header_offset)
                     codestream = Codestream(fptr, self._length,
                                             header_only=header_only)
@@ -1050,7 +1169,9 @@ class ContiguousCodestreamBox(Jp2kBox):
             codestream = None
         box = cls(codestream, main_header_offset=main_header_offset,
                   length=length, offset=offset)
-        box._filename = fptr.name
+        box._source = getattr(fptr, 'source', None)
+        if box._source is None:
+            box._source = FileSource(fptr.name)
         box._length = length
         return box
 
@@ -1556,6 +1677,20 @@ class FreeBox(Jp2kBox):
     def __str__(self):
         return Jp2kBox.__str__(self)
 
+    def write(self, fptr):
+        """Write a free box to file, zeroing out its contents."""
+        if self.length < 8:
+            msg = "A free box must be at least 8 bytes long, not {0}."
+            raise IOError(msg.format(self.length))
+        if self.length >= 2 ** 32:
+            # Need the XL field.
+            fptr.write(struct.pack('>I4sQ', 1, b'free', self.length))
+            num_bytes = self.length - 16
+        else:
+            fptr.write(struct.pack('>I4s', self.length, b'free'))
+            num_bytes = self.length - 8
+        fptr.write(b'\x00' * num_bytes)
+
     @classmethod
     def parse(cls, fptr, offset, length):
         """Parse JPX free box.
@@ -2388,6 +2523,15 @@ class ReaderRequirementsBox(Jp2kBox):
                    length=length, offset=offset)
 
 
+def _file_size(fptr):
+    """Length of an open file, which need not be on the local disk."""
+    position = fptr.tell()
+    fptr.seek(0, os.SEEK_END)
+    size = fptr.tell()
+    fptr.seek(position)
+    return size
+
+
 def _parse_standard_flag(read_buffer, mask_length):
     """Construct standard flag, standard mask data from the file.
 
@@ -2841,12 +2985,14 @@ class XMLBox(Jp2kBox):
     longname : str
         more verbose description of the box.
     xml : ElementTree object
-        XML section.
+        XML section.  When parsed from a file, the tree is not constructed
+        until first accessed.
     """
     box_id = 'xml '
     longname = 'XML'
 
-    def __init__(self, xml=None, filename=None, length=0, offset=-1):
+    def __init__(self, xml=None, filename=None, length=0, offset=-1,
+                 raw_data=None):
         """
         Parameters
         ----------
@@ -2855,6 +3001,9 @@ class XMLBox(Jp2kBox):
         filename : str
             File from which to read XML.  If filename is not None, then the xml
             keyword argument must be None.
+        raw_data : bytes
+            Undecoded XML box payload.  The ElementTree is constructed from
+            this on demand.
         """
         Jp2kBox.__init__(self)
         if filename is not None and xml is not None:
@@ -2865,9 +3014,50 @@ class XMLBox(Jp2kBox):
             self.xml = ET.parse(filename)
         else:
             self.xml = xml
+        self._raw_data = raw_data
         self.length = length
         self.offset = offset
 
+    @property
+    def xml(self):
+        """ElementTree object, constructed on first access."""
+        if self._raw_data is not None:
+            self._xml = self._parse_raw_data(self._raw_data, self.offset)
+            self._raw_data = None
+        return self._xml
+
+    @xml.setter
+    def xml(self, xml):
+        self._xml = xml
+        self._raw_data = None
+
+    def iterparse(self, events=('end',)):
+        """Incrementally parse the XML.
+
+        This avoids building the entire tree at once, which can be useful for
+        very large XML documents.
+
+        Parameters
+        ----------
+        events : tuple
+            Events to report, e.g. 'start' or 'end'.
+
+        Returns
+        -------
+        iterator
+            Iterator over (event, element) pairs.
+        """
+        if self._raw_data is not None:
+            read_buffer = self._decode_raw_data(self._raw_data, self.offset)
+        elif self._xml is not None:
+            read_buffer = ET.tostring(self._xml.getroot(), encoding='utf-8')
+        else:
+            read_buffer = None
+
+        if read_buffer is None:
+            return iter([])
+        return ET.iterparse(io.BytesIO(read_buffer), events=events)
+
     def __repr__(self):
         return "glymur.jp2box.XMLBox(xml={xml})".format(xml=self.xml)
 
@@ -2897,27 +3087,15 @@ class XMLBox(Jp2kBox):
         fptr.write(struct.pack('>I4s', len(read_buffer) + 8, b'xml '))
         fptr.write(read_buffer)
 
-    @classmethod
-    def parse(cls, fptr, offset, length):
-        """Parse XML box.
-
-        Parameters
-        ----------
-        fptr : file
-            Open file object.
-        offset : int
-            Start position of box in bytes.
-        length : int
-            Length of the box in bytes.
+    @staticmethod
+    def _decode_raw_data(read_buffer, offset):
+        """Clean up the XML box payload prior to parsing.
 
         Returns
         -------
-        XMLBox
-            Instance of the current XML box.
+        bytes or None
+            UTF-8 encoded XML, or None if no XML could be recovered.
         """
-        num_bytes = offset + length - fptr.tell()
-        read_buffer = fptr.read(num_bytes)
-
         if sys.hexversion < 0x03000000 and codecs.BOM_UTF8 in read_buffer:
             # Python3 with utf-8 handles this just fine.  Actually so does
             # Python2 right here since we decode using utf-8.  The real
@@ -2941,7 +3119,7 @@ class XMLBox(Jp2kBox):
                 msg = ('A problem was encountered while parsing an XML box:'
                        '\n\n\t"{error}"\n\nNo XML was retrieved.')
                 warnings.warn(msg.format(error=str(err)), UserWarning)
-                return XMLBox(xml=None, length=length, offset=offset)
+                return None
 
             text = read_buffer[decl_start:].decode('utf-8')
 
@@ -2954,10 +3132,17 @@ class XMLBox(Jp2kBox):
 
         # Strip out any trailing nulls, as they can foul up XML parsing.
         text = text.rstrip(chr(0))
-        bfptr = io.BytesIO(text.encode('utf-8'))
+        return text.encode('utf-8')
+
+    @classmethod
+    def _parse_raw_data(cls, read_buffer, offset):
+        """Construct the ElementTree from the XML box payload."""
+        read_buffer = cls._decode_raw_data(read_buffer, offset)
+        if read_buffer is None:
+            return None
 
         try:
-            xml = ET.parse(bfptr)
+            xml = ET.parse(io.BytesIO(read_buffer))
         except ET.ParseError as err:
             msg = ('A problem was encountered while parsing an XML box:'
                    '\n\n\t"{reason}"\n\nNo XML was retrieved.')
@@ -2965,7 +3150,32 @@ class XMLBox(Jp2kBox):
             warnings.warn(msg, UserWarning)
             xml = None
 
-        return cls(xml=xml, length=length, offset=offset)
+        return xml
+
+    @classmethod
+    def parse(cls, fptr, offset, length):
+        """Parse XML box.
+
+        Only the raw payload is read here.  The ElementTree is constructed
+        when the xml attribute is first accessed.
+
+        Parameters
+        ----------
+        fptr : file
+            Open file object.
+        offset : int
+            Start position of box in bytes.
+        length : int
+            Length of the box in bytes.
+
+        Returns
+        -------
+        XMLBox
+            Instance of the current XML box.
+        """
+        num_bytes = offset + length - fptr.tell()
+        read_buffer = fptr.read(num_bytes)
+        return cls(raw_data=read_buffer, length=length, offset=offset)
 
 
 class UUIDListBox(Jp2kBox):
@@ -3264,6 +3474,8 @@ class UUIDBox(Jp2kBox):
         more verbose description of the box.
     uuid : uuid.UUID
         16-byte UUID
+    geotiff : GeoTiffInfo or None
+        Georeferencing information, if a GeoTIFF UUID.
     raw_data : byte array
         Sequence of uninterpreted bytes as read from the file.
     data : object
@@ -3298,13 +3510,45 @@ class UUIDBox(Jp2kBox):
         self.raw_data = raw_data
         self.length = length
         self.offset = offset
-        self.data = None
 
-        try:
-            self._parse_raw_data()
-        except IOError as error:
-            # Such as when Exif byte order is unrecognized.
-            warnings.warn(str(error))
+        # The payload is not interpreted until the data attribute is first
+        # accessed, nor the georeferencing until the geotiff attribute is.
+        self._data = None
+        self._data_is_parsed = False
+        self._geotiff = None
+        self._geotiff_is_parsed = False
+
+    @property
+    def data(self):
+        """Interpreted payload, constructed on first access."""
+        if not self._data_is_parsed:
+            self._data_is_parsed = True
+            try:
+                self._data = self._parse_raw_data()
+            except IOError as error:
+                # Such as when Exif byte order is unrecognized.
+                warnings.warn(str(error))
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._data_is_parsed = True
+        self._geotiff_is_parsed = False
+
+    @property
+    def geotiff(self):
+        """Georeferencing information for GeoTIFF UUIDs, otherwise None.
+
+        This does not require GDAL, and is constructed on first access.
+        """
+        if not self._geotiff_is_parsed:
+            self._geotiff_is_parsed = True
+            if self.uuid == _GEOTIFF_UUID and self.data is not None:
+                self._geotiff = GeoTiffInfo(self.data)
+            else:
+                self._geotiff = None
+        return self._geotiff
 
     def _parse_raw_data(self):
         """
@@ -3313,14 +3557,14 @@ class UUIDBox(Jp2kBox):
         if self.uuid == _XMP_UUID:
             txt = self.raw_data.decode('utf-8')
             elt = ET.fromstring(txt)
-            self.data = ET.ElementTree(elt)
+            return ET.ElementTree(elt)
         elif self.uuid == _GEOTIFF_UUID:
-            self.data = tiff_header(self.raw_data)
+            return tiff_header(self.raw_data)
         elif self.uuid == _EXIF_UUID:
             # Cut off 'EXIF\0\0' part.
-            self.data = tiff_header(self.raw_data[6:])
+            return tiff_header(self.raw_data[6:])
         else:
-            self.data = self.raw_data
+            return self.raw_data
 
     def __repr__(self):
         msg = ("glymur.jp2box.UUIDBox(the_uuid={0}, "
@@ -3364,7 +3608,12 @@ class UUIDBox(Jp2kBox):
             text = 'UUID Data:  {0}'.format(str(self.data))
             lst.append(text)
         elif self.uuid == _GEOTIFF_UUID:
-            item = self._print_geotiff() if _HAVE_GDAL else str(self.data)
+            if self.data is None:
+                item = 'corrupt'
+            elif _HAVE_GDAL:
+                item = self._print_geotiff()
+            else:
+                item = str(self.geotiff)
             txt = 'UUID Data:  {0}'.format(item)
             lst.append(txt)
         else:
@@ -3388,6 +3637,7 @@ class UUIDBox(Jp2kBox):
         """
         if self.data is None:
             return "corrupt"
+        gdal.UseExceptions()
         in_mem_name = '/vsimem/geo.tif'
         gdal.FileFromMemBuffer(in_mem_name, self.raw_data)
         gtif = gdal.Open(in_mem_name)
@@ -15,11 +15,13 @@ except ImportError:
     # v2.7, third party library import ...
     from contextlib2 import ExitStack
     from itertools import ifilterfalse as filterfalse
+import copy
 import ctypes
+import io
 import math
 import os
-import re
 import struct
+import sys
 from uuid import UUID
 import warnings
 
@@ -27,12 +29,16 @@ import warnings
 import numpy as np
 
 # Local imports...
+from .backend import select_backend
 from .codestream import Codestream
-from . import core, version
+from . import cache, config, core, _packets, _transcode
+from .source import as_source
+from ._view import Jp2kView
 from .jp2box import (Jp2kBox, JPEG2000SignatureBox, FileTypeBox,
                      JP2HeaderBox, ColourSpecificationBox,
-                     ContiguousCodestreamBox, ImageHeaderBox)
-from .lib import openjpeg as opj, openjp2 as opj2
+                     ContiguousCodestreamBox, ImageHeaderBox, FreeBox,
+                     _index_boxes)
+from .lib import openjp2 as opj2
 
 
 class Jp2k(Jp2kBox):
@@ -61,6 +67,17 @@ class Jp2k(Jp2kBox):
         OpenJPEG library, defaults to false.
     codestream : glymur.codestream.Codestream
         JP2 or J2K codestream object.
+    shape : tuple
+        Dimensions of the image.
+    dtype : numpy.dtype
+        Datatype of the image, from the bit depth and sign of the first
+        component in the SIZ segment, or from the palette.
+    ndim, size, nbytes : int
+        Number of dimensions, number of samples, and size in bytes of the
+        image.
+    lazy : glymur._view.Jp2kView
+        View of the image that can be indexed any number of times before
+        only the final area is decoded.
 
     Examples
     --------
@@ -78,21 +95,34 @@ class Jp2k(Jp2kBox):
     >>> thumbnail = jp2[::2, ::2]
     >>> thumbnail.shape
     (728, 1296, 3)
+
+    Decode just part of the thumbnail.
+
+    >>> jp2.lazy[::2, ::2][100:200, 300:500].shape
+    (100, 200, 3)
     """
 
-    def __init__(self, filename, data=None, shape=None, **kwargs):
+    def __init__(self, filename, data=None, shape=None, options=None,
+                 backend=None, **kwargs):
         """
         Only the filename parameter is required in order to read a JPEG 2000
         file.
 
         Parameters
         ----------
-        filename : str
-            The path to JPEG 2000 file.
+        filename : str or glymur.source.ByteSource
+            The path or URL of the JPEG 2000 file, or the source of its
+            bytes.  Only local files can be written.
         image_data : ndarray, optional
             Image data to be written to file.
         shape : tuple, optional
             Size of image data, only required when image_data is not provided.
+        options : dict, optional
+            Options (see set_option) that apply only to this file, overriding
+            any global or context-specific settings.
+        backend : glymur.backend.Backend, optional
+            Codec used to decode and encode image data.  Defaults to the one
+            appropriate for the installed OpenJPEG library.
         cbsize : tuple, optional
             Code block size (NROWS, NCOLS)
         cinema2k : int, optional
@@ -135,11 +165,19 @@ class Jp2k(Jp2kBox):
             Subsampling factors (dy, dx).
         tilesize : tuple, optional
             Tile size in terms of (numrows, numcols), not (X, Y).
+        tlm : bool, optional
+            If true, signal the length of each tile-part in a TLM segment.
+            Only available along with workers.
         verbose : bool, optional
             Print informational messages produced by the OpenJPEG library.
+        workers : int, optional
+            Number of threads encoding tiles at the same time, requires
+            tilesize and Python 3.2 or higher.  Each tile is encoded as a
+            codestream of its own, and these are then stitched together.
         """
         Jp2kBox.__init__(self)
-        self.filename = filename
+        self._source = as_source(filename)
+        self.filename = self._source.name
 
         self.box = []
         self._codec_format = None
@@ -153,6 +191,20 @@ class Jp2k(Jp2kBox):
 
         self._ignore_pclr_cmap_cdef = False
         self._verbose = False
+        self._metadata = None
+
+        # Choose the codec just once.
+        self._backend = select_backend() if backend is None else backend
+
+        self._options = {} if options is None else dict(options)
+        for key in self._options.keys():
+            # Make sure the option actually exists.
+            config.get_option(key)
+
+        if not self._source.is_local and (data is not None or
+                                          shape is not None):
+            msg = "Only local files can be written, not {0}."
+            raise IOError(msg.format(self.filename))
 
         # Parse the file for JP2/JPX contents only if we are reading it.
         if data is None and shape is None:
@@ -174,11 +226,11 @@ class Jp2k(Jp2kBox):
 
     @layer.setter
     def layer(self, layer):
-        if version.openjpeg_version < '2.1.0':
+        if not self._backend.can_decode_layers:
             msg = ("The layer property not supported unless the OpenJPEG "
                    "library version is 2.1 or higher.  The installed version "
                    "is {version}.")
-            msg = msg.format(version=version.openjpeg_version)
+            msg = msg.format(version=self._backend.version)
             raise IOError(msg)
 
         self._layer = 0 if layer is None else layer
@@ -186,7 +238,9 @@ class Jp2k(Jp2kBox):
     @property
     def codestream(self):
         if self._codestream is None:
-            self._codestream = self.get_codestream(header_only=True)
+            self._codestream = self._backend.decode_header(self)
+            if self._metadata is not None:
+                self._metadata['codestream'] = self._codestream
         return self._codestream
 
     @property
@@ -206,6 +260,33 @@ class Jp2k(Jp2kBox):
         """
         self._verbose = verbose
 
+    @property
+    def dtype(self):
+        palette = self._get_palette_boxes()
+        if palette is not None:
+            return palette[0].palette.dtype
+        siz = self.codestream.segment[1]
+        return np.dtype(self._precision2dtype(siz.bitdepth[0], siz.signed[0]))
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def size(self):
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self):
+        return self.size * self.dtype.itemsize
+
+    @property
+    def lazy(self):
+        return Jp2kView(self)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.lazy.__array__(dtype, copy)
+
     @property
     def shape(self):
         if self._shape is not None:
@@ -219,8 +300,7 @@ class Jp2k(Jp2kBox):
             num_components = len(cstr.segment[1].xrsiz)
         else:
             # try to get the image size from the IHDR box
-            jp2h = [box for box in self.box if box.box_id == 'jp2h'][0]
-            ihdr = [box for box in jp2h.box if box.box_id == 'ihdr'][0]
+            ihdr = self.find('jp2h/ihdr')
 
             height, width = ihdr.height, ihdr.width
             num_components = ihdr.num_components
@@ -229,15 +309,17 @@ class Jp2k(Jp2kBox):
                 # but if there is a PCLR box, then we need to check that as
                 # well, as that turns a single-channel image into a
                 # multi-channel image
-                pclr = [box for box in jp2h.box if box.box_id == 'pclr']
-                if len(pclr) > 0:
-                    num_components = len(pclr[0].signed)
+                pclr = self.find('jp2h/pclr')
+                if pclr is not None:
+                    num_components = len(pclr.signed)
 
         if num_components == 1:
             self.shape = (height, width)
         else:
             self.shape = (height, width, num_components)
 
+        if self._metadata is not None:
+            self._metadata['shape'] = self._shape
         return self._shape
 
     @shape.setter
@@ -250,24 +332,87 @@ class Jp2k(Jp2kBox):
 
     def __str__(self):
         metadata = ['File:  ' + os.path.basename(self.filename)]
-        if len(self.box) > 0:
-            for box in self.box:
-                metadata.append(str(box))
-        else:
-            metadata.append(str(self.codestream))
+        with config._override_options(self._options):
+            if len(self.box) > 0:
+                for box in self.box:
+                    metadata.append(str(box))
+            else:
+                metadata.append(str(self.codestream))
         return '\n'.join(metadata)
 
     def parse(self):
         """Parses the JPEG 2000 file.
 
+        If the file is held in glymur.cache.headers, its boxes and main
+        header are taken from there instead.
+
         Raises
         ------
         IOError
             The file was not JPEG 2000.
         """
-        self.length = os.path.getsize(self.filename)
+        with config._override_options(self._options):
+            max_files = config.get_option('cache.headers')
+            if max_files > 0:
+                key = self._metadata_key()
+                metadata = cache.headers.get(key)
+                if metadata is not None:
+                    self._load_metadata(metadata)
+                    return
+            self._parse()
+
+        # Lazily-parsed codestreams must also honor the options of this file.
+        # Index the boxes along the way.
+        self._box_index()
+        boxes = list(self.box)
+        while len(boxes) > 0:
+            box = boxes.pop()
+            if box.box_id == 'jp2c':
+                box._options = self._options
+            box._box_index()
+            boxes.extend(getattr(box, 'box', []))
+
+        self._metadata = None
+        if max_files > 0:
+            self._metadata = {'box': _copy_boxes(self.box),
+                              'length': self.length,
+                              'codec_format': self._codec_format,
+                              'codestream': None, 'shape': None}
+            cache.headers.put(key, self._metadata, 1, max_files)
+
+    def _metadata_key(self):
+        """Identify the file and the options bearing on its parsing."""
+        return (self._source.identity,
+                config.get_option('parse.full_codestream'),
+                tuple(sorted(self._options.items())))
+
+    def _load_metadata(self, metadata):
+        """Take the results of parsing from the metadata cache."""
+        self._metadata = metadata
+        self.box = _copy_boxes(metadata['box'])
+        self.length = metadata['length']
+        self._codec_format = metadata['codec_format']
+        self._codestream = metadata['codestream']
+        if self._shape is None:
+            self._shape = metadata['shape']
+
+    def _reparse(self):
+        """Parse the file again after writing to it.
+
+        The file may not look any different to the caches, so whatever they
+        hold of it is dropped.
+        """
+        identity = self._source.identity
+        cache.headers.discard(lambda key: key[0] == identity)
+        cache.tiles.discard(lambda key: key[0] == identity)
+        self._codestream = None
+        self.parse()
 
-        with open(self.filename, 'rb') as fptr:
+    def _parse(self):
+        """Parse the JPEG 2000 file, see parse."""
+        self.length = self._source.size
+
+        with self._source.open() as fptr:
 
             # Make sure we have a JPEG2000 file.  It could be either JP2 or
             # J2C.  Check for J2C first, single box in that case.
@@ -317,9 +462,7 @@ class Jp2k(Jp2kBox):
         # A jp2-branded file cannot contain an "any ICC profile
         ftyp = self.box[1]
         if ftyp.brand == 'jp2 ':
-            jp2h = [box for box in self.box if box.box_id == 'jp2h'][0]
-            colrs = [box for box in jp2h.box if box.box_id == 'colr']
-            for colr in colrs:
+            for colr in self.find('jp2h').findall('colr'):
                 if colr.method not in (core.ENUMERATED_COLORSPACE,
                                        core.RESTRICTED_ICC_PROFILE):
                     msg = ("Color Specification box method must specify "
@@ -340,11 +483,11 @@ class Jp2k(Jp2kBox):
         fps : {24, 48}
             Frames per second.
         """
-        if re.match("1.5|2.0", version.openjpeg_version) is not None:
+        if not self._backend.can_encode_cinema:
             msg = ("Writing Cinema2K or Cinema4K files is not supported with "
                    "OpenJPEG library versions less than 2.1.0.  The installed "
                    "version of OpenJPEG is {version}.")
-            msg = msg.format(version=version.openjpeg_version)
+            msg = msg.format(version=self._backend.version)
             raise IOError(msg)
 
         # Cinema modes imply MCT.
@@ -394,10 +537,7 @@ class Jp2k(Jp2kBox):
             msg = "Cannot specify cratios and psnr options together."
             raise IOError(msg)
 
-        if version.openjpeg_version_tuple[0] == 1:
-            cparams = opj.set_default_encoder_parameters()
-        else:
-            cparams = opj2.set_default_encoder_parameters()
+        cparams = self._backend.default_encoder_parameters()
 
         outfile = self.filename.encode()
         num_pad_bytes = opj2.PATH_LEN - len(outfile)
@@ -492,14 +632,15 @@ class Jp2k(Jp2kBox):
 
         self._cparams = cparams
 
-    def _write(self, img_array, verbose=False, **kwargs):
+    def _write(self, img_array, verbose=False, workers=None, tlm=False,
+               **kwargs):
         """Write image data to a JP2/JPX/J2k file.  Intended usage of the
         various parameters follows that of OpenJPEG's opj_compress utility.
 
         This method can only be used to create JPEG 2000 images that can fit
         in memory.
         """
-        if re.match("0|1.[0-4]", version.openjpeg_version) is not None:
+        if not self._backend.can_encode:
             msg = ("You must have at least version 1.5 of OpenJPEG "
                    "in order to write images.")
             raise RuntimeError(msg)
@@ -507,77 +648,144 @@ class Jp2k(Jp2kBox):
         self._determine_colorspace(**kwargs)
         self._populate_cparams(img_array, **kwargs)
 
-        if opj2.OPENJP2 is not None:
-            self._write_openjp2(img_array, verbose=verbose)
+        if img_array.ndim == 2:
+            # Force the image to be 3D.  Just makes things easier later on.
+            numrows, numcols = img_array.shape
+            img_array = img_array.reshape(numrows, numcols, 1)
+
+        self._populate_comptparms(img_array)
+
+        verbose = verbose or self._verbose
+        if workers is not None:
+            self._encode_tiles_in_parallel(img_array, workers, tlm, verbose)
+        elif tlm:
+            msg = "TLM segments can only be written along with workers."
+            raise IOError(msg)
         else:
-            self._write_openjpeg(img_array, verbose=verbose)
+            self._backend.encode(self, img_array, verbose=verbose)
 
-    def _write_openjpeg(self, img_array, verbose=False):
+        # Refresh the metadata.
+        self._reparse()
+
+    def _validate_parallel_encoding(self, workers):
         """
-        Write JPEG 2000 file using OpenJPEG 1.5 interface.
+        Tiles can only be encoded separately if each one can be placed on
+        the reference grid by itself.
         """
-        if img_array.ndim == 2:
-            # Force the image to be 3D.  Just makes things easier later on.
-            img_array = img_array.reshape(img_array.shape[0],
-                                          img_array.shape[1],
-                                          1)
+        cparams = self._cparams
+        if sys.hexversion < 0x03020000:
+            # concurrent.futures and tempfile.TemporaryDirectory are missing.
+            msg = "Encoding in parallel requires Python 3.2 or higher."
+            raise IOError(msg)
+        if workers < 1:
+            msg = "At least one worker is needed, not {0}.".format(workers)
+            raise IOError(msg)
+        if not cparams.tile_size_on:
+            msg = "Encoding in parallel requires a tile size."
+            raise IOError(msg)
+        if cparams.rsiz in (core.OPJ_PROFILE_CINEMA_2K,
+                            core.OPJ_PROFILE_CINEMA_4K):
+            msg = "Cinema codestreams cannot be encoded in parallel."
+            raise IOError(msg)
+        if ((cparams.cp_tdx % cparams.subsampling_dx or
+             cparams.cp_tdy % cparams.subsampling_dy)):
+            msg = ("Encoding in parallel requires the tile size to be a "
+                   "multiple of the subsampling factors.")
+            raise IOError(msg)
 
-        self._populate_comptparms(img_array)
+    def _encode_tiles_in_parallel(self, img_array, workers, tlm, verbose):
+        """Encode each tile as a codestream, then stitch them together.
 
-        with ExitStack() as stack:
-            image = opj.image_create(self._comptparms, self._colorspace)
-            stack.callback(opj.image_destroy, image)
-
-            numrows, numcols, numlayers = img_array.shape
-
-            # set image offset and reference grid
-            image.contents.x0 = self._cparams.image_offset_x0
-            image.contents.y0 = self._cparams.image_offset_y0
-            image.contents.x1 = (image.contents.x0 +
-                                 (numcols - 1) * self._cparams.subsampling_dx +
-                                 1)
-            image.contents.y1 = (image.contents.y0 +
-                                 (numrows - 1) * self._cparams.subsampling_dy +
-                                 1)
-
-            # Stage the image data to the openjpeg data structure.
-            for k in range(0, numlayers):
-                layer = np.ascontiguousarray(img_array[:, :, k],
-                                             dtype=np.int32)
-                dest = image.contents.comps[k].data
-                src = layer.ctypes.data
-                ctypes.memmove(dest, src, layer.nbytes)
-
-            cinfo = opj.create_compress(self._cparams.codec_fmt)
-            stack.callback(opj.destroy_compress, cinfo)
-
-            # Setup the info, warning, and error handlers.
-            # Always use the warning and error handler.  Use of an info
-            # handler is optional.
-            event_mgr = opj.EventMgrType()
-            _info_handler = _INFO_CALLBACK if verbose else None
-            event_mgr.info_handler = _info_handler
-            event_mgr.warning_handler = ctypes.cast(_WARNING_CALLBACK,
-                                                    ctypes.c_void_p)
-            event_mgr.error_handler = ctypes.cast(_ERROR_CALLBACK,
-                                                  ctypes.c_void_p)
-
-            opj.setup_encoder(cinfo, ctypes.byref(self._cparams), image)
-
-            cio = opj.cio_open(cinfo)
-            stack.callback(opj.cio_close, cio)
-
-            if not opj.encode(cinfo, cio, image):
-                raise IOError("Encode error.")
-
-            pos = opj.cio_tell(cio)
-
-            blob = ctypes.string_at(cio.contents.buffer, pos)
-            fptr = open(self.filename, 'wb')
-            stack.callback(fptr.close)
-            fptr.write(blob)
+        Parameters
+        ----------
+        img_array : ndarray
+            Image data of shape (rows, columns, components).
+        workers : int
+            Number of threads encoding tiles at the same time.  The codec
+            releases the GIL while encoding.
+        tlm : bool
+            If true, write a TLM segment.
+        verbose : bool
+            Print informational messages produced by the codec.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        import tempfile
 
-        self.parse()
+        self._validate_parallel_encoding(workers)
+
+        cparams = self._cparams
+        numrows, numcols, num_comps = img_array.shape
+        dx, dy = cparams.subsampling_dx, cparams.subsampling_dy
+        tdx, tdy = cparams.cp_tdx, cparams.cp_tdy
+        x0, y0 = cparams.image_offset_x0, cparams.image_offset_y0
+        x1, y1 = x0 + (numcols - 1) * dx + 1, y0 + (numrows - 1) * dy + 1
+        num_tiles_x = -(-x1 // tdx)
+        num_tiles_y = -(-y1 // tdy)
+
+        def encode(tile, filename):
+            """Encode a tile with the reference grid starting at its
+            corner."""
+            p, q = tile % num_tiles_x, tile // num_tiles_x
+            tx0, ty0 = max(p * tdx, x0), max(q * tdy, y0)
+            tx1, ty1 = min((p + 1) * tdx, x1), min((q + 1) * tdy, y1)
+            rows = slice(-(-ty0 // dy) - -(-y0 // dy),
+                         -(-ty1 // dy) - -(-y0 // dy))
+            cols = slice(-(-tx0 // dx) - -(-x0 // dx),
+                         -(-tx1 // dx) - -(-x0 // dx))
+            data = img_array[rows, cols, :]
+
+            jp2k = Jp2k(filename, shape=data.shape, backend=self._backend)
+            jp2k._colorspace = self._colorspace
+            jp2k._cparams = type(cparams).from_buffer_copy(cparams)
+            jp2k._cparams.codec_fmt = opj2.CODEC_J2K
+            jp2k._cparams.image_offset_x0 = jp2k._cparams.cp_tx0 = tx0
+            jp2k._cparams.image_offset_y0 = jp2k._cparams.cp_ty0 = ty0
+            jp2k._populate_comptparms(data)
+            self._backend.encode(jp2k, data, verbose=verbose)
+
+        num_tiles = num_tiles_x * num_tiles_y
+        with tempfile.TemporaryDirectory() as tdir, ExitStack() as stack:
+            filenames = [os.path.join(tdir, '{0}.j2k'.format(tile))
+                         for tile in range(num_tiles)]
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # Wait for all of them, raising any error.
+                list(executor.map(encode, range(num_tiles), filenames))
+
+            tiles = []
+            for tile, filename in enumerate(filenames):
+                with warnings.catch_warnings():
+                    # The tile offset may well equal the tile size.
+                    warnings.simplefilter('ignore')
+                    jp2k = Jp2k(filename)
+                    codestream = jp2k.get_codestream(header_only=False)
+                fptr = stack.enter_context(open(filename, 'rb'))
+                tiles.append((tile, codestream, fptr))
+            extent = (x1, y1, x0, y0, tdx, tdy,
+                      cparams.cp_tx0, cparams.cp_ty0)
+
+            with open(self.filename, 'wb') as ofile:
+                if cparams.codec_fmt == opj2.CODEC_J2K:
+                    _transcode.stitch(ofile, extent, tiles, tlm=tlm)
+                    return
+
+                prec = self._comptparms[0].prec
+                colorspace = {opj2.CLRSPC_SRGB: core.SRGB,
+                              opj2.CLRSPC_GRAY: core.GREYSCALE,
+                              opj2.CLRSPC_YCC: core.YCC}[self._colorspace]
+                jp2h = JP2HeaderBox()
+                ihdr = ImageHeaderBox(height=numrows, width=numcols,
+                                      num_components=num_comps,
+                                      bits_per_component=prec)
+                colr = ColourSpecificationBox(colorspace=colorspace)
+                jp2h.box = [ihdr, colr]
+                for box in [JPEG2000SignatureBox(), FileTypeBox(), jp2h]:
+                    box.write(ofile)
+
+                start = ofile.tell()
+                ofile.write(struct.pack('>I4s', 0, b'jp2c'))
+                length = 8 + _transcode.stitch(ofile, extent, tiles, tlm=tlm)
+                ofile.seek(start)
+                ofile.write(struct.pack('>I', length))
 
     def _validate_j2k_colorspace(self, cparams, colorspace):
         """
@@ -717,48 +925,6 @@ class Jp2k(Jp2kBox):
 
             self._colorspace = COLORSPACE_MAP[colorspace.lower()]
 
-    def _write_openjp2(self, img_array, verbose=False):
-        """
-        Write JPEG 2000 file using OpenJPEG 2.x interface.
-        """
-        if img_array.ndim == 2:
-            # Force the image to be 3D.  Just makes things easier later on.
-            numrows, numcols = img_array.shape
-            img_array = img_array.reshape(numrows, numcols, 1)
-
-        self._populate_comptparms(img_array)
-
-        with ExitStack() as stack:
-            image = opj2.image_create(self._comptparms, self._colorspace)
-            stack.callback(opj2.image_destroy, image)
-
-            self._populate_image_struct(image, img_array)
-
-            codec = opj2.create_compress(self._cparams.codec_fmt)
-            stack.callback(opj2.destroy_codec, codec)
-
-            if self._verbose or verbose:
-                info_handler = _INFO_CALLBACK
-            else:
-                info_handler = None
-
-            opj2.set_info_handler(codec, info_handler)
-            opj2.set_warning_handler(codec, _WARNING_CALLBACK)
-            opj2.set_error_handler(codec, _ERROR_CALLBACK)
-
-            opj2.setup_encoder(codec, self._cparams, image)
-
-            strm = opj2.stream_create_default_file_stream(self.filename,
-                                                          False)
-            stack.callback(opj2.stream_destroy, strm)
-
-            opj2.start_compress(codec, image, strm)
-            opj2.encode(codec, strm)
-            opj2.end_compress(codec, strm)
-
-        # Refresh the metadata.
-        self.parse()
-
     def append(self, box):
         """Append a JP2 box to the file in-place.
 
@@ -779,8 +945,20 @@ class Jp2k(Jp2kBox):
                    "appended.")
             raise IOError(msg)
 
-        # Check the last box.  If the length field is zero, then rewrite
-        # the length field to reflect the true length of the box.
+        self._fix_zero_length_last_box()
+
+        # Can now safely append the box.
+        with open(self.filename, 'ab') as ofile:
+            box.write(ofile)
+
+        self._reparse()
+
+    def _fix_zero_length_last_box(self):
+        """Make the length field of the last box explicit.
+
+        A length field of zero means that the last box extends to the end of
+        the file, which is no longer true once anything is written after it.
+        """
         with open(self.filename, 'rb') as ifile:
             offset = self.box[-1].offset
             ifile.seek(offset)
@@ -794,11 +972,152 @@ class Jp2k(Jp2kBox):
                     write_buffer = struct.pack('>I', true_box_length)
                     ofile.write(write_buffer)
 
-        # Can now safely append the box.
-        with open(self.filename, 'ab') as ofile:
-            box.write(ofile)
+    def replace(self, box, new_box):
+        """Replace a top-level metadata box in-place.
 
-        self.parse()
+        The codestream is never rewritten.  If the new box fits in the space
+        occupied by the old box (plus any free boxes immediately following
+        it), it is written there and the leftover space becomes a free box.
+        Otherwise the boxes following the old box are relocated if none of
+        them is a codestream box, or else the old box is turned into a free
+        box and the new box is appended to the end of the file.
+
+        Parameters
+        ----------
+        box : Jp2kBox
+            Top-level box (an element of the box attribute) to be replaced.
+        new_box : Jp2kBox
+            Box to take its place.
+        """
+        idx = self._validate_editable_box(box)
+        self._validate_editable_box_id(new_box.box_id)
+
+        bfptr = io.BytesIO()
+        new_box.write(bfptr)
+        write_buffer = bfptr.getvalue()
+
+        self._fix_zero_length_last_box()
+        file_length = os.path.getsize(self.filename)
+
+        # The old box and any free boxes following it make up the available
+        # space.
+        start = box.offset
+        end = box.offset + box.length
+        for other in self.box[idx + 1:]:
+            if other.box_id != 'free':
+                break
+            end += other.length
+
+        num_bytes = len(write_buffer)
+        with open(self.filename, 'r+b') as fptr:
+            if num_bytes == end - start or num_bytes + 8 <= end - start:
+                # Fits, possibly with a free box taking up the slack.
+                fptr.seek(start)
+                fptr.write(write_buffer)
+                if num_bytes < end - start:
+                    FreeBox(length=end - start - num_bytes).write(fptr)
+            elif self._can_relocate(self.box[idx + 1:]):
+                # Relocate the trailing metadata boxes.
+                fptr.seek(end)
+                trailing_buffer = fptr.read(file_length - end)
+                fptr.seek(start)
+                fptr.write(write_buffer)
+                fptr.write(trailing_buffer)
+                fptr.truncate()
+            else:
+                # The codestream follows, so it cannot be relocated.  Free up
+                # the old space and put the new box at the end of the file.
+                fptr.seek(start)
+                FreeBox(length=end - start).write(fptr)
+                fptr.seek(file_length)
+                fptr.write(write_buffer)
+
+        self._reparse()
+
+    def remove(self, box):
+        """Remove a top-level metadata box in-place.
+
+        The codestream is never rewritten.  The box is converted into a free
+        box (coalescing with adjacent free boxes) unless it sits at the end
+        of the file, in which case the file is simply truncated.
+
+        Parameters
+        ----------
+        box : Jp2kBox
+            Top-level box (an element of the box attribute) to be removed.
+
+        Examples
+        --------
+        >>> import glymur, shutil, tempfile
+        >>> tfile = tempfile.NamedTemporaryFile(suffix='.jp2')
+        >>> _ = shutil.copyfile(glymur.data.nemo(), tfile.name)
+        >>> jp2 = glymur.Jp2k(tfile.name)
+        >>> jp2.remove(jp2.box[3])
+        >>> [box.box_id for box in jp2.box]
+        ['jP  ', 'ftyp', 'jp2h', 'free', 'jp2c']
+        """
+        idx = self._validate_editable_box(box)
+
+        self._fix_zero_length_last_box()
+        file_length = os.path.getsize(self.filename)
+
+        # Coalesce with the free boxes on either side.
+        first, last = idx, idx
+        while first > 0 and self.box[first - 1].box_id == 'free':
+            first -= 1
+        while last < len(self.box) - 1 and self.box[last + 1].box_id == 'free':
+            last += 1
+        start = self.box[first].offset
+        end = self.box[last].offset + self.box[last].length
+
+        with open(self.filename, 'r+b') as fptr:
+            fptr.seek(start)
+            if end >= file_length:
+                fptr.truncate()
+            else:
+                FreeBox(length=end - start).write(fptr)
+
+        self._reparse()
+
+    def _validate_editable_box(self, box):
+        """Verify that a box can be edited in-place.
+
+        Returns
+        -------
+        int
+            Index of the box in the list of top-level boxes.
+        """
+        if self._codec_format == opj2.CODEC_J2K:
+            msg = "Only JP2 files can currently be edited in-place."
+            raise IOError(msg)
+
+        self._validate_editable_box_id(box.box_id)
+
+        for idx in self._box_index().get(box.box_id, []):
+            if self.box[idx].offset == box.offset:
+                return idx
+
+        msg = ("The {box_id} box at byte offset {offset} is not a top-level "
+               "box of {filename}.")
+        msg = msg.format(box_id=box.box_id, offset=box.offset,
+                         filename=self.filename)
+        raise IOError(msg)
+
+    def _validate_editable_box_id(self, box_id):
+        """Only metadata boxes may be edited in-place."""
+        if box_id in ['jP  ', 'ftyp', 'jp2h', 'jp2c', 'free']:
+            msg = "A {0} box cannot be edited in-place.".format(box_id)
+            raise IOError(msg)
+
+    def _can_relocate(self, boxes):
+        """Determine if the given boxes can be moved within the file.
+
+        Codestreams are never relocated, and nothing may move if fragment
+        tables refer to absolute file offsets.
+        """
+        if any(box.box_id == 'jp2c' for box in boxes):
+            return False
+        return self.find('ftbl') is None
 
     def wrap(self, filename, boxes=None):
         """Create a new JP2/JPX file wrapped in a new set of JP2 boxes.
@@ -857,7 +1176,7 @@ class Jp2k(Jp2kBox):
             # of myself out to file.
             ofile.write(struct.pack('>I', self.length + 8))
             ofile.write(b'jp2c')
-            with open(self.filename, 'rb') as ifile:
+            with self._source.open() as ifile:
                 ofile.write(ifile.read())
             return
 
@@ -872,11 +1191,10 @@ class Jp2k(Jp2kBox):
                 raise IOError(msg)
 
             # Find the first codestream in the file.
-            jp2c = [_box for _box in self.box if _box.box_id == 'jp2c']
-            offset = jp2c[0].offset
+            offset = self.find('jp2c').offset
 
         # Ready to write the codestream.
-        with open(self.filename, 'rb') as ifile:
+        with self._source.open() as ifile:
             ifile.seek(offset)
 
             # Verify that the specified codestream is right.
@@ -888,7 +1206,7 @@ class Jp2k(Jp2kBox):
             if L == 0:
                 # The length of the box is presumed to last until the end of
                 # the file.  Compute the effective length of the box.
-                L = os.path.getsize(ifile.name) - ifile.tell() + 8
+                L = self.length - ifile.tell() + 8
 
             elif L == 1:
                 # The length of the box is in the XL field, a 64-bit value.
@@ -918,8 +1236,7 @@ class Jp2k(Jp2kBox):
             else:
                 # Take whatever the first jp2 header / color specification
                 # says.
-                jp2hs = [box for box in self.box if box.box_id == 'jp2h']
-                colorspace = jp2hs[0].box[1].colorspace
+                colorspace = self.find('jp2h/colr').colorspace
 
         boxes[2].box = [ImageHeaderBox(height=height, width=width,
                                        num_components=num_components),
@@ -927,6 +1244,188 @@ class Jp2k(Jp2kBox):
 
         return boxes
 
+    def truncate(self, filename, max_layers=None, reduce=0):
+        """Write a smaller copy with fewer quality layers or resolutions.
+
+        Only the packets that are kept are copied, and the SIZ, COD, COC,
+        QCD, QCC, SOT, TLM, and PLT segments are rewritten to match.  No
+        wavelet data is decoded, so this runs at I/O speed.  Packets are
+        located through PLT or PLM segments, or else by reading their
+        headers.
+
+        Parameters
+        ----------
+        filename : str
+            File to be created.  It is a JP2 file with the same boxes if
+            this is one, and a raw codestream otherwise.
+        max_layers : int, optional
+            Number of quality layers to keep, all of them by default.
+        reduce : int, optional
+            Number of the highest resolution levels to drop.  Each one
+            halves the size of the image.
+
+        Returns
+        -------
+        Jp2k
+            The new file.
+        """
+        codestream = self.get_codestream(header_only=False)
+
+        def write(ifile, ofile):
+            return _transcode.truncate(codestream, ifile, ofile,
+                                       max_layers=max_layers, reduce=reduce)
+
+        siz = codestream.segment[1]
+        scale = 2 ** reduce
+        height = -(-siz.ysiz // scale) - -(-siz.yosiz // scale)
+        width = -(-siz.xsiz // scale) - -(-siz.xosiz // scale)
+        self._rewrite_codestream(filename, write, size=(height, width))
+        return Jp2k(filename)
+
+    def reindex(self, filename):
+        """Write a copy that signals the locations of tiles and packets.
+
+        The codestream gets a TLM segment giving the length of every
+        tile-part, and each tile-part header a PLT segment giving the length
+        of every packet, which lets any tile or packet be found without
+        reading through the ones before it.  Packet lengths are found by
+        reading the packet headers, and the packets themselves are copied
+        unchanged.
+
+        Parameters
+        ----------
+        filename : str
+            File to be created.  It is a JP2 file with the same boxes if
+            this is one, and a raw codestream otherwise.
+
+        Returns
+        -------
+        Jp2k
+            The new file.
+        """
+        codestream = self.get_codestream(header_only=False)
+
+        def write(ifile, ofile):
+            return _transcode.reindex(codestream, ifile, ofile)
+
+        self._rewrite_codestream(filename, write)
+        return Jp2k(filename)
+
+    def reorder(self, filename, prog):
+        """Write a copy with the packets in another progression order.
+
+        The packets are moved rather than decoded, so this runs at I/O
+        speed.  Each tile of the copy is a single tile-part.
+
+        Parameters
+        ----------
+        filename : str
+            File to be created.  It is a JP2 file with the same boxes if
+            this is one, and a raw codestream otherwise.
+        prog : {"LRCP" "RLCP", "RPCL", "PCRL", "CPRL"}
+            The new progression order.
+
+        Returns
+        -------
+        Jp2k
+            The new file.
+
+        Examples
+        --------
+        >>> import glymur, tempfile
+        >>> jfile = glymur.data.goodstuff()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        >>> j = jp2.reorder(tfile.name, 'RPCL')
+        >>> j.get_codestream().segment[2].prog_order == glymur.core.RPCL
+        True
+        """
+        codestream = self.get_codestream(header_only=False)
+        prog_order = core.PROGRESSION_ORDER[prog.upper()]
+
+        def write(ifile, ofile):
+            return _transcode.reorder(codestream, ifile, ofile, prog_order)
+
+        self._rewrite_codestream(filename, write)
+        return Jp2k(filename)
+
+    def _rewrite_codestream(self, filename, write, size=None):
+        """Write a new file in which the codestream is rewritten.
+
+        A JP2 file keeps all of its other boxes, and its image header box is
+        updated with the new image size.
+
+        Parameters
+        ----------
+        filename : str
+            File to be created.  This may be the file itself, which is then
+            replaced once the new one is complete.
+        write : callable
+            Called with the input and output files to write the new
+            codestream, returning its length.
+        size : tuple, optional
+            (height, width) of the new image.
+        """
+        if len(self.findall('jp2c')) > 1 or self.find('ftbl') is not None:
+            msg = ("Only files with a single contiguous codestream can have "
+                   "their codestream rewritten.")
+            raise IOError(msg)
+
+        in_place = (self._source.is_local and os.path.exists(filename) and
+                    os.path.samefile(filename, self.filename))
+        if not in_place:
+            with self._source.open() as ifile, open(filename, 'wb') as ofile:
+                self._write_rewritten_boxes(ifile, ofile, write, size)
+            return
+
+        # The file cannot be overwritten while it is still being read, so
+        # write the new one alongside it, then put it in its place.
+        import shutil
+        import tempfile
+
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, tmpname = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with self._source.open() as ifile, os.fdopen(fd, 'wb') as ofile:
+                self._write_rewritten_boxes(ifile, ofile, write, size)
+            shutil.copymode(filename, tmpname)
+            getattr(os, 'replace', os.rename)(tmpname, filename)
+        except BaseException:
+            if os.path.exists(tmpname):
+                os.remove(tmpname)
+            raise
+
+    def _write_rewritten_boxes(self, ifile, ofile, write, size):
+        """Copy the boxes of the file, rewriting the codestream.
+
+        See _rewrite_codestream for the parameters.
+        """
+        if len(self.box) == 0:
+            write(ifile, ofile)
+            return
+
+        for box in self.box:
+            if box.box_id == 'jp2c':
+                start = ofile.tell()
+                ofile.write(struct.pack('>I4s', 0, b'jp2c'))
+                length = 8 + write(ifile, ofile)
+                if length <= 0xffffffff:
+                    ofile.seek(start)
+                    ofile.write(struct.pack('>I', length))
+                    ofile.seek(0, os.SEEK_END)
+                elif box is not self.box[-1]:
+                    msg = "The codestream is too long for its box."
+                    raise IOError(msg)
+                continue
+
+            ifile.seek(box.offset)
+            write_buffer = bytearray(ifile.read(box.length))
+            if box.box_id == 'jp2h' and size is not None:
+                for ihdr in box.findall('ihdr'):
+                    pos = ihdr.offset - box.offset + 8
+                    struct.pack_into('>II', write_buffer, pos, *size)
+            ofile.write(write_buffer)
+
     def __setitem__(self, index, data):
         """
         Slicing protocol.
@@ -1024,10 +1523,12 @@ class Jp2k(Jp2kBox):
             # Ellipsis object in the 2nd or 3rd position.
             return self.__getitem__(newindex)
 
-        if isinstance(pargs, tuple) and any(isinstance(x, int) for x in pargs):
+        integer = (int, np.integer)
+        if ((isinstance(pargs, tuple) and
+             any(isinstance(x, integer) for x in pargs))):
             # Replace the first such integer argument, replace it with a slice.
             lst = list(pargs)
-            g = filterfalse(lambda x: not isinstance(x[1], int),
+            g = filterfalse(lambda x: not isinstance(x[1], integer),
                             enumerate(pargs))
             idx = next(g)[0]
             lst[idx] = slice(pargs[idx], pargs[idx] + 1)
@@ -1069,16 +1570,44 @@ class Jp2k(Jp2kBox):
                 numrows if rows.stop is None else rows.stop,
                 numcols if cols.stop is None else cols.stop
                 )
-        data = self._read(area=area, rlevel=rlevel)
         if len(pargs) == 2:
+            return self._read(area=area, rlevel=rlevel)
+
+        # Ok, 3 arguments in pargs.  Decode only the bands actually wanted.
+        wanted = np.arange(numbands)[bands].tolist()
+        components = sorted(set(wanted))
+        if len(components) in (0, numbands):
+            data = self._read(area=area, rlevel=rlevel)
+            return data[:, :, bands]
+
+        data = self._read(area=area, rlevel=rlevel, components=components)
+        if data.ndim == 2:
+            data = data[:, :, np.newaxis]
+        if wanted == components:
             return data
+        return data[:, :, [components.index(k) for k in wanted]]
 
-        # Ok, 3 arguments in pargs.
-        return data[:, :, bands]
-
-    def _read(self, **kwargs):
+    def _read(self, rlevel=0, layer=None, area=None, tile=None,
+              verbose=False, components=None):
         """Read a JPEG 2000 image.
 
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layer to decode.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int, optional
+            Number of tile to decode.
+        verbose : bool, optional
+            Print informational messages produced by the OpenJPEG library.
+        components : list, optional
+            Sorted indices of the only components to decode.
+
         Returns
         -------
         ndarray
@@ -1088,18 +1617,262 @@ class Jp2k(Jp2kBox):
         ------
         RuntimeError
             if the proper version of the OpenJPEG library is not available
+        TypeError
+            if a tile is requested but the library cannot decode tiles
         """
-        if re.match("0|1.[01234]", version.openjpeg_version):
+        if not self._backend.can_decode:
             msg = ("You must have at least version 1.5.0 of OpenJPEG "
                    "installed before you can read JPEG2000 images with "
                    "glymur.  Your version is {version}")
-            raise RuntimeError(msg.format(version=version.openjpeg_version))
+            raise RuntimeError(msg.format(version=self._backend.version))
+
+        if tile is not None and not self._backend.can_decode_tiles:
+            msg = "The {name} backend cannot decode individual tiles."
+            raise TypeError(msg.format(name=self._backend.name))
+
+        if layer is not None or self._backend.can_decode_layers:
+            self.layer = layer
+        self._subsampling_sanity_check()
+        if tile is None:
+            image = self._read_cached_tiles(rlevel, area, components)
+            if image is not None:
+                return image
+        return self._decode(rlevel, area=area, tile=tile,
+                            components=components)
+
+    def _read_cached_tiles(self, rlevel, area, components):
+        """Assemble an image area from the tiles in the tile cache.
+
+        Only the tiles not found in glymur.cache.tiles are decoded, and then
+        added to it.
 
-        if version.openjpeg_version_tuple[0] < 2:
-            img = self._read_openjpeg(**kwargs)
+        Returns
+        -------
+        ndarray or None
+            The image data, or None if the cache is disabled or the image
+            cannot be assembled from its tiles here, such as when the image
+            has an offset or subsampled components.
+        """
+        with config._override_options(self._options):
+            max_bytes = config.get_option('cache.tiles')
+        if max_bytes <= 0 or not self._backend.can_decode_tiles:
+            return None
+
+        siz = self.codestream.segment[1]
+        if siz.xosiz or siz.yosiz or any(x != 1 for x in siz.xrsiz +
+                                         siz.yrsiz):
+            return None
+
+        if any(self.find('jp2h/' + box_id) is not None
+               for box_id in ('pclr', 'cmap', 'cdef')):
+            # The library does not apply these to single tiles the same way.
+            return None
+
+        num_levels = self.codestream.segment[2].num_res
+        if rlevel == -1:
+            rlevel = num_levels
+        if area is None:
+            area = (0, 0, siz.ysiz, siz.xsiz)
+        y0, x0 = area[0], area[1]
+        y1, x1 = min(area[2], siz.ysiz), min(area[3], siz.xsiz)
+        if ((not 0 <= rlevel <= num_levels or y0 < 0 or x0 < 0 or
+             y1 <= y0 or x1 <= x0)):
+            # Let the library complain.
+            return None
+
+        def shrink(x):
+            return -(-x // 2 ** rlevel)
+
+        identity = self._source.identity
+        wanted = None if components is None else tuple(components)
+        num_tile_cols = -(-siz.xsiz // siz.xtsiz)
+
+        image = None
+        for row in range(y0 // siz.ytsiz, (y1 - 1) // siz.ytsiz + 1):
+            ty0, ty1 = row * siz.ytsiz, min((row + 1) * siz.ytsiz, siz.ysiz)
+            rows = shrink(max(ty0, y0)), shrink(min(ty1, y1))
+            for col in range(x0 // siz.xtsiz, (x1 - 1) // siz.xtsiz + 1):
+                tx0, tx1 = col * siz.xtsiz, min((col + 1) * siz.xtsiz,
+                                                siz.xsiz)
+                cols = shrink(max(tx0, x0)), shrink(min(tx1, x1))
+                if rows[1] <= rows[0] or cols[1] <= cols[0]:
+                    # The tile vanishes at this resolution.
+                    continue
+
+                tile = row * num_tile_cols + col
+                key = (identity, tile, rlevel, self._layer, wanted)
+                data = cache.tiles.get(key)
+                if data is None:
+                    data = self._decode(rlevel, tile=tile,
+                                        components=components)
+                    data.setflags(write=False)
+                    cache.tiles.put(key, data, data.nbytes, max_bytes)
+
+                if image is None:
+                    shape = (shrink(y1) - shrink(y0), shrink(x1) - shrink(x0))
+                    image = np.empty(shape + data.shape[2:], dtype=data.dtype)
+                image[rows[0] - shrink(y0):rows[1] - shrink(y0),
+                      cols[0] - shrink(x0):cols[1] - shrink(x0)] = \
+                    data[rows[0] - shrink(ty0):rows[1] - shrink(ty0),
+                         cols[0] - shrink(tx0):cols[1] - shrink(tx0)]
+        return image
+
+    def _decode(self, rlevel, area=None, tile=None, native=False,
+                components=None, layer=None):
+        """Decode image data with the backend.
+
+        Parameters
+        ----------
+        rlevel : int
+            Factor by which to rlevel output resolution.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+        tile : int, optional
+            Number of tile to decode.
+        native : bool, optional
+            If true, return read-only views of the decoded int32 planes.
+        components : list, optional
+            Sorted indices of the only components to decode.
+        layer : int, optional
+            Number of quality layers to decode, overriding the layer property.
+
+        Returns
+        -------
+        ndarray or list
+            Either the image as an ndarray or a list of ndarrays, each item
+            corresponding to one band.
+        """
+        # The library would expand a palette into full int32 planes, so let it
+        # hand back the indices instead.  Native planes are never expanded.
+        palette = None if native else self._get_palette_boxes()
+        self._populate_dparams(rlevel, tile=tile, area=area,
+                               raw=native or palette is not None)
+        if layer is not None:
+            self._dparams.cp_layer = layer
+
+        # Components of a palettized image are not the output channels, so
+        # those can only be picked out after the palette is applied.
+        kwargs = {'native': native}
+        if palette is None:
+            kwargs['components'] = components
+
+        if tile is None:
+            image = self._backend.decode_region(self, self._dparams,
+                                                area=area, **kwargs)
         else:
-            img = self._read_openjp2(**kwargs)
-        return img
+            image = self._backend.decode_tile(self, self._dparams, tile,
+                                              **kwargs)
+
+        if palette is not None:
+            image = self._apply_palette(image, *palette)
+            if components is not None:
+                image = image[:, :, components]
+                if len(components) == 1:
+                    image = image[:, :, 0]
+        return image
+
+    def _components_are_independent(self):
+        """Can the codestream components be decoded separately?
+
+        Any multiple component transform or channel definition would mix up or
+        rearrange the components on the way to the output channels.
+        """
+        cod = [seg for seg in self.codestream.segment
+               if seg.marker_id == 'COD']
+        if len(cod) > 0 and cod[0].mct:
+            return False
+
+        if self._codec_format == opj2.CODEC_JP2:
+            if self.find('jp2h/cdef') is not None:
+                return False
+
+        return True
+
+    def _get_palette_boxes(self):
+        """Find the boxes needed to expand palette indices.
+
+        Returns
+        -------
+        tuple or None
+            The pclr, cmap, and cdef boxes (the latter possibly None), or None
+            if there is no palette to be applied.
+        """
+        if self.ignore_pclr_cmap_cdef or self._codec_format != opj2.CODEC_JP2:
+            return None
+
+        pclr = self.find('jp2h/pclr')
+        cmap = self.find('jp2h/cmap')
+        if pclr is None or cmap is None:
+            return None
+
+        return pclr, cmap, self.find('jp2h/cdef')
+
+    def _apply_palette(self, image, pclr, cmap, cdef=None):
+        """Map palette indices into colour channels.
+
+        Parameters
+        ----------
+        image : ndarray
+            Decoded codestream components.
+        pclr : PaletteBox
+            Palette.
+        cmap : ComponentMappingBox
+            Maps codestream components and palette columns into channels.
+        cdef : ChannelDefinitionBox, optional
+            Reorders the channels.
+
+        Returns
+        -------
+        ndarray
+            The image data.
+        """
+        if image.ndim == 2:
+            image = image[:, :, np.newaxis]
+        num_channels = len(cmap.component_index)
+
+        # Work out the final order of the channels up front, swapping them
+        # around the same way as the OpenJPEG library would.
+        order = list(range(num_channels))
+        if cdef is not None:
+            entries = [list(x) for x in zip(cdef.index, cdef.channel_type,
+                                            cdef.association)]
+            for j, (channel, channel_type, association) in enumerate(entries):
+                if channel_type == 65535 or association in (0, 65535):
+                    continue
+                target = association - 1
+                if channel == target or max(channel, target) >= num_channels:
+                    continue
+                order[channel], order[target] = order[target], order[channel]
+                for entry in entries[j + 1:]:
+                    if entry[0] == target:
+                        entry[0] = channel
+
+        components = [cmap.component_index[k] for k in order]
+        mapping_types = [cmap.mapping_type[k] for k in order]
+        columns = [cmap.palette_index[k] for k in order]
+
+        if len(set(components)) == 1 and all(mapping_types):
+            # The usual case, where a single component is expanded into all
+            # the channels with just one lookup.
+            image = np.take(pclr.palette[:, columns],
+                            image[:, :, components[0]], axis=0, mode='clip')
+        else:
+            channels = []
+            for component, mapping_type, column in zip(components,
+                                                       mapping_types,
+                                                       columns):
+                if mapping_type:
+                    channel = np.take(pclr.palette[:, column],
+                                      image[:, :, component], mode='clip')
+                else:
+                    channel = image[:, :, component]
+                channels.append(channel)
+            image = np.dstack(channels)
+
+        if image.shape[2] == 1:
+            image = image[:, :, 0]
+        return image
 
     def read(self, **kwargs):
         """
@@ -1151,157 +1924,7 @@ class Jp2k(Jp2kBox):
             msg = msg.format(siz_segment=str(self.codestream.segment[1]))
             raise IOError(msg)
 
-    def _read_openjpeg(self, rlevel=0, verbose=False, area=None):
-        """Read a JPEG 2000 image using libopenjpeg.
-
-        Parameters
-        ----------
-        rlevel : int, optional
-            Factor by which to rlevel output resolution.  Use -1 to get the
-            lowest resolution thumbnail.
-        verbose : bool, optional
-            Print informational messages produced by the OpenJPEG library.
-        area : tuple, optional
-            Specifies decoding image area,
-            (first_row, first_col, last_row, last_col)
-
-        Returns
-        -------
-        ndarray
-            The image data.
-
-        Raises
-        ------
-        RuntimeError
-            If the image has differing subsample factors.
-        """
-        self._subsampling_sanity_check()
-
-        self._populate_dparams(rlevel)
-
-        with ExitStack() as stack:
-            try:
-                self._dparams.decod_format = self._codec_format
-
-                dinfo = opj.create_decompress(self._dparams.decod_format)
-
-                event_mgr = opj.EventMgrType()
-                handler = ctypes.cast(_INFO_CALLBACK, ctypes.c_void_p)
-                event_mgr.info_handler = handler if self.verbose else None
-                event_mgr.warning_handler = ctypes.cast(_WARNING_CALLBACK,
-                                                        ctypes.c_void_p)
-                event_mgr.error_handler = ctypes.cast(_ERROR_CALLBACK,
-                                                      ctypes.c_void_p)
-                opj.set_event_mgr(dinfo, ctypes.byref(event_mgr))
-
-                opj.setup_decoder(dinfo, self._dparams)
-
-                with open(self.filename, 'rb') as fptr:
-                    src = fptr.read()
-                cio = opj.cio_open(dinfo, src)
-
-                raw_image = opj.decode(dinfo, cio)
-
-                stack.callback(opj.image_destroy, raw_image)
-                stack.callback(opj.destroy_decompress, dinfo)
-                stack.callback(opj.cio_close, cio)
-
-                image = self._extract_image(raw_image)
-
-            except ValueError:
-                opj2.check_error(0)
-
-        if area is not None:
-            x0, y0, x1, y1 = area
-            extent = 2 ** rlevel
-
-            area = [int(round(float(x) / extent + 2 ** -20)) for x in area]
-            rows = slice(area[0], area[2], None)
-            cols = slice(area[1], area[3], None)
-            image = image[rows, cols]
-
-        return image
-
-    def _read_openjp2(self, rlevel=0, layer=None, area=None, tile=None,
-                      verbose=False):
-        """Read a JPEG 2000 image using libopenjp2.
-
-        Parameters
-        ----------
-        layer : int, optional
-            Number of quality layer to decode.
-        rlevel : int, optional
-            Factor by which to rlevel output resolution.  Use -1 to get the
-            lowest resolution thumbnail.
-        area : tuple, optional
-            Specifies decoding image area,
-            (first_row, first_col, last_row, last_col)
-        tile : int, optional
-            Number of tile to decode.
-        verbose : bool, optional
-            Print informational messages produced by the OpenJPEG library.
-
-        Returns
-        -------
-        ndarray
-            The image data.
-
-        Raises
-        ------
-        RuntimeError
-            If the image has differing subsample factors.
-        """
-        self.layer = layer
-        self._subsampling_sanity_check()
-        self._populate_dparams(rlevel, tile=tile, area=area)
-        image = self._read_openjp2_common()
-        return image
-
-    def _read_openjp2_common(self):
-        """
-        Read a JPEG 2000 image using libopenjp2.
-
-        Returns
-        -------
-        ndarray or lst
-            Either the image as an ndarray or a list of ndarrays, each item
-            corresponding to one band.
-        """
-        with ExitStack() as stack:
-            filename = self.filename
-            stream = opj2.stream_create_default_file_stream(filename, True)
-            stack.callback(opj2.stream_destroy, stream)
-            codec = opj2.create_decompress(self._codec_format)
-            stack.callback(opj2.destroy_codec, codec)
-
-            opj2.set_error_handler(codec, _ERROR_CALLBACK)
-            opj2.set_warning_handler(codec, _WARNING_CALLBACK)
-
-            if self._verbose:
-                opj2.set_info_handler(codec, _INFO_CALLBACK)
-            else:
-                opj2.set_info_handler(codec, None)
-
-            opj2.setup_decoder(codec, self._dparams)
-            raw_image = opj2.read_header(stream, codec)
-            stack.callback(opj2.image_destroy, raw_image)
-
-            if self._dparams.nb_tile_to_decode:
-                opj2.get_decoded_tile(codec, stream, raw_image,
-                                      self._dparams.tile_index)
-            else:
-                opj2.set_decode_area(codec, raw_image,
-                                     self._dparams.DA_x0, self._dparams.DA_y0,
-                                     self._dparams.DA_x1, self._dparams.DA_y1)
-                opj2.decode(codec, stream, raw_image)
-
-            opj2.end_decompress(codec, stream)
-
-            image = self._extract_image(raw_image)
-
-        return image
-
-    def _populate_dparams(self, rlevel, tile=None, area=None):
+    def _populate_dparams(self, rlevel, tile=None, area=None, raw=False):
         """Populate decompression structure with appropriate input parameters.
 
         Parameters
@@ -1313,12 +1936,11 @@ class Jp2k(Jp2kBox):
             (first_row, first_col, last_row, last_col)
         tile : int
             Number of tile to decode.
+        raw : bool
+            If true, ignore the pclr, cmap, and cdef boxes regardless of
+            the ignore_pclr_cmap_cdef property.
         """
-        if opj2.OPENJP2 is not None:
-            dparam = opj2.set_default_decoder_parameters()
-        else:
-            dparam = opj.DecompressionParametersType()
-            opj.set_default_decoder_parameters(ctypes.byref(dparam))
+        dparam = self._backend.default_decoder_parameters()
 
         infile = self.filename.encode()
         nelts = opj2.PATH_LEN - len(infile)
@@ -1327,7 +1949,7 @@ class Jp2k(Jp2kBox):
 
         # Return raw codestream components instead of "interpolating" the
         # colormap?
-        dparam.flags |= 1 if self.ignore_pclr_cmap_cdef else 0
+        dparam.flags |= 1 if self.ignore_pclr_cmap_cdef or raw else 0
 
         dparam.decod_format = self._codec_format
         dparam.cp_layer = self._layer
@@ -1368,7 +1990,8 @@ class Jp2k(Jp2kBox):
         self._dparams = dparam
 
     def read_bands(self, rlevel=0, layer=None, area=None, tile=None,
-                   verbose=False, ignore_pclr_cmap_cdef=False):
+                   verbose=False, ignore_pclr_cmap_cdef=False, native=False,
+                   components=None):
         """Read a JPEG 2000 image.
 
         The only time you should use this method is when the image has
@@ -1391,6 +2014,14 @@ class Jp2k(Jp2kBox):
             color transformation.  Defaults to False.
         verbose : bool, optional
             Print informational messages produced by the OpenJPEG library.
+        native : bool, optional
+            If true, return the library's own int32 component planes as
+            read-only arrays without any copying or conversion.  The planes
+            remain valid for as long as any of the arrays is referenced.  Any
+            palette is not applied.
+        components : sequence of int, optional
+            Indices of the only components to decode, returned in ascending
+            order.
 
         Returns
         -------
@@ -1408,27 +2039,125 @@ class Jp2k(Jp2kBox):
         >>> jp = glymur.Jp2k(jfile)
         >>> components_lst = jp.read_bands(rlevel=1)
         """
-        if version.openjpeg_version < '2.1.0':
+        if not self._backend.can_decode_bands:
             msg = ("You must have at least version 2.1.0 of OpenJPEG "
                    "installed before using this method.  Your version of "
                    "OpenJPEG is {version}.")
-            msg = msg.format(version=version.openjpeg_version)
+            msg = msg.format(version=self._backend.version)
             raise IOError(msg)
 
         self.ignore_pclr_cmap_cdef = ignore_pclr_cmap_cdef
         self.layer = layer
-        self._populate_dparams(rlevel, tile=tile, area=area)
-        lst = self._read_openjp2_common()
+        if components is not None:
+            components = sorted(set(components))
+        lst = self._decode(rlevel, area=area, tile=tile, native=native,
+                           components=components)
         return lst
 
-    def _extract_image(self, raw_image):
+    def iter_layers(self, rlevel=0, area=None):
+        """Read a JPEG 2000 image with successively more quality layers.
+
+        OpenJPEG cannot resume decoding where it left off with more layers, so
+        each image is decoded from scratch, and the total cost grows with the
+        square of the number of layers.  The bytes needed for the area are
+        prefetched from the file up front, which is what saves time with
+        remote files.
+
+        Parameters
+        ----------
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col)
+
+        Yields
+        ------
+        ndarray
+            The image decoded from the first one, two, etc. quality layers,
+            the last being the full quality image.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp = glymur.Jp2k(jfile)
+        >>> for image in jp.iter_layers(rlevel=1):
+        ...     print(image.shape)
+        (728, 1296, 3)
+        (728, 1296, 3)
+        """
+        if not self._backend.can_decode_layers:
+            msg = ("Iterating over quality layers is not supported unless "
+                   "the OpenJPEG library version is 2.1 or higher.  The "
+                   "installed version is {version}.")
+            msg = msg.format(version=self._backend.version)
+            raise IOError(msg)
+
+        self._subsampling_sanity_check()
+
+        cod = [seg for seg in self.codestream.segment
+               if seg.marker_id == 'COD'][0]
+
+        self._source.prefetch(self.plan_read(area=area, rlevel=rlevel))
+
+        for layer in range(1, cod.layers + 1):
+            yield self._decode(rlevel, area=area, layer=layer)
+
+    def plan_read(self, area=None, rlevel=0, layer=None, components=None):
+        """Compute the byte ranges of the file needed to decode an image.
+
+        Only the tiles intersecting the area are needed.  If the codestream
+        signals packet lengths in PLT or PLM segments, this is narrowed down
+        to the packets of the wanted resolutions, quality layers, components,
+        and precincts.  Ranges can be fetched ahead of decoding, e.g. from
+        object storage.
+
+        Parameters
+        ----------
+        area : tuple, optional
+            Specifies decoding image area,
+            (first_row, first_col, last_row, last_col).  The last row and
+            column are excluded, as in slicing.
+        rlevel : int, optional
+            Factor by which to rlevel output resolution.  Use -1 to get the
+            lowest resolution thumbnail.
+        layer : int, optional
+            Number of quality layers to decode, all of them by default.
+        components : sequence of int, optional
+            Indices of the codestream components wanted.
+
+        Returns
+        -------
+        list
+            Sorted, non-overlapping (offset, length) tuples.
+
+        Examples
+        --------
+        >>> import glymur
+        >>> jfile = glymur.data.nemo()
+        >>> jp2 = glymur.Jp2k(jfile)
+        >>> jp2.plan_read(area=(0, 0, 64, 64))
+        [(0, 1135519)]
+        """
+        codestream = self.get_codestream(header_only=False)
+        return _packets.plan_read(codestream, area=area, rlevel=rlevel,
+                                  layer=layer, components=components)
+
+    def _extract_image(self, raw_image, native=False, components=None):
         """
         Extract unequally-sized image bands.
 
         Parameters
         ----------
-        raw_image : reference to openjpeg ImageType instance
+        raw_image : glymur.backend._DecodedImage
             The image structure initialized with image characteristics.
+        native : bool, optional
+            If true, return a list of read-only views of the int32 component
+            planes owned by the library instead of copying them.
+        components : list, optional
+            Sorted indices of the only components wanted.  If the library
+            decoded all of them anyway, the others are skipped here.
 
         Returns
         -------
@@ -1437,12 +2166,17 @@ class Jp2k(Jp2kBox):
             extracted into a list, otherwise a numpy array.
 
         """
-        ncomps = raw_image.contents.numcomps
+        if ((components is not None and
+             raw_image.contents.numcomps != len(components))):
+            indices = components
+        else:
+            indices = range(raw_image.contents.numcomps)
+        ncomps = len(indices)
 
         # Make a pass thru the image, see if any of the band datatypes or
         # dimensions differ.
         dtypes, nrows, ncols = [], [], []
-        for k in range(raw_image.contents.numcomps):
+        for k in indices:
             component = raw_image.contents.comps[k]
             dtypes.append(self._component2dtype(component))
             nrows.append(component.h)
@@ -1450,33 +2184,30 @@ class Jp2k(Jp2kBox):
         is_cube = all(r == nrows[0] and c == ncols[0] and d == dtypes[0]
                       for r, c, d in zip(nrows, ncols, dtypes))
 
-        if is_cube:
-            image = np.zeros((nrows[0], ncols[0], ncomps), dtypes[0])
-        else:
-            image = []
+        bands = []
+        for j, k in enumerate(indices):
+            self._validate_nonzero_image_size(nrows[j], ncols[j], k)
 
-        for k in range(raw_image.contents.numcomps):
-            component = raw_image.contents.comps[k]
+            if native:
+                bands.append(raw_image.component(k, writeable=False))
+            elif dtypes[j] in (np.int32, np.uint32):
+                # Same width as the library's own samples, so the memory can
+                # be used as-is.
+                bands.append(raw_image.component(k, dtype=dtypes[j]))
+            else:
+                bands.append(raw_image.component(k).astype(dtypes[j]))
 
-            self._validate_nonzero_image_size(nrows[k], ncols[k], k)
-
-            addr = ctypes.addressof(component.data.contents)
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                nelts = nrows[k] * ncols[k]
-                band = np.ctypeslib.as_array(
-                    (ctypes.c_int32 * nelts).from_address(addr))
-                if is_cube:
-                    image[:, :, k] = np.reshape(band.astype(dtypes[k]),
-                                                (nrows[k], ncols[k]))
-                else:
-                    image.append(np.reshape(band.astype(dtypes[k]),
-                                 (nrows[k], ncols[k])))
+        if native or not is_cube:
+            return bands
 
-        if is_cube and image.shape[2] == 1:
-            # The third dimension has just a single layer.  Make the image
-            # data 2D instead of 3D.
-            image.shape = image.shape[0:2]
+        if ncomps == 1:
+            # The third dimension would have just a single layer.  Make the
+            # image data 2D instead of 3D.
+            return bands[0]
+
+        image = np.empty((nrows[0], ncols[0], ncomps), dtypes[0])
+        for k, band in enumerate(bands):
+            image[:, :, k] = band
 
         return image
 
@@ -1493,14 +2224,41 @@ class Jp2k(Jp2kBox):
         builtins.type
             numpy datatype to be used to construct an image array
         """
-        if component.prec > 16:
-            msg = "Unhandled precision: {0} bits.".format(component.prec)
+        return self._precision2dtype(component.prec, component.sgnd)
+
+    def _precision2dtype(self, precision, signed):
+        """Determine the numpy datatype for samples of a given precision.
+
+        Parameters
+        ----------
+        precision : int
+            Number of bits per sample.
+        signed : bool
+            True if the samples are signed.
+
+        Returns
+        -------
+        builtins.type
+            numpy datatype to be used to construct an image array
+        """
+        if precision > 32:
+            msg = "Unhandled precision: {0} bits.".format(precision)
             raise IOError(msg)
 
-        if component.sgnd:
-            dtype = np.int8 if component.prec <=8 else np.int16
+        if signed:
+            if precision <= 8:
+                dtype = np.int8
+            elif precision <= 16:
+                dtype = np.int16
+            else:
+                dtype = np.int32
         else:
-            dtype = np.uint8 if component.prec <=8 else np.uint16
+            if precision <= 8:
+                dtype = np.uint8
+            elif precision <= 16:
+                dtype = np.uint16
+            else:
+                dtype = np.uint32
 
         return dtype
 
@@ -1535,19 +2293,18 @@ class Jp2k(Jp2kBox):
             Signed:  (False, False, False)
             Vertical, Horizontal Subsampling:  ((1, 1), (1, 1), (1, 1))
         """
-        with open(self.filename, 'rb') as fptr:
+        with self._source.open() as fptr:
             if self._codec_format == opj2.CODEC_J2K:
                 codestream = Codestream(fptr, self.length,
                                         header_only=header_only)
             else:
-                box = [x for x in self.box if x.box_id == 'jp2c']
-                fptr.seek(box[0].offset)
+                fptr.seek(self.find('jp2c').offset)
                 read_buffer = fptr.read(8)
                 (box_length, _) = struct.unpack('>I4s', read_buffer)
                 if box_length == 0:
                     # The length of the box is presumed to last until the end
                     # of the file.  Compute the effective length of the box.
-                    box_length = os.path.getsize(fptr.name) - fptr.tell() + 8
+                    box_length = self.length - fptr.tell() + 8
                 elif box_length == 1:
                     # Seek past the XL field.
                     read_buffer = fptr.read(8)
@@ -1572,13 +2329,7 @@ class Jp2k(Jp2kBox):
         for k in range(num_comps):
             self._validate_nonzero_image_size(numrows, numcols, k)
 
-        # set image offset and reference grid
-        image.contents.x0 = self._cparams.image_offset_x0
-        image.contents.y0 = self._cparams.image_offset_y0
-        image.contents.x1 = (image.contents.x0 +
-                             (numcols - 1) * self._cparams.subsampling_dx + 1)
-        image.contents.y1 = (image.contents.y0 +
-                             (numrows - 1) * self._cparams.subsampling_dy + 1)
+        self._populate_image_extent(image, numrows, numcols)
 
         # Stage the image data to the openjpeg data structure.
         for k in range(0, num_comps):
@@ -1594,6 +2345,23 @@ class Jp2k(Jp2kBox):
 
         return image
 
+    def _populate_image_extent(self, image, numrows, numcols):
+        """Set the image offset and reference grid.
+
+        Parameters
+        ----------
+        image : ImageType(ctypes.Structure)
+            Corresponds to image_t type in openjp2 headers.
+        numrows, numcols : int
+            Image dimensions.
+        """
+        image.contents.x0 = self._cparams.image_offset_x0
+        image.contents.y0 = self._cparams.image_offset_y0
+        image.contents.x1 = (image.contents.x0 +
+                             (numcols - 1) * self._cparams.subsampling_dx + 1)
+        image.contents.y1 = (image.contents.y0 +
+                             (numrows - 1) * self._cparams.subsampling_dy + 1)
+
     def _populate_comptparms(self, img_array):
         """Instantiate and populate comptparms structure.
 
@@ -1611,10 +2379,7 @@ class Jp2k(Jp2kBox):
             comp_prec = 16
 
         numrows, numcols, num_comps = img_array.shape
-        if version.openjpeg_version_tuple[0] == 1:
-            comptparms = (opj.ImageComptParmType * num_comps)()
-        else:
-            comptparms = (opj2.ImageComptParmType * num_comps)()
+        comptparms = self._backend.create_comptparms(num_comps)
         for j in range(num_comps):
             comptparms[j].dx = self._cparams.subsampling_dx
             comptparms[j].dy = self._cparams.subsampling_dy
@@ -1666,9 +2431,8 @@ class Jp2k(Jp2kBox):
         """
         Validate JP2 requirements on colour specification boxes.
         """
-        lst = [box for box in boxes if box.box_id == 'jp2h']
-        jp2h = lst[0]
-        for colr in [box for box in jp2h.box if box.box_id == 'colr']:
+        jp2h = boxes[_index_boxes(boxes)['jp2h'][0]]
+        for colr in jp2h.findall('colr'):
             if colr.approximation != 0:
                 msg = ("A JP2 colr box cannot have a non-zero approximation "
                        "field.")
@@ -1698,11 +2462,9 @@ class Jp2k(Jp2kBox):
     def _validate_jp2c(self, boxes):
         """Validate the codestream box in relation to other boxes."""
         # jp2c must be preceeded by jp2h
-        jp2h_lst = [idx for (idx, box) in enumerate(boxes)
-                    if box.box_id == 'jp2h']
-        jp2h_idx = jp2h_lst[0]
-        jp2c_lst = [idx for (idx, box) in enumerate(boxes)
-                    if box.box_id == 'jp2c']
+        index = _index_boxes(boxes)
+        jp2h_idx = index['jp2h'][0]
+        jp2c_lst = index.get('jp2c', [])
         if len(jp2c_lst) == 0:
             msg = ("A codestream box must be defined in the outermost "
                    "list of boxes.")
@@ -1717,8 +2479,7 @@ class Jp2k(Jp2kBox):
         """Validate the JP2 Header box."""
         self._check_jp2h_child_boxes(boxes, 'top-level')
 
-        jp2h_lst = [box for box in boxes if box.box_id == 'jp2h']
-        jp2h = jp2h_lst[0]
+        jp2h = boxes[_index_boxes(boxes)['jp2h'][0]]
 
         # 1st jp2 header box cannot be empty.
         if len(jp2h.box) == 0:
@@ -1732,25 +2493,22 @@ class Jp2k(Jp2kBox):
             raise IOError(msg)
 
         # colr must be present in jp2 header box.
-        colr_lst = [j for (j, box) in enumerate(jp2h.box)
-                    if box.box_id == 'colr']
-        if len(colr_lst) == 0:
+        colr = jp2h.find('colr')
+        if colr is None:
             msg = "The jp2 header box must contain a color definition box."
             raise IOError(msg)
-        colr = jp2h.box[colr_lst[0]]
 
         self._validate_channel_definition(jp2h, colr)
 
     def _validate_channel_definition(self, jp2h, colr):
         """Validate the channel definition box."""
-        cdef_lst = [j for (j, box) in enumerate(jp2h.box)
-                    if box.box_id == 'cdef']
+        cdef_lst = jp2h.findall('cdef')
         if len(cdef_lst) > 1:
             msg = ("Only one channel definition box is allowed in the "
                    "JP2 header.")
             raise IOError(msg)
         elif len(cdef_lst) == 1:
-            cdef = jp2h.box[cdef_lst[0]]
+            cdef = cdef_lst[0]
             if colr.colorspace == core.SRGB:
                 if any([chan + 1 not in cdef.association or
                         cdef.channel_type[chan] != 0 for chan in [0, 1, 2]]):
@@ -1853,39 +2611,47 @@ class Jp2k(Jp2kBox):
         for box in boxes:
             if box.box_id != 'asoc':
                 if hasattr(box, 'box'):
-                    for boxi in box.box:
-                        if boxi.box_id == 'lbl ':
-                            msg = ("A label box cannot be nested inside a "
-                                   "{0} box.")
-                            msg = msg.format(box.box_id)
-                            raise IOError(msg)
+                    if box.find('lbl ') is not None:
+                        msg = "A label box cannot be nested inside a {0} box."
+                        msg = msg.format(box.box_id)
+                        raise IOError(msg)
                     # Same set of checks on any child boxes.
                     self._validate_label(box.box)
 
 
-# Setup the default callback handlers.  See the callback functions subsection
-# in the ctypes section of the Python documentation for a solid explanation of
-# what's going on here.
-_CMPFUNC = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p)
-
-
-def _default_error_handler(msg, _):
-    """Default error handler callback for libopenjp2."""
-    msg = "OpenJPEG library error:  {0}".format(msg.decode('utf-8').rstrip())
-    opj2.set_error_message(msg)
+def _copy_boxes(boxes):
+    """Copy a tree of boxes, sharing the values of their attributes.
 
+    Boxes taken from the metadata cache can then be altered as usual, say to
+    be written to a new file, without affecting the cache.
+    """
+    copies = []
+    for box in boxes:
+        box = copy.copy(box)
+        if isinstance(getattr(box, 'box', None), list):
+            # The positions of the child boxes do not change.
+            index = box._box_index()
+            box.box = _copy_boxes(box.box)
+            box._index = box.box, box.box.version, index
+        copies.append(box)
+    return copies
 
-def _default_info_handler(msg, _):
-    """Default info handler callback."""
-    print("[INFO] {0}".format(msg.decode('utf-8').rstrip()))
 
+def reindex(src, dst):
+    """Copy a JPEG 2000 file, adding TLM and PLT segments.
 
-def _default_warning_handler(library_msg, _):
-    """Default warning handler callback."""
-    library_msg = library_msg.decode('utf-8').rstrip()
-    msg = "OpenJPEG library warning:  {0}".format(library_msg)
-    warnings.warn(msg, UserWarning)
+    See Jp2k.reindex.
 
-_ERROR_CALLBACK = _CMPFUNC(_default_error_handler)
-_INFO_CALLBACK = _CMPFUNC(_default_info_handler)
-_WARNING_CALLBACK = _CMPFUNC(_default_warning_handler)
+    Parameters
+    ----------
+    src : str or glymur.source.ByteSource
+        The file to be copied.
+    dst : str
+        File to be created.
+
+    Returns
+    -------
+    Jp2k
+        The new file.
+    """
+    return Jp2k(src).reindex(dst)
@@ -1,5 +1,10 @@
-"""This package organizes individual libraries employed by glymur."""
-from . import openjp2 as openjp2
-from . import openjpeg as openjpeg
+"""This package organizes individual libraries employed by glymur.
+
+The libraries are not actually loaded until first used.
+"""
+from .._lazy import lazy_import
+
+openjp2 = lazy_import(__name__ + '.openjp2')
+openjpeg = lazy_import(__name__ + '.openjpeg')
 
 __all__ = [openjp2, openjpeg]
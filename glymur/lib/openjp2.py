@@ -6,6 +6,7 @@ import ctypes
 import re
 import sys
 import textwrap
+import threading
 
 from ..config import glymur_config
 
@@ -34,7 +35,10 @@ if OPENJP2 is not None:
 else:
     _MINOR = 0
 
-ERROR_MSG_LST = []
+# The error handler records messages for the thread calling into the library,
+# so that threads decoding or encoding at the same time do not pick up each
+# other's errors.
+_ERRORS = threading.local()
 
 # Map certain atomic OpenJPEG datatypes to the ctypes equivalents.
 BOOL_TYPE = ctypes.c_int32
@@ -44,6 +48,14 @@ CINEMA_MODE_TYPE = ctypes.c_int32
 RSIZ_CAPABILITIES_TYPE = ctypes.c_int32
 STREAM_TYPE_P = ctypes.c_void_p
 
+# Prototypes of the functions through which a user-defined stream is read.
+STREAM_READ_FUNC = ctypes.CFUNCTYPE(ctypes.c_size_t, ctypes.c_void_p,
+                                    ctypes.c_size_t, ctypes.c_void_p)
+STREAM_SKIP_FUNC = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64,
+                                    ctypes.c_void_p)
+STREAM_SEEK_FUNC = ctypes.CFUNCTYPE(BOOL_TYPE, ctypes.c_int64,
+                                    ctypes.c_void_p)
+
 PATH_LEN = 4096
 J2K_MAXRLVLS = 33
 J2K_MAXBANDS = (3 * J2K_MAXRLVLS - 2)
@@ -582,13 +594,13 @@ def check_error(status):
     for error status in each wrapping function and an exception will always be
     appropriately raised.
     """
-    global ERROR_MSG_LST
     if status != 1:
-        if len(ERROR_MSG_LST) > 0:
+        messages = _error_messages()
+        if len(messages) > 0:
             # clear out the existing error message so that we don't pick up
             # a bad one next time around.
-            msg = '\n'.join(ERROR_MSG_LST)
-            ERROR_MSG_LST = []
+            msg = '\n'.join(messages)
+            del messages[:]
             raise OpenJPEGLibraryError(msg)
         else:
             raise OpenJPEGLibraryError("OpenJPEG function failure.")
@@ -1028,6 +1040,38 @@ def set_decode_area(codec, image, start_x=0, start_y=0, end_x=0, end_y=0):
                                 ctypes.c_int32(end_y))
 
 
+def set_decoded_components(codec, components):
+    """Wraps openjp2 library function opj_set_decoded_components.
+
+    Restricts decoding to a subset of the components.  This function should
+    be called right after read_header and before set_decode_area.  Older
+    versions of the library do not provide it.
+
+    Parameters
+    ----------
+    codec : CODEC_TYPE
+        The JPEG2000 codec.
+    components : sequence of int
+        Indices of the components to decode, zero-indexing assumed.
+
+    Raises
+    ------
+    RuntimeError
+        If the OpenJPEG library routine opj_set_decoded_components fails.
+    """
+    OPENJP2.opj_set_decoded_components.argtypes = [
+        CODEC_TYPE, ctypes.c_uint32, ctypes.POINTER(ctypes.c_uint32),
+        BOOL_TYPE]
+    OPENJP2.opj_set_decoded_components.restype = check_error
+
+    indices = (ctypes.c_uint32 * len(components))(*components)
+
+    # Multiple component transforms cannot be applied to a subset of the
+    # components.
+    OPENJP2.opj_set_decoded_components(codec, len(components), indices,
+                                       BOOL_TYPE(0))
+
+
 def set_default_decoder_parameters():
     """Wraps openjp2 library function opj_set_default_decoder_parameters.
 
@@ -1272,6 +1316,97 @@ def stream_create_default_file_stream(fname, isa_read_stream):
     return stream
 
 
+def stream_create(buffer_size, isa_read_stream):
+    """Wraps openjp2 library function opj_stream_create.
+
+    Creates a stream that is read or written through user-supplied functions.
+
+    Parameters
+    ----------
+    buffer_size : int
+        Size of the internal buffer of the stream.
+    isa_read_stream:  bool
+        True (read) or False (write)
+
+    Returns
+    -------
+    stream : stream_t
+        An OpenJPEG stream.
+    """
+    ARGTYPES = [ctypes.c_size_t, BOOL_TYPE]
+    OPENJP2.opj_stream_create.argtypes = ARGTYPES
+    OPENJP2.opj_stream_create.restype = STREAM_TYPE_P
+    read_stream = 1 if isa_read_stream else 0
+    stream = OPENJP2.opj_stream_create(buffer_size, read_stream)
+    return stream
+
+
+def stream_set_read_function(stream, func):
+    """Wraps openjp2 library function opj_stream_set_read_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    func : STREAM_READ_FUNC
+        Copies up to the requested number of bytes into the buffer and
+        returns the number copied, or -1 at the end of the stream.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_READ_FUNC]
+    OPENJP2.opj_stream_set_read_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_read_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_read_function(stream, func)
+
+
+def stream_set_skip_function(stream, func):
+    """Wraps openjp2 library function opj_stream_set_skip_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    func : STREAM_SKIP_FUNC
+        Moves the position by the given number of bytes and returns that
+        number, or -1 on failure.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SKIP_FUNC]
+    OPENJP2.opj_stream_set_skip_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_skip_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_skip_function(stream, func)
+
+
+def stream_set_seek_function(stream, func):
+    """Wraps openjp2 library function opj_stream_set_seek_function.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    func : STREAM_SEEK_FUNC
+        Moves to the given absolute position, returning success or failure.
+    """
+    ARGTYPES = [STREAM_TYPE_P, STREAM_SEEK_FUNC]
+    OPENJP2.opj_stream_set_seek_function.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_seek_function.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_seek_function(stream, func)
+
+
+def stream_set_user_data_length(stream, length):
+    """Wraps openjp2 library function opj_stream_set_user_data_length.
+
+    Parameters
+    ----------
+    stream : STREAM_TYPE_P
+        The stream.
+    length : int
+        Total number of bytes that can be read from the stream.
+    """
+    ARGTYPES = [STREAM_TYPE_P, ctypes.c_uint64]
+    OPENJP2.opj_stream_set_user_data_length.argtypes = ARGTYPES
+    OPENJP2.opj_stream_set_user_data_length.restype = ctypes.c_void_p
+    OPENJP2.opj_stream_set_user_data_length(stream, length)
+
+
 def stream_destroy(stream):
     """Wraps openjp2 library function opj_stream_destroy.
 
@@ -1327,4 +1462,12 @@ def write_tile(codec, tile_index, data, data_size, stream):
 
 def set_error_message(msg):
     """The openjpeg error handler has recorded an error message."""
-    ERROR_MSG_LST.append(msg)
+    _error_messages().append(msg)
+
+
+def _error_messages():
+    """Error messages recorded so far in the current thread."""
+    messages = getattr(_ERRORS, 'messages', None)
+    if messages is None:
+        messages = _ERRORS.messages = []
+    return messages
@@ -431,6 +431,13 @@ def cio_open(cinfo, src=None):
     else:
         length = len(src)
 
+    if src is not None and not isinstance(src, bytes):
+        # A writable buffer such as a memory map, which need not be copied.
+        # The buffer must outlive the cio.
+        buffer = (ctypes.c_char * length).from_buffer(src)
+        src = ctypes.c_char_p(ctypes.addressof(buffer))
+        del buffer
+
     cio = OPENJPEG.opj_cio_open(ctypes.cast(cinfo,
                                             ctypes.POINTER(CommonStructType)),
                                 src,
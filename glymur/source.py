@@ -0,0 +1,362 @@
+"""Sources of the bytes of JPEG 2000 files.
+
+A Jp2k object reads its file through a byte source, so the file need not be
+on the local disk.  Remote sources keep a cache of fixed-size blocks and
+fetch neighbouring missing blocks with a single request, so that opening a
+large remote file costs only the few blocks holding its metadata.
+"""
+# Standard library imports ...
+from collections import OrderedDict
+import io
+import os
+import re
+import threading
+
+
+class ByteSource(object):
+    """Random access to the bytes of a file.
+
+    Attributes
+    ----------
+    name : str
+        Path or URL of the file.
+    is_local : bool
+        True if the file can be handed to the codec library by name.
+    """
+    is_local = False
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return "glymur.source.{0}('{1}')".format(self.__class__.__name__,
+                                                self.name)
+
+    @property
+    def size(self):
+        """Length of the file in bytes."""
+        raise NotImplementedError
+
+    @property
+    def identity(self):
+        """Hashable value that changes along with the file, as far as can be
+        told without reading it."""
+        return (self.__class__.__name__, self.name, self.size)
+
+    def read(self, offset, length):
+        """Read bytes from the file.
+
+        Parameters
+        ----------
+        offset : int
+            Position of the first byte.
+        length : int
+            Number of bytes.
+
+        Returns
+        -------
+        bytes
+            Fewer than length bytes are returned only at the end of the file.
+        """
+        raise NotImplementedError
+
+    def prefetch(self, ranges):
+        """Fetch byte ranges ahead of reading them, e.g. from Jp2k.plan_read.
+
+        Parameters
+        ----------
+        ranges : list
+            (offset, length) pairs.
+        """
+        pass
+
+    def open(self):
+        """Open the source as a read-only binary file object."""
+        return SourceFile(self)
+
+
+class SourceFile(io.RawIOBase):
+    """Read-only binary file object reading from a byte source.
+
+    Attributes
+    ----------
+    name : str
+        Path or URL of the file.
+    source : ByteSource
+        Where the bytes come from.
+    """
+    def __init__(self, source):
+        io.RawIOBase.__init__(self)
+        self.source = source
+        self.name = source.name
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self.source.size
+        if offset < 0:
+            raise IOError("Negative seek position {0}.".format(offset))
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def readinto(self, buffer):
+        data = self.source.read(self._pos, len(buffer))
+        buffer[:len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def readall(self):
+        data = self.source.read(self._pos, max(self.source.size - self._pos,
+                                               0))
+        self._pos += len(data)
+        return data
+
+
+class FileSource(ByteSource):
+    """A file on the local disk."""
+    is_local = True
+
+    @property
+    def size(self):
+        return os.path.getsize(self.name)
+
+    @property
+    def identity(self):
+        stat = os.stat(self.name)
+        mtime = getattr(stat, 'st_mtime_ns', stat.st_mtime)
+        return (os.path.realpath(self.name), stat.st_dev, stat.st_ino,
+                stat.st_size, mtime)
+
+    def read(self, offset, length):
+        with open(self.name, 'rb') as fptr:
+            fptr.seek(offset)
+            return fptr.read(length)
+
+    def open(self):
+        # The operating system already caches file blocks.
+        return open(self.name, 'rb')
+
+
+class CachedSource(ByteSource):
+    """Byte source keeping the most recently used blocks of the file.
+
+    Subclasses implement _fetch, which retrieves a contiguous byte range in
+    a single request.  The cache may be shared by several threads.
+
+    Attributes
+    ----------
+    block_size : int
+        Size of the cached blocks in bytes.
+    max_blocks : int
+        Number of blocks kept in the cache.
+    readahead : int
+        Number of blocks fetched beyond the last one needed by a read.
+    max_gap : int
+        Missing blocks separated by at most this many blocks are fetched in
+        one request.
+    num_requests : int
+        Number of requests made so far.
+    num_bytes : int
+        Number of bytes fetched so far.
+    """
+    def __init__(self, name, block_size=8192, max_blocks=1024, readahead=1,
+                 max_gap=1):
+        ByteSource.__init__(self, name)
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.readahead = readahead
+        self.max_gap = max_gap
+        self.num_requests = 0
+        self.num_bytes = 0
+        self._size = None
+        self._cache = OrderedDict()
+        # Reentrant, as finding the size may fetch the first blocks.
+        self._lock = threading.RLock()
+
+    def _fetch(self, offset, length):
+        """Retrieve a byte range, setting _size if not yet known."""
+        raise NotImplementedError
+
+    @property
+    def size(self):
+        with self._lock:
+            if self._size is None:
+                self._fetch_blocks(range(self.readahead + 1))
+            return self._size
+
+    def _fetch_blocks(self, blocks):
+        """Fetch blocks, coalescing neighbours into a single request.
+
+        Returns
+        -------
+        dict
+            The fetched blocks by number.
+        """
+        with self._lock:
+            blocks = sorted(blocks)
+            runs = []
+            for block in blocks:
+                if len(runs) > 0 and block - runs[-1][1] <= self.max_gap + 1:
+                    runs[-1][1] = block
+                else:
+                    runs.append([block, block])
+
+            fetched = {}
+            for first, last in runs:
+                offset = first * self.block_size
+                length = (last - first + 1) * self.block_size
+                if self._size is not None:
+                    length = min(length, self._size - offset)
+                data = self._fetch(offset, length)
+                self.num_requests += 1
+                self.num_bytes += len(data)
+                for block in range(first, last + 1):
+                    start = (block - first) * self.block_size
+                    fetched[block] = data[start:start + self.block_size]
+
+            for block, data in fetched.items():
+                self._cache.pop(block, None)
+                self._cache[block] = data
+            while len(self._cache) > self.max_blocks:
+                self._cache.popitem(last=False)
+
+            return fetched
+
+    def _num_blocks(self):
+        return -(-self.size // self.block_size)
+
+    def read(self, offset, length):
+        length = min(length, self.size - offset)
+        if length <= 0:
+            return b''
+
+        with self._lock:
+            first = offset // self.block_size
+            last = (offset + length - 1) // self.block_size
+
+            found = {}
+            missing = []
+            for block in range(first, last + 1):
+                if block in self._cache:
+                    # Most recently used blocks go last.
+                    found[block] = self._cache.pop(block)
+                    self._cache[block] = found[block]
+                else:
+                    missing.append(block)
+
+            if len(missing) > 0:
+                stop = min(last + self.readahead, self._num_blocks() - 1)
+                missing.extend(block for block in range(last + 1, stop + 1)
+                               if block not in self._cache)
+                found.update(self._fetch_blocks(missing))
+
+            data = b''.join(found[block] for block in range(first, last + 1))
+            start = offset - first * self.block_size
+            return data[start:start + length]
+
+    def prefetch(self, ranges):
+        blocks = set()
+        for offset, length in ranges:
+            if length <= 0:
+                continue
+            first = offset // self.block_size
+            last = (offset + length - 1) // self.block_size
+            blocks.update(range(first, last + 1))
+        with self._lock:
+            missing = [block for block in blocks if block not in self._cache]
+            if len(missing) > 0:
+                self._fetch_blocks(missing)
+
+
+class HTTPSource(CachedSource):
+    """A file served over HTTP, read with range requests.
+
+    The size of the file is taken from the response to the first range
+    request, so no separate HEAD request is made.
+
+    Examples
+    --------
+    >>> import glymur
+    >>> source = glymur.source.HTTPSource('https://example.com/nemo.jp2')
+    >>> jp2 = glymur.Jp2k(source)  # doctest: +SKIP
+    """
+    def __init__(self, url, headers=None, timeout=None, **kwargs):
+        """
+        Parameters
+        ----------
+        url : str
+            URL of the file.
+        headers : dict, optional
+            Additional request headers, such as for authorization.
+        timeout : float, optional
+            Timeout of each request in seconds.
+        kwargs : optional
+            Parameters of the block cache, see CachedSource.
+        """
+        CachedSource.__init__(self, url, **kwargs)
+        self.headers = {} if headers is None else dict(headers)
+        self.timeout = timeout
+
+    def _fetch(self, offset, length):
+        # Importing urllib is slow, so wait until the first request.
+        try:
+            from urllib.request import Request, urlopen
+        except ImportError:
+            # v2.7
+            from urllib2 import Request, urlopen
+
+        headers = dict(self.headers)
+        headers['Range'] = 'bytes={0}-{1}'.format(offset, offset + length - 1)
+        request = Request(self.name, headers=headers)
+        args = () if self.timeout is None else (None, self.timeout)
+        response = urlopen(request, *args)
+        try:
+            data = response.read()
+            if response.getcode() == 206:
+                content_range = response.info().get('Content-Range', '')
+                match = re.search(r'/(\d+)\s*$', content_range)
+                if match is None:
+                    msg = "Unable to determine the size of {0}.".format(
+                        self.name)
+                    raise IOError(msg)
+                self._size = int(match.group(1))
+            else:
+                # The server ignored the range and sent the whole file.
+                self._size = len(data)
+                data = data[offset:offset + length]
+        finally:
+            response.close()
+        return data
+
+
+def as_source(filename):
+    """Return the byte source for a path, URL or byte source.
+
+    Parameters
+    ----------
+    filename : str, path-like, or ByteSource
+        Path or URL of the file.
+
+    Returns
+    -------
+    ByteSource
+    """
+    if isinstance(filename, ByteSource):
+        return filename
+    if hasattr(os, 'fspath'):
+        # Such as pathlib.Path objects.
+        filename = os.fspath(filename)
+    if filename.startswith(('http://', 'https://')):
+        return HTTPSource(filename)
+    return FileSource(filename)
@@ -9,37 +9,50 @@ License:  MIT
 """
 
 # Standard library imports ...
+import re
 import sys
 
 # Third party library imports ...
-from distutils.version import LooseVersion
 import numpy as np
 
 # Local imports ...
 from .lib import openjpeg as opj, openjp2 as opj2
 
+
+def _version_tuple(version_str):
+    """Split a version string into its numeric and alphabetic components.
+
+    This follows the same rules as distutils' LooseVersion, which is slow to
+    import.
+    """
+    components = re.findall(r'\d+|[a-z]+', version_str)
+    return [int(item) if item.isdigit() else item for item in components]
+
+
 # Do not change the format of this next line!  Doing so risks breaking
 # setup.py
 version = "0.8.9"
-_sv = LooseVersion(version)
-version_tuple = _sv.version
-
-if opj2.OPENJP2 is None and opj.OPENJPEG is not None:
-    openjpeg_version = opj.version()
-else:
-    openjpeg_version = opj2.version()
-
-_sv = LooseVersion(openjpeg_version)
-openjpeg_version_tuple = _sv.version
+version_tuple = _version_tuple(version)
 
 __doc__ = """\
 This is glymur **{glymur_version}**
+""".format(glymur_version=version)
+
+
+def _openjpeg_version():
+    """Query the version of the OpenJPEG library in use.
+
+    This loads the library, so it is only done when first needed.
+    """
+    if opj2.OPENJP2 is None and opj.OPENJPEG is not None:
+        return opj.version()
+    else:
+        return opj2.version()
 
-* OpenJPEG version:  **{openjpeg}**
-""".format(glymur_version=version,
-           openjpeg=openjpeg_version)
 
-info = """\
+def _info():
+    """Summarize the glymur configuration."""
+    info = """\
 Summary of glymur configuration
 -------------------------------
 
@@ -51,20 +64,45 @@ sys.maxsize   {maxsize}
 numpy         {numpy}
 """
 
-kwargs = {
-    'glymur': version,
-    'openjpeg': openjpeg_version,
-    'python': sys.version,
-    'platform': sys.platform,
-    'maxsize': sys.maxsize,
-    'numpy': np.__version__,
-}
-
-try:
-    import lxml.etree
-    info += "lxml          {elxml}\n"
-    kwargs['elxml'] = lxml.etree.__version__
-except Exception:
-    pass
-
-info = info.format(**kwargs)
+    kwargs = {
+        'glymur': version,
+        'openjpeg': sys.modules[__name__].openjpeg_version,
+        'python': sys.version,
+        'platform': sys.platform,
+        'maxsize': sys.maxsize,
+        'numpy': np.__version__,
+    }
+
+    try:
+        import lxml.etree
+        info += "lxml          {elxml}\n"
+        kwargs['elxml'] = lxml.etree.__version__
+    except Exception:
+        pass
+
+    return info.format(**kwargs)
+
+
+def __getattr__(name):
+    """Compute the library-dependent attributes on first access."""
+    if name == 'openjpeg_version':
+        # Cache these, they require loading the library.
+        value = _openjpeg_version()
+        globals()[name] = value
+        return value
+    elif name == 'openjpeg_version_tuple':
+        value = _version_tuple(_openjpeg_version())
+        globals()[name] = value
+        return value
+    elif name == 'info':
+        return _info()
+    msg = "module {0!r} has no attribute {1!r}".format(__name__, name)
+    raise AttributeError(msg)
+
+
+if sys.hexversion < 0x03070000:
+    # Module-level __getattr__ is not supported, so compute the attributes
+    # right away.
+    openjpeg_version = _openjpeg_version()
+    openjpeg_version_tuple = _version_tuple(openjpeg_version)
+    info = _info()
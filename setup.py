@@ -16,7 +16,8 @@ kwargs = {
     'packages': ['glymur', 'glymur.data', 'glymur.lib'],
     'package_data': {'glymur': ['data/*.jp2', 'data/*.j2k', 'data/*.jpx']},
     'entry_points': {
-        'console_scripts': ['jp2dump=glymur.command_line:main'],
+        'console_scripts': ['jp2dump=glymur.command_line:main',
+                            'jp2reindex=glymur.command_line:reindex'],
     },
     'license': 'MIT',
     'test_suite': 'glymur.test'
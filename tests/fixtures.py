@@ -838,7 +838,33 @@ geotiff_uuid = """UUID Box (uuid) @ (149, 523)
 
 geotiff_uuid_without_gdal = """UUID Box (uuid) @ (149, 523)
     UUID:  b14bf8bd-083d-4b43-a5ae-8cd7d5a6ce03 (GeoTIFF)
-    UUID Data:  OrderedDict([('ImageWidth', 1), ('ImageLength', 1), ('BitsPerSample', 8), ('Compression', 1), ('PhotometricInterpretation', 1), ('StripOffsets', 8), ('SamplesPerPixel', 1), ('RowsPerStrip', 1), ('StripByteCounts', 1), ('PlanarConfiguration', 1), ('ModelPixelScale', (0.25, 0.25, 0.0)), ('ModelTiePoint', (0.0, 0.0, 0.0, -2523306.125, -268608.875, 0.0)), ('GeoKeyDirectory', (1, 1, 0, 18, 1024, 0, 1, 1, 1025, 0, 1, 1, 1026, 34737, 21, 0, 2048, 0, 1, 32767, 2049, 34737, 9, 21, 2050, 0, 1, 32767, 2054, 0, 1, 9102, 2056, 0, 1, 32767, 2057, 34736, 1, 4, 2058, 34736, 1, 5, 3072, 0, 1, 32767, 3074, 0, 1, 32767, 3075, 0, 1, 17, 3076, 0, 1, 9001, 3082, 34736, 1, 2, 3083, 34736, 1, 3, 3088, 34736, 1, 1, 3089, 34736, 1, 0)), ('GeoDoubleParams', (0.0, 180.0, 0.0, 0.0, 3396190.0, 3396190.0)), ('GeoAsciiParams', 'Equirectangular MARS|GCS_MARS|')])"""
+    UUID Data:  Geographic Keys =
+        GTModelTypeGeoKey:  1
+        GTRasterTypeGeoKey:  1
+        GTCitationGeoKey:  Equirectangular MARS
+        GeographicTypeGeoKey:  32767
+        GeogCitationGeoKey:  GCS_MARS
+        GeogGeodeticDatumGeoKey:  32767
+        GeogAngularUnitsGeoKey:  9102
+        GeogEllipsoidGeoKey:  32767
+        GeogSemiMajorAxisGeoKey:  3396190.0
+        GeogSemiMinorAxisGeoKey:  3396190.0
+        ProjectedCSTypeGeoKey:  32767
+        ProjectionGeoKey:  32767
+        ProjCoordTransGeoKey:  17
+        ProjLinearUnitsGeoKey:  9001
+        ProjFalseEastingGeoKey:  0.0
+        ProjFalseNorthingGeoKey:  0.0
+        ProjCenterLongGeoKey:  180.0
+        ProjCenterLatGeoKey:  0.0
+    Origin = (-2523306.125000000000000,-268608.875000000000000)
+    Pixel Size = (0.250000000000000,-0.250000000000000)
+    Corner Coordinates:
+    Upper Left  (-2523306.125, -268608.875)
+    Lower Left  (-2523306.125, -268609.125)
+    Upper Right (-2523305.875, -268608.875)
+    Lower Right (-2523305.875, -268609.125)
+    Center      (-2523306.000, -268609.000)"""
 
 multiple_precinct_size = """COD marker segment @ (51, 18)
     Coding style:
@@ -0,0 +1,256 @@
+"""
+Tests for the codec backends.
+"""
+# Standard library imports ...
+import sys
+import tempfile
+import unittest
+try:
+    from unittest.mock import patch
+except ImportError:
+    # v2.7, third party library
+    from mock import patch
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from glymur.backend import (NumPyBackend, OpenJP2Backend, OpenJPEGBackend,
+                            select_backend, _tile_subset)
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+class TestNumPyBackend(unittest.TestCase):
+    """
+    The metadata must be available without any codec library.
+    """
+    def setUp(self):
+        self.jp2file = glymur.data.nemo()
+        self.j2kfile = glymur.data.goodstuff()
+
+    def test_selected_without_library(self):
+        """
+        Without any library, only the metadata can be accessed.
+        """
+        with patch('glymur.version.openjpeg_version_tuple', new=(0, 0, 0)):
+            with patch('glymur.version.openjpeg_version', new='0.0.0'):
+                backend = select_backend()
+        self.assertIsInstance(backend, NumPyBackend)
+        self.assertFalse(backend.can_decode)
+        self.assertFalse(backend.can_encode)
+
+    def test_header(self):
+        """
+        The shape and codestream header come from glymur's own parser.
+        """
+        jp2 = Jp2k(self.jp2file, backend=NumPyBackend())
+        self.assertEqual(jp2.shape, (1456, 2592, 3))
+        self.assertEqual(jp2.codestream.segment[1].xsiz, 2592)
+
+        j2k = Jp2k(self.j2kfile, backend=NumPyBackend())
+        self.assertEqual(j2k.shape, (800, 480, 3))
+        self.assertEqual(j2k.codestream.segment[2].layers, 1)
+
+    def test_read(self):
+        """
+        Cannot decode image data.
+        """
+        jp2 = Jp2k(self.jp2file, backend=NumPyBackend())
+        with self.assertRaises(RuntimeError):
+            jp2[:]
+
+    @unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+    def test_write(self):
+        """
+        Cannot encode image data.
+        """
+        data = np.zeros((32, 32), dtype=np.uint8)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            with self.assertRaises(RuntimeError):
+                Jp2k(tfile.name, data=data, backend=NumPyBackend())
+
+
+class TestSelection(unittest.TestCase):
+    """
+    The backend is chosen according to the installed library.
+    """
+    @unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                     "Needs openjp2 library.")
+    def test_openjp2(self):
+        """
+        Version 2 of the library is preferred.
+        """
+        backend = select_backend()
+        self.assertIsInstance(backend, OpenJP2Backend)
+        self.assertEqual(backend.version, glymur.version.openjpeg_version)
+
+        # The backend is not reconstructed every time.
+        self.assertIs(select_backend(), backend)
+
+    def test_openjpeg(self):
+        """
+        Version 1.5 of the library lacks tile and layer support.
+        """
+        with patch('glymur.version.openjpeg_version_tuple', new=(1, 5, 0)):
+            with patch('glymur.version.openjpeg_version', new='1.5.0'):
+                backend = select_backend()
+        self.assertIsInstance(backend, OpenJPEGBackend)
+        self.assertTrue(backend.can_decode)
+        self.assertFalse(backend.can_decode_tiles)
+        self.assertFalse(backend.can_decode_layers)
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_chosen_once(self):
+        """
+        The version of the library is not consulted again after loading.
+        """
+        jp2 = Jp2k(glymur.data.goodstuff())
+        with patch('glymur.version.openjpeg_version_tuple', new=(0, 0, 0)):
+            with patch('glymur.version.openjpeg_version', new='0.0.0'):
+                data = jp2[::4, ::4]
+        self.assertEqual(data.shape, (200, 120, 3))
+
+    def test_too_early_for_layers(self):
+        """
+        Versions 2.0.x cannot decode individual quality layers.
+        """
+        backend = OpenJP2Backend('2.0.1')
+        self.assertTrue(backend.can_decode_tiles)
+        self.assertFalse(backend.can_decode_layers)
+        self.assertFalse(backend.can_encode_cinema)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+class TestOpenJP2Backend(unittest.TestCase):
+    """
+    Tile-wise decoding and encoding.
+    """
+    def setUp(self):
+        self.j2kfile = glymur.data.goodstuff()
+
+    def test_decode_tile(self):
+        """
+        The last tile of a 2x2 tiling should be the lower right quadrant.
+        """
+        expected = Jp2k(self.j2kfile)[:]
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=expected, tilesize=(400, 240))
+            actual = j.read_bands(tile=3)
+        np.testing.assert_array_equal(actual, expected[400:, 240:, :])
+
+    @unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+    def test_encode_tiles(self):
+        """
+        Writing tile-by-tile gives the same image.
+        """
+        expected = Jp2k(self.j2kfile)[:]
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=expected, tilesize=(400, 240))
+            tiles = [expected[r:r + 400, c:c + 240]
+                     for r in (0, 400) for c in (0, 240)]
+            j._backend.encode_tiles(j, tiles)
+            j.parse()
+
+            actual = j[:]
+            np.testing.assert_array_equal(actual, expected)
+
+            c = j.get_codestream(header_only=False)
+            sot = [seg for seg in c.segment if seg.marker_id == 'SOT']
+            self.assertEqual([seg.isot for seg in sot], [0, 1, 2, 3])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestTileSubset(unittest.TestCase):
+    """
+    Region decoding for version 1.5 hands only the needed tiles to the library.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+        # 4x4 tiles.
+        cls.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        cls.jp2 = Jp2k(cls.tfile.name, data=cls.data, tilesize=(200, 120))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tfile.close()
+
+    def test_subset(self):
+        """
+        Should keep only the 1x2 tiles intersecting the area.
+        """
+        codestream, origin = _tile_subset(self.jp2, (250, 130, 390, 250))
+        self.assertEqual(origin, (200, 120))
+
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            tfile.write(codestream)
+            tfile.flush()
+            j = Jp2k(tfile.name)
+            c = j.get_codestream(header_only=False)
+            actual = j[:]
+
+        self.assertEqual(c.segment[1].xosiz, 120)
+        self.assertEqual(c.segment[1].yosiz, 200)
+        sot = [seg for seg in c.segment if seg.marker_id == 'SOT']
+        self.assertEqual([seg.isot for seg in sot], [0, 1])
+
+        np.testing.assert_array_equal(actual, self.data[200:400, 120:360])
+
+    def test_reduced_resolution(self):
+        """
+        The origin is given at the reduced resolution.
+        """
+        area = (0, 360, 800, 480)
+        codestream, origin = _tile_subset(self.jp2, area, rlevel=1)
+        self.assertEqual(origin, (0, 180))
+
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            tfile.write(codestream)
+            tfile.flush()
+            actual = Jp2k(tfile.name)[::2, ::2]
+
+        expected = self.jp2[::2, ::2][:, 180:]
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_index_segments(self):
+        """
+        The lengths of the tile-parts in the main header are dropped, as they
+        describe all the tiles.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            jp2 = self.jp2.reindex(tfile.name)
+            self.assertTrue(any(seg.marker_id == 'TLM'
+                                for seg in jp2.codestream.segment))
+            codestream, origin = _tile_subset(jp2, (250, 130, 390, 250))
+
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            tfile.write(codestream)
+            tfile.flush()
+            j = Jp2k(tfile.name)
+            self.assertFalse(any(seg.marker_id == 'TLM'
+                                 for seg in j.codestream.segment))
+            actual = j[:]
+
+        np.testing.assert_array_equal(actual, self.data[200:400, 120:360])
+
+    def test_all_tiles(self):
+        """
+        Nothing to gain if all tiles intersect the area.
+        """
+        self.assertIsNone(_tile_subset(self.jp2, (150, 100, 650, 400)))
+
+    def test_untiled(self):
+        """
+        Single tile images cannot be split.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        self.assertIsNone(_tile_subset(jp2, (0, 0, 100, 100)))
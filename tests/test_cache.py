@@ -0,0 +1,282 @@
+"""
+Tests for the caches shared by all Jp2k objects.
+"""
+# Standard library imports ...
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+if sys.hexversion >= 0x03030000:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+# Third party library imports ...
+try:
+    import lxml.etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+import numpy as np
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from glymur.cache import LRUCache
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+class TestLRUCache(unittest.TestCase):
+    """
+    Least recently used eviction within a byte budget.
+    """
+    def test_eviction(self):
+        cache = LRUCache()
+        for key in 'abc':
+            cache.put(key, key.upper(), 10, 30)
+        self.assertEqual(cache.nbytes, 30)
+
+        # Using 'a' leaves 'b' as the least recently used.
+        self.assertEqual(cache.get('a'), 'A')
+        cache.put('d', 'D', 10, 30)
+        self.assertNotIn('b', cache)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.nbytes, 30)
+
+    def test_counters(self):
+        cache = LRUCache()
+        cache.put('a', 'A', 1, 10)
+        cache.get('a')
+        cache.get('a')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual((cache.hits, cache.misses), (2, 1))
+
+        cache.clear()
+        self.assertEqual((len(cache), cache.nbytes, cache.hits,
+                          cache.misses), (0, 0, 0, 0))
+
+    def test_replace(self):
+        cache = LRUCache()
+        cache.put('a', 'A', 5, 10)
+        cache.put('a', 'AA', 8, 10)
+        self.assertEqual(cache.get('a'), 'AA')
+        self.assertEqual(cache.nbytes, 8)
+
+    def test_too_large(self):
+        """
+        An item larger than the budget is not kept.
+        """
+        cache = LRUCache()
+        cache.put('a', 'A', 5, 10)
+        cache.put('b', 'B', 11, 10)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 5)
+
+    def test_threads(self):
+        cache = LRUCache()
+
+        def work(k):
+            for j in range(1000):
+                key = (k * j) % 37
+                if cache.get(key) is None:
+                    cache.put(key, j, key + 1, 200)
+
+        threads = [threading.Thread(target=work, args=(k,))
+                   for k in range(1, 5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(cache.hits + cache.misses, 4000)
+        self.assertLessEqual(cache.nbytes, 200)
+        self.assertEqual(cache.nbytes,
+                         sum(key + 1 for key in range(37) if key in cache))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestTileCache(unittest.TestCase):
+    """
+    Image areas assembled from cached tiles.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+        cls.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        Jp2k(cls.tfile.name, data=cls.data, tilesize=(100, 72), numres=4,
+             cratios=[20, 5])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tfile.close()
+
+    def setUp(self):
+        glymur.cache.tiles.clear()
+        glymur.set_option('cache.tiles', 2 ** 30)
+
+    def tearDown(self):
+        glymur.reset_option('cache.tiles')
+        glymur.cache.tiles.clear()
+
+    def test_windows(self):
+        """
+        Areas are the same whether or not the tiles are cached.
+        """
+        jp2 = Jp2k(self.tfile.name)
+        indices = [np.s_[:], np.s_[13:377, 7:211], np.s_[::2, ::2],
+                   np.s_[13:377:4, 7:211:4], np.s_[99:101, 71:73],
+                   np.s_[::8, ::8], np.s_[10:300, 20:100, 1],
+                   np.s_[5:95, 5:65, [2, 0]]]
+        with glymur.option_context('cache.tiles', 0):
+            expected = [jp2[index] for index in indices]
+
+        for _ in range(2):
+            for index, image in zip(indices, expected):
+                np.testing.assert_array_equal(jp2[index], image)
+
+    def test_hits(self):
+        """
+        Tiles are decoded once, whichever Jp2k object reads them.
+        """
+        jp2 = Jp2k(self.tfile.name, options={'cache.tiles': 0})
+        expected = jp2[150:250, 100:144]
+
+        Jp2k(self.tfile.name)[100:200, 72:144]
+        self.assertEqual(glymur.cache.tiles.misses, 1)
+
+        image = Jp2k(self.tfile.name)[150:250, 100:144]
+        self.assertEqual(glymur.cache.tiles.hits, 1)
+        self.assertEqual(glymur.cache.tiles.misses, 2)
+        np.testing.assert_array_equal(image, expected)
+
+        # The assembled image is not the cached data.
+        image[:] = 0
+        image = Jp2k(self.tfile.name)[150:250, 100:144]
+        np.testing.assert_array_equal(image, expected)
+
+    def test_layers(self):
+        jp2 = Jp2k(self.tfile.name)
+        image1 = jp2.read(layer=1, area=(0, 0, 50, 50))
+        image0 = jp2.read(layer=0, area=(0, 0, 50, 50))
+        self.assertEqual(glymur.cache.tiles.misses, 2)
+        self.assertFalse((image0 == image1).all())
+
+    def test_budget(self):
+        """
+        The least recently used tiles are dropped to stay within budget.
+        """
+        glymur.set_option('cache.tiles', 100 * 72 * 3)
+        jp2 = Jp2k(self.tfile.name)
+        jp2[0:200, 0:72]
+        self.assertEqual(len(glymur.cache.tiles), 1)
+        jp2[100:200, 0:72]
+        self.assertEqual(glymur.cache.tiles.hits, 1)
+
+    def test_per_file_option(self):
+        jp2 = Jp2k(self.tfile.name, options={'cache.tiles': 0})
+        jp2[0:50, 0:50]
+        self.assertEqual(len(glymur.cache.tiles), 0)
+
+    def test_changed_file(self):
+        """
+        A file that has been rewritten is not confused with the original.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            shutil.copyfile(self.tfile.name, tfile.name)
+            Jp2k(tfile.name)[0:50, 0:50]
+
+            data = self.data[::-1].copy()
+            Jp2k(tfile.name, data=data, tilesize=(100, 72), numres=4)
+            np.testing.assert_array_equal(Jp2k(tfile.name)[0:50, 0:50],
+                                          data[0:50, 0:50])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestHeaderCache(unittest.TestCase):
+    """
+    Metadata of files opened before.
+    """
+    def setUp(self):
+        glymur.cache.headers.clear()
+        glymur.set_option('cache.headers', 10)
+
+    def tearDown(self):
+        glymur.reset_option('cache.headers')
+        glymur.cache.headers.clear()
+
+    def test_hits(self):
+        """
+        The boxes and main header are parsed just once.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        shape = jp2.shape
+        codestream = jp2.codestream
+        self.assertEqual(glymur.cache.headers.misses, 1)
+
+        with patch.object(Jp2k, '_parse') as mock_parse:
+            jp2 = Jp2k(glymur.data.nemo())
+            self.assertEqual(jp2.shape, shape)
+            self.assertIs(jp2.codestream, codestream)
+        self.assertEqual(mock_parse.call_count, 0)
+        self.assertEqual(glymur.cache.headers.hits, 1)
+        self.assertEqual(str(jp2), str(Jp2k(glymur.data.nemo())))
+
+    def test_boxes_not_shared(self):
+        """
+        Altering the boxes of one Jp2k object does not affect another.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.box[2].box.append(glymur.jp2box.XMLBox())
+        jp2.box.pop()
+
+        jp2 = Jp2k(glymur.data.nemo())
+        self.assertEqual(glymur.cache.headers.hits, 1)
+        self.assertEqual(len(jp2.box), 5)
+        self.assertEqual(len(jp2.box[2].box), 2)
+
+    def test_limit(self):
+        glymur.set_option('cache.headers', 1)
+        Jp2k(glymur.data.nemo())
+        Jp2k(glymur.data.goodstuff())
+        Jp2k(glymur.data.nemo())
+        self.assertEqual(glymur.cache.headers.misses, 3)
+        self.assertEqual(len(glymur.cache.headers), 1)
+
+    def test_per_file_option(self):
+        Jp2k(glymur.data.nemo(), options={'cache.headers': 0})
+        self.assertEqual(len(glymur.cache.headers), 0)
+
+    def test_written(self):
+        """
+        Writing to a file drops what was held of it.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            shutil.copyfile(glymur.data.nemo(), tfile.name)
+            Jp2k(tfile.name)
+
+            jp2 = Jp2k(tfile.name)
+            jp2.append(glymur.jp2box.XMLBox(xml=ET.ElementTree(
+                ET.fromstring('<data>0</data>'))))
+
+            jp2 = Jp2k(tfile.name)
+            self.assertEqual(jp2.box[-1].box_id, 'xml ')
+
+    def test_changed_file(self):
+        """
+        A file replaced by another is not confused with the original.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            shutil.copyfile(glymur.data.nemo(), tfile.name)
+            Jp2k(tfile.name)
+
+            shutil.copyfile(glymur.data.goodstuff(), tfile.name)
+            jp2 = Jp2k(tfile.name)
+            self.assertEqual(jp2.shape, (800, 480, 3))
+            self.assertEqual(glymur.cache.headers.hits, 0)
@@ -8,6 +8,7 @@ import imp
 import os
 import sys
 import tempfile
+import threading
 import unittest
 import warnings
 try:
@@ -66,6 +67,81 @@ class TestSuiteOptions(unittest.TestCase):
         with self.assertRaises(KeyError):
             glymur.reset_option('blah')
 
+    def test_option_context(self):
+        """
+        Options set via option_context are restored afterwards.
+        """
+        with glymur.option_context('print.short', True,
+                                   'print.xml', False):
+            self.assertTrue(glymur.get_option('print.short'))
+            self.assertFalse(glymur.get_option('print.xml'))
+            with glymur.option_context('print.short', False):
+                self.assertFalse(glymur.get_option('print.short'))
+                self.assertFalse(glymur.get_option('print.xml'))
+            self.assertTrue(glymur.get_option('print.short'))
+        self.assertFalse(glymur.get_option('print.short'))
+        self.assertTrue(glymur.get_option('print.xml'))
+
+    def test_option_context_bad_key(self):
+        """
+        Verify exception when a bad option is given to option_context
+        """
+        with self.assertRaises(KeyError):
+            with glymur.option_context('blah', True):
+                pass
+        with self.assertRaises(ValueError):
+            with glymur.option_context('print.short'):
+                pass
+
+    def test_option_context_is_thread_local(self):
+        """
+        Other threads do not see options set via option_context.
+        """
+        seen = []
+
+        def target():
+            seen.append(glymur.get_option('parse.full_codestream'))
+
+        with glymur.option_context('parse.full_codestream', True):
+            thread = threading.Thread(target=target)
+            thread.start()
+            thread.join()
+            self.assertTrue(glymur.get_option('parse.full_codestream'))
+        self.assertEqual(seen, [False])
+
+    def test_set_option_within_context(self):
+        """
+        The context override takes precedence over a global setting.
+        """
+        with glymur.option_context('print.short', False):
+            glymur.set_option('print.short', True)
+            self.assertFalse(glymur.get_option('print.short'))
+        self.assertTrue(glymur.get_option('print.short'))
+
+    def test_jp2k_options(self):
+        """
+        Options can be set for a single file.
+        """
+        jp2 = Jp2k(glymur.data.nemo(),
+                   options={'parse.full_codestream': True})
+        other = Jp2k(glymur.data.nemo())
+
+        # The full codestream has the tile-part segments.
+        self.assertEqual(jp2.box[-1].codestream.segment[-1].marker_id, 'EOC')
+        self.assertNotEqual(other.box[-1].codestream.segment[-1].marker_id,
+                            'EOC')
+        self.assertFalse(glymur.get_option('parse.full_codestream'))
+
+        jp2 = Jp2k(glymur.data.nemo(), options={'print.short': True})
+        self.assertEqual(len(str(jp2).splitlines()), 8)
+
+    def test_jp2k_bad_options(self):
+        """
+        Verify exception when a bad option is given to Jp2k
+        """
+        with self.assertRaises(KeyError):
+            Jp2k(glymur.data.nemo(), options={'blah': True})
+
     def test_bad_deprecated_print_option(self):
         """
         Verify exception when a bad option is given to old set_printoption
@@ -0,0 +1,110 @@
+"""
+Tests for dask arrays of JPEG 2000 images.
+"""
+# Standard library imports ...
+import doctest
+import sys
+import tempfile
+import unittest
+
+# Third party library imports ...
+import numpy as np
+try:
+    import dask
+    import dask.array
+    HAVE_DASK = True
+except ImportError:
+    HAVE_DASK = False
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+def load_tests(loader, tests, ignore):
+    """Run doc tests as well."""
+    if HAVE_DASK and not OPENJPEG_NOT_AVAILABLE:
+        tests.addTests(doctest.DocTestSuite('glymur._dask'))
+    return tests
+
+
+@unittest.skipIf(not HAVE_DASK, "Requires dask")
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestToDask(unittest.TestCase):
+    """
+    Arrays chunked along the tile grid.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+        cls.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        Jp2k(cls.tfile.name, data=cls.data, tilesize=(100, 72), numres=4)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tfile.close()
+
+    def test_tiles(self):
+        arr = glymur.to_dask(self.tfile.name)
+        self.assertEqual(arr.chunks, ((100,) * 8, (72,) * 6 + (48,), (3,)))
+        self.assertEqual(arr.dtype, np.uint8)
+        np.testing.assert_array_equal(arr.compute(), self.data)
+
+    def test_multiple_tiles(self):
+        arr = glymur.to_dask(self.tfile.name, chunks=(3, 2))
+        self.assertEqual(arr.chunks, ((300, 300, 200), (144, 144, 144, 48),
+                                      (3,)))
+        np.testing.assert_array_equal(arr[250:350, 100:300].compute(),
+                                      self.data[250:350, 100:300])
+
+    def test_rlevel(self):
+        """
+        Chunks of tiles that vanish at the lower resolution are merged.
+        """
+        jp2 = Jp2k(self.tfile.name)
+        for rlevel in range(4):
+            arr = glymur.to_dask(self.tfile.name, rlevel=rlevel)
+            expected = jp2.read(rlevel=rlevel)
+            self.assertEqual(arr.shape, expected.shape)
+            np.testing.assert_array_equal(arr.compute(), expected)
+
+        arr = glymur.to_dask(self.tfile.name, rlevel=-1)
+        self.assertEqual(arr.shape, (100, 60, 3))
+        self.assertEqual(arr.chunks[1], (9, 9, 9, 9, 9, 9, 6))
+
+    def test_grid_offset(self):
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            Jp2k(tfile.name, data=self.data, tilesize=(100, 72), numres=4,
+                 grid_offset=(13, 7))
+            arr = glymur.to_dask(tfile.name, rlevel=1)
+            self.assertEqual(arr.chunks[0][:2], (43, 50))
+            self.assertEqual(arr.chunks[1][:2], (32, 36))
+            np.testing.assert_array_equal(arr.compute(),
+                                          Jp2k(tfile.name).read(rlevel=1))
+
+    def test_jp2(self):
+        arr = glymur.to_dask(glymur.data.nemo(), rlevel=1)
+        self.assertEqual(arr.numblocks, (1, 1, 1))
+        np.testing.assert_array_equal(arr.compute(),
+                                      Jp2k(glymur.data.nemo()).read(rlevel=1))
+
+    def test_threads(self):
+        """
+        Each thread decodes through its own session.
+        """
+        arr = glymur.to_dask(self.tfile.name, chunks=2)
+        with dask.config.set(scheduler='threads', num_workers=4):
+            np.testing.assert_array_equal(arr.compute(), self.data)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(IOError):
+            glymur.to_dask(self.tfile.name, chunks=(0, 1))
+        with self.assertRaises(IOError):
+            glymur.to_dask(self.tfile.name, chunks='auto')
+        with self.assertRaises(IOError):
+            glymur.to_dask(self.tfile.name, rlevel=4)
@@ -0,0 +1,93 @@
+"""
+Tests for the cost of importing glymur.
+"""
+# Standard library imports ...
+import os
+import subprocess
+import sys
+import unittest
+
+# Local imports ...
+import glymur
+
+
+@unittest.skipIf(sys.hexversion < 0x03070000,
+                 "Lazy imports require module-level __getattr__.")
+class TestImport(unittest.TestCase):
+    """
+    Slow modules and the OpenJPEG libraries should only be loaded on demand.
+    """
+    def _import_glymur(self, statement=''):
+        """
+        Import glymur in a fresh interpreter.
+
+        Returns
+        -------
+        tuple
+            The names of the imported modules, and the names of the loaded
+            shared libraries (only on platforms with /proc).
+        """
+        code = ("import os, sys\n"
+                "import glymur\n"
+                "{statement}\n"
+                "print(' '.join(sys.modules.keys()))\n"
+                "if os.path.exists('/proc/self/maps'):\n"
+                "    with open('/proc/self/maps') as f:\n"
+                "        libs = [line.split()[-1] for line in f]\n"
+                "    print(' '.join(os.path.basename(x) for x in libs))\n")
+        code = code.format(statement=statement)
+
+        env = dict(os.environ)
+        path = os.path.dirname(os.path.dirname(glymur.__file__))
+        env['PYTHONPATH'] = os.pathsep.join([path, env.get('PYTHONPATH', '')])
+        proc = subprocess.Popen([sys.executable, '-W', 'ignore', '-c', code],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE,
+                                env=env)
+        stdout, stderr = proc.communicate()
+        self.assertEqual(proc.returncode, 0, stderr.decode('utf-8'))
+
+        lines = stdout.decode('utf-8').splitlines() + ['']
+        return lines[0].split(), lines[1].split()
+
+    def test_slow_modules_not_imported(self):
+        """
+        Importing glymur should not pull in slow-to-import modules.
+        """
+        modules, _ = self._import_glymur()
+        for name in ['distutils', 'pkg_resources', 'lxml', 'gdal', 'osr']:
+            self.assertNotIn(name, modules)
+
+    def test_heavy_stdlib_modules_not_imported(self):
+        """
+        Importing glymur should not pull in the networking, email, XML, or
+        concurrency parts of the standard library.
+        """
+        modules, _ = self._import_glymur()
+        for name in ['urllib.request', 'http.client', 'email', 'ssl',
+                     'socket', 'xml.etree.ElementTree', 'concurrent.futures']:
+            self.assertNotIn(name, modules)
+
+    def test_xml_library_imported_on_first_use(self):
+        """
+        The choice between lxml and ElementTree is made on first use.
+        """
+        statement = "glymur.jp2box.ET.fromstring('<a/>')"
+        modules, _ = self._import_glymur(statement)
+        self.assertTrue('lxml.etree' in modules or
+                        'xml.etree.ElementTree' in modules)
+
+    @unittest.skipIf(not os.path.exists('/proc/self/maps'),
+                     "Needs /proc to find the loaded libraries.")
+    @unittest.skipIf(glymur.lib.openjp2.OPENJP2 is None,
+                     "Needs openjp2 library.")
+    def test_libraries_loaded_on_first_use(self):
+        """
+        The OpenJPEG libraries should not be loaded until needed.
+        """
+        _, libs = self._import_glymur()
+        self.assertFalse(any('openjp' in lib for lib in libs))
+
+        statement = 'glymur.version.openjpeg_version'
+        _, libs = self._import_glymur(statement)
+        self.assertTrue(any('openjp2' in lib for lib in libs))
@@ -11,6 +11,10 @@ import sys
 import tempfile
 from uuid import UUID
 import unittest
+if sys.hexversion >= 0x03030000:
+    from unittest.mock import patch
+else:
+    from mock import patch
 import warnings
 try:
     # Third party library import, favored over standard library.
@@ -657,6 +661,116 @@ class TestAppend(unittest.TestCase):
                 jp2.append(uuidbox)
 
 
+@unittest.skipIf(os.name == "nt", WINDOWS_TMP_FILE_MSG)
+class TestInPlaceEdit(unittest.TestCase):
+    """Tests for the replace and remove methods."""
+
+    def setUp(self):
+        self.j2kfile = glymur.data.goodstuff()
+        self.jp2file = glymur.data.nemo()
+
+    def tearDown(self):
+        pass
+
+    def _xmlbox(self, text):
+        b = BytesIO(text.encode('utf-8'))
+        return glymur.jp2box.XMLBox(xml=ET.parse(b))
+
+    def test_replace_with_smaller_box(self):
+        """The leftover space should become a free box."""
+        with tempfile.NamedTemporaryFile(suffix=".jp2") as tfile:
+            shutil.copyfile(self.jp2file, tfile.name)
+            jp2 = Jp2k(tfile.name)
+            jp2c_offset = jp2.box[-1].offset
+            expected_image = jp2[::2, ::2]
+
+            jp2.replace(jp2.box[3], self._xmlbox('<data>0</data>'))
+
+            box_ids = [box.box_id for box in jp2.box]
+            expected = ['jP  ', 'ftyp', 'jp2h', 'xml ', 'free', 'jp2c']
+            self.assertEqual(box_ids, expected)
+            self.assertEqual(ET.tostring(jp2.box[3].xml.getroot()),
+                             b'<data>0</data>')
+
+            # The codestream must not have moved.
+            self.assertEqual(jp2.box[-1].offset, jp2c_offset)
+            np.testing.assert_array_equal(jp2[::2, ::2], expected_image)
+
+    def test_replace_reuses_free_space(self):
+        """A box should be able to grow into a following free box."""
+        with tempfile.NamedTemporaryFile(suffix=".jp2") as tfile:
+            shutil.copyfile(self.jp2file, tfile.name)
+            jp2 = Jp2k(tfile.name)
+            jp2c_offset = jp2.box[-1].offset
+
+            jp2.replace(jp2.box[3], self._xmlbox('<data>0</data>'))
+            jp2.replace(jp2.box[3], self._xmlbox('<data>' + 'A' * 100 +
+                                                 '</data>'))
+
+            box_ids = [box.box_id for box in jp2.box]
+            expected = ['jP  ', 'ftyp', 'jp2h', 'xml ', 'free', 'jp2c']
+            self.assertEqual(box_ids, expected)
+            self.assertEqual(jp2.box[-1].offset, jp2c_offset)
+
+    def test_replace_with_larger_box(self):
+        """The new box goes to the end if the codestream is in the way."""
+        with tempfile.NamedTemporaryFile(suffix=".jp2") as tfile:
+            shutil.copyfile(self.jp2file, tfile.name)
+            jp2 = Jp2k(tfile.name)
+            jp2c_offset = jp2.box[-1].offset
+            length = jp2.box[3].length
+
+            text = '<data>' + 'A' * length + '</data>'
+            jp2.replace(jp2.box[3], self._xmlbox(text))
+
+            box_ids = [box.box_id for box in jp2.box]
+            expected = ['jP  ', 'ftyp', 'jp2h', 'free', 'jp2c', 'xml ']
+            self.assertEqual(box_ids, expected)
+            self.assertEqual(jp2.box[3].length, length)
+            self.assertEqual(jp2.box[4].offset, jp2c_offset)
+
+            # Now that the XML box is last, it can grow in place.
+            text = '<data>' + 'B' * 2 * length + '</data>'
+            jp2.replace(jp2.box[-1], self._xmlbox(text))
+            box_ids = [box.box_id for box in jp2.box]
+            self.assertEqual(box_ids, expected)
+            self.assertEqual(os.path.getsize(tfile.name),
+                             jp2.box[-1].offset + jp2.box[-1].length)
+
+    def test_remove(self):
+        """Removed boxes become free boxes unless at the end of the file."""
+        with tempfile.NamedTemporaryFile(suffix=".jp2") as tfile:
+            shutil.copyfile(self.jp2file, tfile.name)
+            jp2 = Jp2k(tfile.name)
+            jp2c_offset = jp2.box[-1].offset
+            file_length = os.path.getsize(tfile.name)
+
+            jp2.remove(jp2.box[3])
+            box_ids = [box.box_id for box in jp2.box]
+            self.assertEqual(box_ids, ['jP  ', 'ftyp', 'jp2h', 'free', 'jp2c'])
+            self.assertEqual(jp2.box[-1].offset, jp2c_offset)
+
+            jp2.append(self._xmlbox('<data>0</data>'))
+            jp2.remove(jp2.box[-1])
+            self.assertEqual(os.path.getsize(tfile.name), file_length)
+
+    def test_codestream_cannot_be_edited(self):
+        """The codestream box may not be replaced or removed."""
+        with tempfile.NamedTemporaryFile(suffix=".jp2") as tfile:
+            shutil.copyfile(self.jp2file, tfile.name)
+            jp2 = Jp2k(tfile.name)
+            with self.assertRaises(IOError):
+                jp2.remove(jp2.box[-1])
+            with self.assertRaises(IOError):
+                jp2.replace(jp2.box[3], jp2.box[-1])
+
+    def test_only_jp2_can_be_edited(self):
+        """Raw codestreams have no boxes to edit."""
+        j2k = Jp2k(self.j2kfile)
+        with self.assertRaises(IOError):
+            j2k.remove(Jp2k(self.jp2file).box[3])
+
+
 @unittest.skipIf(os.name == "nt", WINDOWS_TMP_FILE_MSG)
 class TestWrap(unittest.TestCase):
     """Tests for wrap method."""
@@ -997,6 +1111,69 @@ class TestWrap(unittest.TestCase):
         self.assertEqual(exp_lengths, act_lengths)
 
 
+class TestFind(unittest.TestCase):
+    """Tests for finding boxes by their path of box IDs."""
+
+    def test_jp2(self):
+        jp2 = Jp2k(glymur.data.nemo())
+        ihdr = jp2.find('jp2h/ihdr')
+        self.assertIs(ihdr, jp2.box[2].box[0])
+        self.assertEqual(jp2.findall('jp2h/colr'), [jp2.box[2].box[1]])
+        self.assertEqual(jp2.find('jp2h').find('colr'), jp2.box[2].box[1])
+        self.assertIsNone(jp2.find('jp2h/pclr'))
+        self.assertEqual(jp2.findall('asoc/lbl '), [])
+
+    def test_nested(self):
+        """
+        Matches are in file order, across all the matching superboxes.
+        """
+        jpx = Jp2k(glymur.data.jpxfile())
+        self.assertEqual(len(jpx.findall('jpch')), 3)
+        self.assertEqual([box.box_id for box in jpx.findall('jpch/*')],
+                         ['ihdr', 'cmap', 'ihdr', 'cmap'])
+        self.assertEqual([box.box_id for box in jpx.findall('asoc/asoc/*')],
+                         ['nlst', 'xml ', 'nlst', 'xml '])
+        self.assertEqual(jpx.findall('*/asoc'), jpx.box[-1].box)
+        self.assertIs(jpx.find('jpch/ihdr'), jpx.box[6].box[0])
+
+    def test_modified(self):
+        """
+        Boxes added to or removed from a superbox can be found.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.find('jp2h').box.append(glymur.jp2box.ResolutionBox())
+        self.assertIsNotNone(jp2.find('jp2h/res '))
+
+        jp2.box = jp2.box[:2]
+        self.assertIsNone(jp2.find('jp2h'))
+
+    def test_index_kept(self):
+        """
+        The index is only rebuilt after the child boxes change.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.find('jp2h/colr')
+        with patch('glymur.jp2box._index_boxes',
+                   wraps=glymur.jp2box._index_boxes) as mock_index:
+            jp2.find('jp2h/colr')
+            self.assertEqual(mock_index.call_count, 0)
+
+            del jp2.box[2].box[1]
+            self.assertIsNone(jp2.find('jp2h/colr'))
+            self.assertEqual(mock_index.call_count, 1)
+
+    def test_replaced(self):
+        """
+        A box replaced in place by one with a different ID is not found.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.find('jp2h/colr')
+        xml = glymur.jp2box.XMLBox()
+        jp2.box[2].box[1] = xml
+        self.assertIsNone(jp2.find('jp2h/colr'))
+        self.assertIs(jp2.find('jp2h/xml '), xml)
+
+
 class TestJp2Boxes(unittest.TestCase):
     """Tests for canonical JP2 boxes."""
 
@@ -25,6 +25,8 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
+import numpy as np
+
 # Local imports
 import glymur
 from glymur import Jp2k
@@ -268,13 +270,28 @@ class TestSuite(unittest.TestCase):
         b.write(buffer)
         b.seek(8)
 
-        with self.assertWarns(UserWarning):
-            box = glymur.jp2box.UUIDBox.parse(b, 0, 418)
-
+        box = glymur.jp2box.UUIDBox.parse(b, 0, 418)
         self.assertEqual(box.box_id, 'uuid')
 
+        with self.assertWarns(UserWarning):
+            data = box.data
+
         # Should still get the IFD.  16 tags.
-        self.assertEqual(len(box.data.keys()), 16)
+        self.assertEqual(len(data.keys()), 16)
+
+    def test_exif_is_interpreted_lazily(self):
+        """
+        The Exif payload should not be decoded until the data is accessed.
+        """
+        b = self._create_exif_uuid('<')
+        with patch('glymur.jp2box.tiff_header') as mock_tiff_header:
+            mock_tiff_header.return_value = 'decoded'
+            box = glymur.jp2box.UUIDBox.parse(b, 0, 418)
+            self.assertEqual(mock_tiff_header.call_count, 0)
+
+            self.assertEqual(box.data, 'decoded')
+            self.assertEqual(box.data, 'decoded')
+            self.assertEqual(mock_tiff_header.call_count, 1)
 
     def test_exif(self):
         """
@@ -329,6 +346,28 @@ class TestSuite(unittest.TestCase):
         expected = 'UTM Zone 16N NAD27"|Clarke, 1866 by Default| '
         self.assertEqual(box.data['GeoAsciiParams'], expected)
 
+        # Multi-valued tags come back as native-endian numpy arrays.
+        tiepoint = box.data['ModelTiePoint']
+        np.testing.assert_array_equal(tiepoint,
+                                      [0.0, 0.0, 0.0, 44650.0, 4640510.0, 0.0])
+        self.assertTrue(tiepoint.dtype.isnative)
+        self.assertEqual(box.data['GeoKeyDirectory'][12:16].tolist(),
+                         [1026, 34737, 20, 0])
+
+    def test_tags_are_interpreted_lazily(self):
+        """
+        Tag payloads should only be interpreted when accessed.
+        """
+        bptr = self._create_exif_uuid('<')
+        box = glymur.jp2box.UUIDBox.parse(bptr, 0, 418)
+        self.assertEqual(len(box.data), 16)
+
+        with patch.object(glymur._tiff.Ifd, 'parse_tag') as mock_parse_tag:
+            mock_parse_tag.return_value = 'payload'
+            self.assertEqual(box.data['ModelTiePoint'], 'payload')
+            self.assertEqual(box.data['ModelTiePoint'], 'payload')
+            self.assertEqual(mock_parse_tag.call_count, 1)
+
     @unittest.skipIf(not fixtures.HAVE_GDAL, "needs gdal to make sense")
     def test_print_bad_geotiff(self):
         """
@@ -391,11 +430,12 @@ class TestSuiteHiRISE(unittest.TestCase):
 
     def test_tags(self):
         jp2 = Jp2k(self.hirise_jp2file_name)
-        self.assertEqual(jp2.box[4].data['GeoDoubleParams'],
-                         (0.0, 180.0, 0.0, 0.0, 3396190.0, 3396190.0))
+        np.testing.assert_array_equal(
+            jp2.box[4].data['GeoDoubleParams'],
+            (0.0, 180.0, 0.0, 0.0, 3396190.0, 3396190.0))
         self.assertEqual(jp2.box[4].data['GeoAsciiParams'],
                          'Equirectangular MARS|GCS_MARS|')
-        self.assertEqual(jp2.box[4].data['GeoKeyDirectory'], (
+        np.testing.assert_array_equal(jp2.box[4].data['GeoKeyDirectory'], (
             1,        1,  0,    18,
             1024,     0,  1,     1,
             1025,     0,  1,     1,
@@ -416,10 +456,44 @@ class TestSuiteHiRISE(unittest.TestCase):
             3088, 34736,  1,     1,
             3089, 34736,  1,     0
         ))
-        self.assertEqual(jp2.box[4].data['ModelPixelScale'], (0.25, 0.25, 0.0))
-        self.assertEqual(jp2.box[4].data['ModelTiePoint'], (
+        self.assertEqual(jp2.box[4].data['GeoKeyDirectory'].dtype, np.uint16)
+        np.testing.assert_array_equal(jp2.box[4].data['ModelPixelScale'],
+                                      (0.25, 0.25, 0.0))
+        np.testing.assert_array_equal(jp2.box[4].data['ModelTiePoint'], (
             0.0, 0.0, 0.0, -2523306.125, -268608.875, 0.0
         ))
+        self.assertEqual(jp2.box[4].data['ModelTiePoint'].dtype, np.float64)
+
+    def test_geotiff_without_gdal(self):
+        """Georeferencing should be available without GDAL."""
+        jp2 = Jp2k(self.hirise_jp2file_name)
+        geotiff = jp2.box[4].geotiff
+        self.assertEqual(geotiff.geotransform,
+                         (-2523306.125, 0.25, 0.0, -268608.875, 0.0, -0.25))
+        self.assertEqual(geotiff.geokeys['GTCitationGeoKey'],
+                         'Equirectangular MARS')
+        self.assertEqual(geotiff.geokeys['GeogSemiMajorAxisGeoKey'],
+                         3396190.0)
+        self.assertEqual(geotiff.geokeys['ProjCoordTransGeoKey'], 17)
+        self.assertEqual(geotiff.tiepoints.shape, (1, 6))
+        self.assertEqual(geotiff.pixel_to_model(4, 8),
+                         (-2523305.125, -268610.875))
+
+        # Parsed just once.
+        self.assertIs(jp2.box[4].geotiff, geotiff)
+
+        # Not a GeoTIFF UUID.
+        xmp = Jp2k(glymur.data.nemo()).box[3]
+        self.assertIsNone(xmp.geotiff)
+
+    def test_geotiff_pixel_is_point(self):
+        """A PixelIsPoint raster shifts the origin by half a pixel."""
+        tags = {'ModelPixelScale': np.array([2.0, 2.0, 0.0]),
+                'ModelTiePoint': np.array([0.0, 0.0, 0.0, 100.0, 200.0, 0.0]),
+                'GeoKeyDirectory': np.array([1, 1, 0, 1, 1025, 0, 1, 2])}
+        geotiff = glymur._geotiff.GeoTiffInfo(tags)
+        self.assertEqual(geotiff.geotransform,
+                         (99.0, 2.0, 0.0, 201.0, 0.0, -2.0))
 
     def test_printing(self):
         jp2 = Jp2k(self.hirise_jp2file_name)
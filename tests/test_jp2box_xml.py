@@ -126,6 +126,32 @@ class TestXML(unittest.TestCase):
             self.assertEqual(neighbor.attrib['name'], 'Malaysia')
             self.assertEqual(neighbor.attrib['direction'], 'N')
 
+    def test_xml_is_parsed_lazily(self):
+        """The ElementTree should not be constructed until accessed."""
+        fptr = BytesIO()
+        payload = b'<data><a>0</a><a>1</a></data>'
+        fptr.write(payload)
+        fptr.seek(0)
+
+        box = glymur.jp2box.XMLBox.parse(fptr, 0, 8 + len(payload))
+        self.assertIsNone(box._xml)
+
+        self.assertEqual(ET.tostring(box.xml.getroot()), payload)
+
+    def test_iterparse(self):
+        """Should be able to stream through the XML."""
+        fptr = BytesIO()
+        payload = b'<data><a>0</a><a>1</a></data>\x00'
+        fptr.write(payload)
+        fptr.seek(0)
+
+        box = glymur.jp2box.XMLBox.parse(fptr, 0, 8 + len(payload))
+        text = [elt.text for _, elt in box.iterparse() if elt.tag == 'a']
+        self.assertEqual(text, ['0', '1'])
+
+        # The full tree was never constructed.
+        self.assertIsNone(box._xml)
+
     def test_utf8_xml_from_xml_file(self):
         """
         XMLBox from an XML file with encoding declaration.
@@ -1219,7 +1219,7 @@ class TestJp2k_write(fixtures.MetadataBase):
         """
         data = self.jp2_data
         with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
-            with patch('glymur.jp2k.version.openjpeg_version_tuple', new=(1, 5, 0)):
+            with patch('glymur.version.openjpeg_version_tuple', new=(1, 5, 0)):
                 with patch('glymur.jp2k.opj2.OPENJP2', new=None):
                     j = Jp2k(tfile.name, shape=data.shape)
                     j[:] = data
@@ -1972,14 +1972,14 @@ class TestJp2k_1_x(unittest.TestCase):
         """
         Test read using version 1.5
         """
-        j = Jp2k(self.j2kfile)
-        expected = j[:]
-        with patch('glymur.jp2k.opj2.OPENJP2', new=None):
-            actual = j._read_openjpeg()
-            np.testing.assert_array_equal(actual, expected)
+        expected = Jp2k(self.j2kfile)[:]
 
-            actual = j._read_openjpeg(area=(0, 0, 250, 250))
-            np.testing.assert_array_equal(actual, expected[:250, :250])
+        j = Jp2k(self.j2kfile, backend=glymur.backend.OpenJPEGBackend())
+        actual = j[:]
+        np.testing.assert_array_equal(actual, expected)
+
+        actual = j[:250, :250]
+        np.testing.assert_array_equal(actual, expected[:250, :250])
 
 @unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
                  "Requires as least v2.0")
@@ -2345,3 +2345,335 @@ class TestReadArea(unittest.TestCase):
         actual = self.j2k[20:50:4, 150:200:4]
         expected = self.j2k_quarter_data[5:13, 38:50]
         np.testing.assert_array_equal(actual, expected)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+class TestPalette(unittest.TestCase):
+    """
+    Palettes are applied by glymur rather than by the library.
+    """
+    def _library_expansion(self, jp2):
+        """Let the library apply the palette."""
+        jp2._populate_dparams(0)
+        return jp2._backend.decode_region(jp2, jp2._dparams)
+
+    def test_jpx(self):
+        """
+        Should match the expansion done by the library.
+        """
+        with warnings.catch_warnings():
+            # Suppress a Compatibility list item warning.
+            warnings.simplefilter("ignore")
+            jpx = Jp2k(glymur.data.jpxfile())
+        expected = self._library_expansion(jpx)
+
+        actual = jpx[:]
+        self.assertEqual(actual.dtype, expected.dtype)
+        np.testing.assert_array_equal(actual, expected)
+
+        np.testing.assert_array_equal(jpx[100:200, 300:500],
+                                      expected[100:200, 300:500])
+
+    @unittest.skipIf(os.name == "nt", fixtures.WINDOWS_TMP_FILE_MSG)
+    def test_cmap_cdef(self):
+        """
+        The cmap and cdef boxes reorder the channels.
+        """
+        j2k = Jp2k(glymur.data.goodstuff())
+        indices = j2k[:, :, 0]
+
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile1:
+            Jp2k(tfile1.name, data=indices)
+            j2k = Jp2k(tfile1.name)
+
+            np.random.seed(0)
+            palette = np.random.randint(0, 256, size=(256, 3))
+            palette = palette.astype(np.uint8)
+
+            # Palette columns in reverse order, further reversed by cdef.
+            jp2h = glymur.jp2box.JP2HeaderBox()
+            jp2h.box = [
+                glymur.jp2box.ImageHeaderBox(indices.shape[0],
+                                             indices.shape[1]),
+                glymur.jp2box.ColourSpecificationBox(
+                    colorspace=glymur.core.SRGB),
+                glymur.jp2box.PaletteBox(palette, bits_per_component=[8] * 3,
+                                         signed=[False] * 3),
+                glymur.jp2box.ComponentMappingBox(
+                    component_index=(0, 0, 0), mapping_type=(1, 1, 1),
+                    palette_index=(2, 1, 0)),
+                glymur.jp2box.ChannelDefinitionBox(
+                    channel_type=[COLOR, COLOR, COLOR],
+                    association=[BLUE, GREEN, RED]),
+            ]
+            boxes = [glymur.jp2box.JPEG2000SignatureBox(),
+                     glymur.jp2box.FileTypeBox(),
+                     jp2h,
+                     glymur.jp2box.ContiguousCodestreamBox()]
+
+            with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile2:
+                jp2 = j2k.wrap(tfile2.name, boxes=boxes)
+                actual = jp2[:]
+
+                jp2.ignore_pclr_cmap_cdef = True
+                raw = jp2[:]
+
+        # The reversals by cmap and by cdef cancel out.
+        np.testing.assert_array_equal(actual, palette[indices])
+        np.testing.assert_array_equal(raw, indices)
+
+
+def _write_high_precision(filename, data, signed):
+    """
+    Glymur itself only writes 8 and 16 bit images, so go directly to the
+    library for a single-tile, single-component image.
+    """
+    opj2 = glymur.lib.openjp2
+
+    numrows, numcols = data.shape
+    cparams = opj2.set_default_encoder_parameters()
+    cparams.tile_size_on = 1
+    cparams.cp_tdx = numcols
+    cparams.cp_tdy = numrows
+    cparams.numresolution = 3
+    cparams.tcp_numlayers = 1
+    cparams.cp_disto_alloc = 1
+    cparams.tcp_rates[0] = 0
+
+    comptparms = (opj2.ImageComptParmType * 1)()
+    comptparms[0].dx = comptparms[0].dy = 1
+    comptparms[0].w = numcols
+    comptparms[0].h = numrows
+    comptparms[0].prec = 24
+    comptparms[0].sgnd = 1 if signed else 0
+
+    codec = opj2.create_compress(opj2.CODEC_J2K)
+    opj2.set_info_handler(codec, None)
+    opj2.set_warning_handler(codec, None)
+    opj2.set_error_handler(codec, None)
+
+    image = opj2.image_tile_create(comptparms, opj2.CLRSPC_GRAY)
+    image.contents.x1 = numcols
+    image.contents.y1 = numrows
+    opj2.setup_encoder(codec, cparams, image)
+
+    stream = opj2.stream_create_default_file_stream(filename, False)
+    opj2.start_compress(codec, image, stream)
+    opj2.write_tile(codec, 0, data, data.nbytes, stream)
+    opj2.end_compress(codec, stream)
+
+    opj2.stream_destroy(stream)
+    opj2.destroy_codec(codec)
+    opj2.image_destroy(image)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(re.match(r'''(1|2.0.0)''',
+                          glymur.version.openjpeg_version) is not None,
+                 "Requires as least v2.0.1")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestHighPrecision(unittest.TestCase):
+    """
+    Components of more than 16 bits are read without truncation.
+    """
+    def test_unsigned(self):
+        """
+        24-bit unsigned samples are read into uint32.
+        """
+        data = (np.arange(64 * 48, dtype=np.uint32) * 4099) % 2 ** 24
+        data = data.reshape(64, 48)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            _write_high_precision(tfile.name, data, signed=False)
+            actual = Jp2k(tfile.name)[:]
+        self.assertEqual(actual.dtype, np.uint32)
+        np.testing.assert_array_equal(actual, data)
+
+    def test_signed(self):
+        """
+        24-bit signed samples are read into int32.
+        """
+        data = (np.arange(64 * 48, dtype=np.int32) * 4099) % 2 ** 24
+        data = (data - 2 ** 23).reshape(64, 48)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            _write_high_precision(tfile.name, data, signed=True)
+            actual = Jp2k(tfile.name)[:]
+        self.assertEqual(actual.dtype, np.int32)
+        np.testing.assert_array_equal(actual, data)
+
+    def test_native(self):
+        """
+        Native planes are read-only int32 views of the decoded image.
+        """
+        data = (np.arange(64 * 48, dtype=np.uint32) * 4099) % 2 ** 24
+        data = data.reshape(64, 48)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            _write_high_precision(tfile.name, data, signed=False)
+            j = Jp2k(tfile.name)
+            bands = j.read_bands(native=True)
+            reduced = j.read_bands(rlevel=1, native=True)
+
+        self.assertEqual(len(bands), 1)
+        self.assertEqual(bands[0].dtype, np.int32)
+        self.assertFalse(bands[0].flags.writeable)
+        self.assertFalse(bands[0].flags.owndata)
+        with self.assertRaises(ValueError):
+            bands[0][0, 0] = 0
+
+        # The decoded image outlives everything but the array.
+        del j
+        np.testing.assert_array_equal(bands[0], data)
+        self.assertEqual(reduced[0].shape, (32, 24))
+
+    def test_native_8bit(self):
+        """
+        Native planes are not narrowed to the component precision.
+        """
+        j = Jp2k(glymur.data.goodstuff())
+        bands = j.read_bands(rlevel=2, native=True)
+        expected = j[::4, ::4]
+        self.assertEqual(len(bands), 3)
+        for k, band in enumerate(bands):
+            self.assertEqual(band.dtype, np.int32)
+            np.testing.assert_array_equal(band, expected[:, :, k])
+
+    def test_native_palette(self):
+        """
+        Native planes of a palettized image hold the palette indices.
+        """
+        j = Jp2k(glymur.data.jpxfile())
+        bands = j.read_bands(rlevel=1, native=True)
+        indices = j.read_bands(rlevel=1, ignore_pclr_cmap_cdef=True)
+        self.assertEqual(len(bands), 1)
+        self.assertEqual(bands[0].dtype, np.int32)
+        np.testing.assert_array_equal(bands[0], indices)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(re.match(r'''(1|2.0.0)''',
+                          glymur.version.openjpeg_version) is not None,
+                 "Requires as least v2.0.1")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestComponentSelection(unittest.TestCase):
+    """
+    Indexing the band axis decodes only the wanted components.
+    """
+    @classmethod
+    def setUpClass(cls):
+        data = np.random.randint(0, 255, size=(128, 96, 5)).astype(np.uint8)
+        cls.data = data
+        cls.tfile = tempfile.NamedTemporaryFile(suffix='.jp2')
+        Jp2k(cls.tfile.name, data=data, mct=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tfile.close()
+
+    def test_band_indexing(self):
+        """
+        Should match slicing the entire image.
+        """
+        j = Jp2k(self.tfile.name)
+        np.testing.assert_array_equal(j[..., 2], self.data[..., 2])
+        np.testing.assert_array_equal(j[:, :, 1:4], self.data[:, :, 1:4])
+        np.testing.assert_array_equal(j[:, :, [3, 1, 3]],
+                                      self.data[:, :, [3, 1, 3]])
+        np.testing.assert_array_equal(j[::2, ::2, 4],
+                                      Jp2k(self.tfile.name)[::2, ::2][:, :, 4])
+
+    def test_numpy_integer_band(self):
+        """
+        A numpy integer picks out a single band just like an int.
+        """
+        j = Jp2k(self.tfile.name)
+        actual = j[::2, ::2, np.int64(1)]
+        self.assertEqual(actual.shape, (64, 48))
+        np.testing.assert_array_equal(actual, j[::2, ::2, 1])
+
+    def test_read_bands(self):
+        """
+        Components are returned in ascending order.
+        """
+        j = Jp2k(self.tfile.name)
+        actual = j.read_bands(components=[4, 0])
+        np.testing.assert_array_equal(actual, self.data[:, :, [0, 4]])
+
+    def test_library_selection(self):
+        """
+        The library is asked to skip components when it is able to.
+        """
+        backend = glymur.backend.OpenJP2Backend()
+        backend.can_decode_components = True
+        j = Jp2k(self.tfile.name, backend=backend)
+        with patch('glymur.lib.openjp2.set_decoded_components') as mock:
+            actual = j[:, :, 2:4]
+        self.assertEqual(mock.call_args[0][1], [2, 3])
+        np.testing.assert_array_equal(actual, self.data[:, :, 2:4])
+
+    def test_mct(self):
+        """
+        Components mixed by a colour transform must all be decoded.
+        """
+        backend = glymur.backend.OpenJP2Backend()
+        backend.can_decode_components = True
+        j = Jp2k(glymur.data.goodstuff(), backend=backend)
+        with patch('glymur.lib.openjp2.set_decoded_components') as mock:
+            actual = j[::4, ::4, 1]
+        self.assertFalse(mock.called)
+        np.testing.assert_array_equal(actual, j[::4, ::4][:, :, 1])
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(re.match(r'''(1|2.0)''',
+                          glymur.version.openjpeg_version) is not None,
+                 "Requires as least v2.1")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestIterLayers(unittest.TestCase):
+    """
+    Progressively refined reads.
+    """
+    @classmethod
+    def setUpClass(cls):
+        data = Jp2k(glymur.data.goodstuff())[:]
+        cls.tfile = tempfile.NamedTemporaryFile(suffix='.j2k')
+        Jp2k(cls.tfile.name, data=data, cratios=[200, 50, 10])
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tfile.close()
+
+    def test_layers(self):
+        """
+        Each image should match reading that many layers.
+        """
+        j = Jp2k(self.tfile.name)
+        with patch.object(j._source, 'prefetch') as mock_prefetch:
+            images = list(j.iter_layers(rlevel=1, area=(0, 0, 400, 240)))
+        self.assertEqual(len(images), 3)
+
+        # Only the bytes needed for the area are fetched ahead.
+        mock_prefetch.assert_called_once_with(
+            j.plan_read(rlevel=1, area=(0, 0, 400, 240)))
+
+        for n, actual in enumerate(images):
+            expected = j.read_bands(rlevel=1, layer=n + 1,
+                                    area=(0, 0, 400, 240))
+            np.testing.assert_array_equal(actual, expected)
+
+        # Quality improves as the layers are added.
+        expected = j.read_bands(rlevel=1, area=(0, 0, 400, 240))
+        np.testing.assert_array_equal(images[-1], expected)
+        errors = [np.abs(image - expected.astype(np.float64)).sum()
+                  for image in images]
+        self.assertGreater(errors[0], errors[1])
+        self.assertGreater(errors[1], errors[2])
+
+    def test_version_15(self):
+        """
+        Quality layers cannot be decoded by version 1.5 of the library.
+        """
+        backend = glymur.backend.OpenJPEGBackend('1.5.0')
+        j = Jp2k(self.tfile.name, backend=backend)
+        with self.assertRaises(IOError):
+            next(j.iter_layers())
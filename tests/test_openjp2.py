@@ -6,6 +6,7 @@ import os
 import re
 import sys
 import tempfile
+import threading
 import unittest
 if sys.hexversion >= 0x03000000:
     from unittest.mock import patch
@@ -352,6 +353,33 @@ def xtx5_setup(filename):
 @unittest.skipIf(sys.hexversion < 0x03000000, "do not care about 2.7 here")
 @unittest.skipIf(re.match('0|1|2.0', glymur.version.openjpeg_version),
                  "Requires openjpeg 2.1.0 or higher")
+class TestErrorMessages(unittest.TestCase):
+    """Errors reported by the library are kept apart for each thread."""
+
+    def test_threads(self):
+        openjp2.set_error_message('first thread')
+
+        def fail():
+            with self.assertRaises(openjp2.OpenJPEGLibraryError) as cm:
+                openjp2.check_error(0)
+            errors.append(str(cm.exception))
+
+        errors = []
+        thread = threading.Thread(target=fail)
+        thread.start()
+        thread.join()
+        self.assertEqual(errors, ['OpenJPEG function failure.'])
+
+        with self.assertRaises(openjp2.OpenJPEGLibraryError) as cm:
+            openjp2.check_error(0)
+        self.assertEqual(str(cm.exception), 'first thread')
+
+        # The message is cleared once raised.
+        with self.assertRaises(openjp2.OpenJPEGLibraryError) as cm:
+            openjp2.check_error(0)
+        self.assertEqual(str(cm.exception), 'OpenJPEG function failure.')
+
+
 class TestPrintingOpenjp2(unittest.TestCase):
     """Tests for verifying how printing works on openjp2 library structures."""
     def setUp(self):
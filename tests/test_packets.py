@@ -0,0 +1,337 @@
+"""
+Tests for the packet layout of codestreams.
+"""
+# Standard library imports ...
+import os
+import struct
+import sys
+import tempfile
+import unittest
+
+# Third party library imports ...
+import numpy as np
+import pkg_resources as pkg
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from glymur import _packets
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+def _encode_lengths(lengths):
+    """Code packet lengths as in the Iplt field of a PLT segment."""
+    data = bytearray()
+    for length in lengths:
+        groups = [length & 0x7f]
+        length >>= 7
+        while length > 0:
+            groups.insert(0, (length & 0x7f) | 0x80)
+            length >>= 7
+        data.extend(groups)
+    return bytes(data)
+
+
+def _tile_parts(filename):
+    """
+    Locate the tile-parts and packets of a codestream written with SOP
+    markers.
+    """
+    codestream = Jp2k(filename).get_codestream(header_only=False)
+
+    # The SOP markers of a tile-part may be picked up more than once.
+    sop = np.unique([seg.offset for seg in codestream.segment
+                     if seg.marker_id == 'SOP'])
+    parts = _packets.tile_parts(codestream)
+    for tile_part in parts:
+        starts = sop[(sop >= tile_part.data_offset) & (sop < tile_part.end)]
+        tile_part.packet_lengths = np.diff(
+            np.append(starts, tile_part.end)).tolist()
+    return codestream, parts
+
+
+def _rewrite(src, dst, plt=False, keep=None):
+    """
+    Rewrite a codestream with SOP markers, optionally adding PLT segments to
+    each tile-part, or replacing the packets not kept by empty packets.
+    """
+    codestream, parts = _tile_parts(src)
+    with open(src, 'rb') as f:
+        data = f.read()
+
+    out = bytearray(data[:parts[0].offset])
+    for tile_part in parts:
+        header = bytearray(data[tile_part.offset:tile_part.data_offset])
+        lengths = tile_part.packet_lengths
+        if plt:
+            iplt = _encode_lengths(lengths)
+            header[12:12] = struct.pack('>HHB', 0xff58, len(iplt) + 3, 0)
+            header[17:17] = iplt
+
+        body = bytearray()
+        pos = tile_part.data_offset
+        for length in lengths:
+            if keep is None or keep(pos, length):
+                body.extend(data[pos:pos + length])
+            else:
+                # Keep the SOP marker, but nothing is included.
+                body.extend(data[pos:pos + 6] + b'\x00')
+            pos += length
+
+        struct.pack_into('>I', header, 6, len(header) + len(body))
+        out.extend(header + body)
+    out.extend(b'\xff\xd9')
+
+    with open(dst, 'wb') as f:
+        f.write(out)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestPlanRead(unittest.TestCase):
+    """
+    The planned byte ranges suffice to decode the requested part.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def _verify(self, prog, area, rlevel=0, layer=None, components=None):
+        """
+        Decoding with only the planned packets should give the same image.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile1, \
+                tempfile.NamedTemporaryFile(suffix='.j2k') as tfile2, \
+                tempfile.NamedTemporaryFile(suffix='.j2k') as tfile3:
+            Jp2k(tfile1.name, data=self.data, tilesize=(256, 256),
+                 psizes=[(64, 64)], cbsize=(16, 16), numres=4,
+                 cratios=[40, 10, 1],
+                 prog=prog, sop=True)
+            _rewrite(tfile1.name, tfile2.name, plt=True)
+
+            jp2 = Jp2k(tfile2.name)
+            ranges = jp2.plan_read(area=area, rlevel=rlevel, layer=layer,
+                                   components=components)
+
+            def keep(offset, length):
+                return any(start <= offset and offset + length <= start + n
+                           for start, n in ranges)
+
+            # Offsets in the file with PLT segments.
+            _rewrite(tfile2.name, tfile3.name, keep=keep)
+
+            kwargs = {'rlevel': rlevel, 'area': area, 'layer': layer}
+            expected = jp2.read_bands(**kwargs)
+            actual = Jp2k(tfile3.name).read_bands(**kwargs)
+
+        if components is not None:
+            expected = expected[:, :, components]
+            actual = actual[:, :, components]
+        np.testing.assert_array_equal(actual, expected)
+
+        total = sum(n for _, n in ranges)
+        return total
+
+    def test_whole_image(self):
+        """
+        Everything is needed for the whole image.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.data, tilesize=(256, 256))
+            self.assertEqual(j.plan_read(), [(0, j.length)])
+
+    def test_lrcp(self):
+        """
+        Region, resolution and layer of an LRCP codestream.
+        """
+        full = self._verify('LRCP', (0, 0, 800, 480))
+        total = self._verify('LRCP', (300, 100, 420, 230), rlevel=1, layer=2)
+        self.assertLess(total, full / 4)
+
+    def test_rpcl(self):
+        """
+        Position-driven progression.
+        """
+        self._verify('RPCL', (300, 100, 420, 230))
+        self._verify('RPCL', (0, 0, 800, 480), rlevel=2)
+
+    def test_pcrl(self):
+        self._verify('PCRL', (512, 256, 700, 480), layer=1)
+
+    def test_cprl(self):
+        self._verify('CPRL', (100, 300, 200, 400), rlevel=1)
+
+    def test_rlcp_components(self):
+        """
+        Components mixed by the colour transform are kept together.
+        """
+        self._verify('RLCP', (0, 0, 256, 256), components=[1])
+
+    def test_without_packet_lengths(self):
+        """
+        Whole tile-parts are needed without PLT or PLM segments.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j = Jp2k(tfile.name, data=self.data, tilesize=(256, 256))
+            codestream = j.get_codestream(header_only=False)
+            parts = _packets.tile_parts(codestream)
+
+            ranges = j.plan_read(area=(300, 300, 400, 400))
+
+        # Tile 3 covers rows 256-512, columns 256-480.
+        tp = [tp for tp in parts if tp.tile == 3][0]
+        expected = [(0, parts[0].offset), (tp.offset, tp.end - tp.offset),
+                    (codestream.length - 2, 2)]
+        self.assertEqual(ranges, expected)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestPacketScanner(unittest.TestCase):
+    """
+    Packet lengths read from packet headers agree with the SOP markers.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def _verify(self, **kwargs):
+        """
+        Every packet found starts with an SOP marker segment carrying its
+        sequence number.  The bytes 0xff91 can also turn up in the data of
+        the arithmetic coding bypass, so the markers alone do not suffice.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            Jp2k(tfile.name, data=self.data, sop=True, **kwargs)
+            codestream = Jp2k(tfile.name).get_codestream(header_only=False)
+            params = _packets.CodingParameters(codestream)
+            with open(tfile.name, 'rb') as f:
+                parts = _packets.scan_packet_lengths(codestream, f)
+                data = f.read()
+
+        nsop = dict((seg.offset, seg.nsop) for seg in codestream.segment
+                    if seg.marker_id == 'SOP')
+        for tile in set(tp.tile for tp in parts):
+            tps = [tp for tp in parts if tp.tile == tile]
+            index = _packets.packet_index(codestream, tile, params=params,
+                                          parts=parts)
+            self.assertEqual(len(index), len(params.packets(tile)))
+            self.assertEqual([nsop[offset] for offset in index['offset']],
+                             list(range(len(index))))
+            for tp in tps:
+                self.assertEqual(tp.packet_lengths.sum(),
+                                 tp.end - tp.data_offset)
+        self.assertEqual(data[-2:], b'\xff\xd9')
+
+    def test_layers(self):
+        self._verify(tilesize=(256, 256), cratios=[80, 20, 5, 1],
+                     cbsize=(16, 16))
+
+    def test_precincts(self):
+        for prog in ['LRCP', 'RLCP', 'RPCL', 'PCRL', 'CPRL']:
+            self._verify(psizes=[(128, 128), (64, 64)], cbsize=(32, 32),
+                         numres=4, cratios=[20, 2], prog=prog)
+
+    def test_eph(self):
+        self._verify(eph=True, cratios=[50, 10], cbsize=(32, 64))
+
+    def test_bypass(self):
+        """
+        Codeword segments of the arithmetic coding bypass.
+        """
+        self._verify(modesw=1, cratios=[30, 10, 1], cbsize=(16, 16))
+
+    def test_termination(self):
+        """
+        Codeword segments terminated on every coding pass.
+        """
+        self._verify(modesw=4, cratios=[30, 1], cbsize=(16, 16))
+        self._verify(modesw=5, cratios=[30, 1], cbsize=(16, 16))
+
+    def test_subsampling(self):
+        self._verify(subsam=(2, 2), tilesize=(128, 192), cratios=[10, 1])
+
+    def test_irreversible(self):
+        self._verify(irreversible=True, numres=6, cratios=[100, 20])
+
+    def test_issue142(self):
+        """
+        Scanned lengths agree with the PLT segments of a CPRL codestream.
+        """
+        relpath = os.path.join('data', 'issue142.j2k')
+        filename = pkg.resource_filename(__name__, relpath)
+        codestream = Jp2k(filename).get_codestream(header_only=False)
+        expected = _packets.tile_parts(codestream)
+        actual = _packets.tile_parts(codestream)
+        for tile_part in actual:
+            tile_part.packet_lengths = None
+        with open(filename, 'rb') as f:
+            _packets.scan_packet_lengths(codestream, f, parts=actual)
+        for tp_actual, tp_expected in zip(actual, expected):
+            np.testing.assert_array_equal(tp_actual.packet_lengths,
+                                          tp_expected.packet_lengths)
+
+
+class TestPacketLengths(unittest.TestCase):
+    """
+    Packet length coding of PLT and PLM segments.
+    """
+    def test_decode(self):
+        lengths = [0, 1, 127, 128, 300, 2 ** 21 + 5]
+        actual = _packets.decode_packet_lengths(_encode_lengths(lengths))
+        self.assertEqual(actual.dtype, np.uint32)
+        self.assertEqual(actual.tolist(), lengths)
+
+    def test_decode_unterminated(self):
+        """
+        A length cut short at the end of the data is ignored.
+        """
+        data = _encode_lengths([5, 1000]) + b'\x81'
+        actual = _packets.decode_packet_lengths(data)
+        self.assertEqual(actual.tolist(), [5, 1000])
+
+        actual = _packets.decode_packet_lengths(b'\x81\x82')
+        self.assertEqual(len(actual), 0)
+
+    def test_coalesce(self):
+        ranges = [(10, 5), (0, 4), (4, 2), (12, 1), (20, 0), (30, 2)]
+        self.assertEqual(_packets.coalesce(ranges), [(0, 6), (10, 5),
+                                                     (30, 2)])
+
+    def test_issue142(self):
+        """
+        Packet count agrees with the PLT segments of a CPRL codestream.
+        """
+        relpath = os.path.join('data', 'issue142.j2k')
+        filename = pkg.resource_filename(__name__, relpath)
+        codestream = Jp2k(filename).get_codestream(header_only=False)
+        params = _packets.CodingParameters(codestream)
+        parts = _packets.tile_parts(codestream)
+        num_lengths = sum(len(tp.packet_lengths) for tp in parts)
+        self.assertEqual(len(params.packets(0)), num_lengths)
+
+    def test_packet_index(self):
+        """
+        Packets follow one another from the start of the tile-part.
+        """
+        relpath = os.path.join('data', 'issue142.j2k')
+        filename = pkg.resource_filename(__name__, relpath)
+        codestream = Jp2k(filename).get_codestream(header_only=False)
+        parts = _packets.tile_parts(codestream)
+        index = _packets.packet_index(codestream, 0)
+
+        offsets = []
+        for tile_part in parts:
+            self.assertEqual(tile_part.packet_offsets[0],
+                             tile_part.data_offset)
+            self.assertEqual(tile_part.packet_offsets[-1] +
+                             tile_part.packet_lengths[-1], tile_part.end)
+            offsets.append(tile_part.packet_offsets)
+        np.testing.assert_array_equal(index['offset'], np.concatenate(offsets))
+        self.assertEqual(index['layer'].max() + 1,
+                         _packets.CodingParameters(codestream).num_layers)
@@ -998,7 +998,7 @@ class TestPrinting(unittest.TestCase):
 
         expected = ("UUID Box (uuid) @ (1135519, 76)\n"
                     "    UUID:  4a706754-6966-6645-7869-662d3e4a5032 (EXIF)\n"
-                    "    UUID Data:  OrderedDict([('ImageWidth', 256), "
+                    "    UUID Data:  TiffTags([('ImageWidth', 256), "
                     "('ImageLength', 512), ('Make', 'HTC')])")
         self.assertEqual(actual, expected)
 
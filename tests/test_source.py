@@ -0,0 +1,319 @@
+"""
+Tests for reading files through byte sources.
+"""
+# Standard library imports ...
+import ctypes
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+except ImportError:
+    # v2.7
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from glymur.source import CachedSource, FileSource, HTTPSource, as_source
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+class _RangeHandler(BaseHTTPRequestHandler):
+    """
+    Serve the files of a directory, honoring single range requests unless
+    the server is told not to.
+    """
+    def do_GET(self):
+        path = os.path.join(self.server.root, os.path.basename(self.path))
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        match = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+        if match is None or not self.server.ranges:
+            status, body = 200, data
+        else:
+            first, last = int(match.group(1)), int(match.group(2))
+            last = min(last, len(data) - 1)
+            status, body = 206, data[first:last + 1]
+
+        self.server.requests.append(self.headers.get('Range'))
+        self.send_response(status)
+        if status == 206:
+            content_range = 'bytes {0}-{1}/{2}'.format(first, last, len(data))
+            self.send_header('Content-Range', content_range)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _BytesSource(CachedSource):
+    """
+    Cached source over bytes in memory, recording each request.
+    """
+    def __init__(self, data, **kwargs):
+        CachedSource.__init__(self, 'memory', **kwargs)
+        self.data = data
+        self.requests = []
+
+    def _fetch(self, offset, length):
+        self.requests.append((offset, length))
+        self._size = len(self.data)
+        return self.data[offset:offset + length]
+
+
+class TestCachedSource(unittest.TestCase):
+    """
+    Block cache of remote sources.
+    """
+    def setUp(self):
+        self.data = bytes(bytearray(range(256)) * 40)
+
+    def test_read(self):
+        """
+        Reads spanning blocks give the right bytes.
+        """
+        source = _BytesSource(self.data, block_size=100)
+        self.assertEqual(source.size, len(self.data))
+        for offset, length in [(0, 2), (95, 10), (250, 450), (10000, 500)]:
+            self.assertEqual(source.read(offset, length),
+                             self.data[offset:offset + length])
+        self.assertEqual(source.read(len(self.data), 10), b'')
+
+    def test_readahead(self):
+        """
+        Missing blocks are fetched in a single request together with the
+        blocks read ahead.
+        """
+        source = _BytesSource(self.data, block_size=100, readahead=2)
+        source.read(1000, 250)
+        self.assertEqual(source.requests, [(0, 300), (1000, 500)])
+
+        # Already cached.
+        source.read(1300, 200)
+        self.assertEqual(len(source.requests), 2)
+
+    def test_lru(self):
+        """
+        The least recently used blocks are evicted.
+        """
+        source = _BytesSource(self.data, block_size=100, max_blocks=3,
+                              readahead=0)
+        source.read(0, 1)
+        source.read(500, 1)
+        source.read(0, 1)
+        source.read(900, 1)
+        source.read(2000, 1)
+        self.assertEqual(list(source._cache.keys()), [0, 9, 20])
+
+        # Larger than the cache.
+        self.assertEqual(source.read(3000, 1000), self.data[3000:4000])
+
+    def test_prefetch(self):
+        """
+        Ranges separated by small gaps are coalesced.
+        """
+        source = _BytesSource(self.data, block_size=100, max_gap=1)
+        source.size
+        source.prefetch([(1000, 50), (1210, 50), (1220, 100), (5000, 10)])
+        self.assertEqual(source.requests[1:], [(1000, 400), (5000, 100)])
+
+        num_requests = len(source.requests)
+        source.read(1000, 400)
+        self.assertEqual(len(source.requests), num_requests)
+
+    def test_threads(self):
+        """
+        Threads reading through the same small cache get the right bytes.
+        """
+        source = _BytesSource(self.data, block_size=100, max_blocks=4)
+        errors = []
+
+        def read(start):
+            for offset in range(start, len(self.data) - 300, 70):
+                if source.read(offset, 300) != self.data[offset:offset + 300]:
+                    errors.append(offset)
+
+        threads = [threading.Thread(target=read, args=(k,)) for k in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(source.num_requests, len(source.requests))
+        self.assertLessEqual(len(source._cache), 4)
+
+    def test_file_object(self):
+        """
+        Seeking and reading through the file object.
+        """
+        source = _BytesSource(self.data, block_size=100)
+        with source.open() as f:
+            f.seek(-10, os.SEEK_END)
+            self.assertEqual(f.read(), self.data[-10:])
+            f.seek(300)
+            self.assertEqual(f.read(4), self.data[300:304])
+            self.assertEqual(f.tell(), 304)
+
+    def test_as_source(self):
+        self.assertIsInstance(as_source('a.jp2'), FileSource)
+        self.assertIsInstance(as_source('http://localhost/a.jp2'), HTTPSource)
+        source = FileSource('a.jp2')
+        self.assertIs(as_source(source), source)
+
+    @unittest.skipIf(sys.hexversion < 0x03060000, "Requires os.fspath")
+    def test_pathlib(self):
+        import pathlib
+
+        source = as_source(pathlib.Path('a.jp2'))
+        self.assertIsInstance(source, FileSource)
+        self.assertEqual(source.name, 'a.jp2')
+
+        jp2 = Jp2k(pathlib.Path(glymur.data.nemo()))
+        self.assertEqual(jp2.shape, (1456, 2592, 3))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+class TestSourceStream(unittest.TestCase):
+    """
+    Feeding the library from a byte source.
+    """
+    def test_short_read(self):
+        """
+        Only the bytes actually read are handed to the library.
+        """
+        source = _BytesSource(b'0123456789', block_size=4)
+        source.size
+        source.data = source.data[:6]
+        source._cache.clear()
+        stream = glymur.backend._SourceStream(source)
+
+        buffer = ctypes.create_string_buffer(8)
+        self.assertEqual(stream._read(buffer, 4, None), 4)
+        self.assertEqual(buffer.raw[:4], b'0123')
+        self.assertEqual(stream._read(buffer, 4, None), 2)
+        self.assertEqual(buffer.raw[:2], b'45')
+        self.assertEqual(stream._pos, 6)
+
+        # The end of the data comes before the claimed end of the file.
+        self.assertEqual(stream._read(buffer, 4, None),
+                         ctypes.c_size_t(-1).value)
+
+
+class TestHTTPSource(unittest.TestCase):
+    """
+    Reading JPEG 2000 files from a local HTTP server.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.root = tempfile.mkdtemp()
+        shutil.copy(glymur.data.nemo(), cls.root)
+        shutil.copy(glymur.data.goodstuff(), cls.root)
+
+        cls.server = HTTPServer(('127.0.0.1', 0), _RangeHandler)
+        cls.server.root = cls.root
+        cls.server.ranges = True
+        cls.server.requests = []
+        cls.thread = threading.Thread(target=cls.server.serve_forever)
+        cls.thread.daemon = True
+        cls.thread.start()
+        cls.url = 'http://127.0.0.1:{0}/'.format(cls.server.server_port)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        shutil.rmtree(cls.root)
+
+    def setUp(self):
+        self.server.ranges = True
+        self.server.requests = []
+
+    def test_open_cheaply(self):
+        """
+        Only the metadata is fetched when opening a file.
+        """
+        source = HTTPSource(self.url + 'nemo.jp2')
+        jp2 = Jp2k(source)
+        self.assertEqual(jp2.shape, (1456, 2592, 3))
+        self.assertEqual(jp2.length, os.path.getsize(glymur.data.nemo()))
+
+        self.assertEqual(source.num_requests, len(self.server.requests))
+        self.assertLessEqual(source.num_requests, 3)
+        self.assertLess(source.num_bytes, 64 * 1024)
+
+    def test_metadata(self):
+        """
+        The boxes and codestream header agree with those of the local file.
+        """
+        for name, path in [('nemo.jp2', glymur.data.nemo()),
+                           ('goodstuff.j2k', glymur.data.goodstuff())]:
+            remote = Jp2k(self.url + name)
+            local = Jp2k(path)
+            self.assertEqual(str(remote), str(local))
+
+            c = remote.get_codestream(header_only=False)
+            self.assertEqual(len(c.segment),
+                             len(local.get_codestream(False).segment))
+
+    def test_without_range_support(self):
+        """
+        Servers ignoring the range are still read correctly.
+        """
+        self.server.ranges = False
+        jp2 = Jp2k(self.url + 'nemo.jp2')
+        self.assertEqual(jp2.shape, (1456, 2592, 3))
+
+    def test_missing_file(self):
+        with self.assertRaises(IOError):
+            Jp2k(self.url + 'missing.jp2')
+
+    def test_write(self):
+        """
+        Remote files cannot be written.
+        """
+        data = np.zeros((32, 32), dtype=np.uint8)
+        with self.assertRaises(IOError):
+            Jp2k(self.url + 'new.j2k', data=data)
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    def test_read(self):
+        """
+        Image data decoded from the remote file match those of the local one.
+        """
+        actual = Jp2k(self.url + 'goodstuff.j2k')[::2, ::2]
+        expected = Jp2k(glymur.data.goodstuff())[::2, ::2]
+        np.testing.assert_array_equal(actual, expected)
+
+    @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+    @unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                     "Requires as least v2.0")
+    @unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+    def test_read_tile(self):
+        """
+        Decoding one tile of a remote file fetches little besides that tile.
+        """
+        data = Jp2k(glymur.data.goodstuff())[:]
+        path = os.path.join(self.root, 'tiled.j2k')
+        Jp2k(path, data=data, tilesize=(200, 240))
+
+        source = HTTPSource(self.url + 'tiled.j2k', block_size=1024)
+        actual = Jp2k(source).read_bands(tile=7)
+        np.testing.assert_array_equal(actual, data[600:, 240:])
+        self.assertLess(source.num_bytes, os.path.getsize(path) / 2)
@@ -0,0 +1,411 @@
+"""
+Tests for rewriting codestreams in the compressed domain.
+"""
+# Standard library imports ...
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from glymur import _packets, _transcode, command_line
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+from .test_packets import _rewrite
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestTruncate(unittest.TestCase):
+    """
+    Dropping quality layers and resolutions without decoding.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def setUp(self):
+        self.tfile1 = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.tfile2 = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.tfile3 = tempfile.NamedTemporaryFile(suffix='.j2k')
+
+    def tearDown(self):
+        self.tfile1.close()
+        self.tfile2.close()
+        self.tfile3.close()
+
+    def _source(self, prog='LRCP', **kwargs):
+        """
+        A tiled codestream with SOP markers and PLT segments.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             psizes=[(64, 64)], cbsize=(16, 16), numres=4,
+             cratios=[40, 10, 1], prog=prog, sop=True, **kwargs)
+        _rewrite(self.tfile1.name, self.tfile2.name, plt=True)
+        return Jp2k(self.tfile2.name)
+
+    def test_layers(self):
+        """
+        Keeping two of three layers gives the two-layer image.
+        """
+        jp2 = self._source()
+        j = jp2.truncate(self.tfile3.name, max_layers=2)
+
+        cod = [seg for seg in j.get_codestream().segment
+               if seg.marker_id == 'COD'][0]
+        self.assertEqual(cod.layers, 2)
+        self.assertLess(j.length, jp2.length)
+
+        np.testing.assert_array_equal(j.read_bands(),
+                                      jp2.read_bands(layer=2))
+
+    def test_reduce(self):
+        """
+        Dropping resolutions gives the image at a lower resolution.
+        """
+        for prog in ['LRCP', 'RPCL', 'CPRL']:
+            jp2 = self._source(prog=prog)
+            j = jp2.truncate(self.tfile3.name, reduce=2, max_layers=1)
+
+            codestream = j.get_codestream(header_only=False)
+            siz = codestream.segment[1]
+            self.assertEqual((siz.ysiz, siz.xsiz), (200, 120))
+            self.assertEqual((siz.ytsiz, siz.xtsiz), (64, 64))
+            self.assertEqual(j.shape, (200, 120, 3))
+
+            # The packet lengths are signalled again.
+            params = _packets.CodingParameters(codestream)
+            self.assertEqual(params.num_levels, [1, 1, 1])
+            self.assertIsNotNone(_packets.packet_index(codestream, 0))
+
+            np.testing.assert_array_equal(j.read_bands(),
+                                          jp2.read_bands(rlevel=2, layer=1))
+
+    def test_jp2(self):
+        """
+        A JP2 file keeps its boxes, with the image header updated.
+        """
+        jp2 = self._source()
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile1, \
+                tempfile.NamedTemporaryFile(suffix='.jp2') as tfile2:
+            jp2.wrap(tfile1.name)
+            j = Jp2k(tfile1.name).truncate(tfile2.name, reduce=1)
+
+            self.assertEqual([box.box_id for box in j.box],
+                             ['jP  ', 'ftyp', 'jp2h', 'jp2c'])
+            ihdr = j.box[2].box[0]
+            self.assertEqual((ihdr.height, ihdr.width), (400, 240))
+            np.testing.assert_array_equal(j[:], jp2.read(rlevel=1))
+
+    def test_tlm(self):
+        """
+        TLM segments signal the lengths of the tile-parts written.
+        """
+        jp2 = self._source(prog='RLCP')
+        codestream = jp2.get_codestream(header_only=False)
+        with open(jp2.filename, 'rb') as ifile, \
+                open(self.tfile3.name, 'wb') as ofile:
+            header = b''.join(_transcode.raw_segment(ifile, seg)
+                              for seg in _transcode.main_header(codestream))
+            output = []
+            for tile_part in _packets.tile_parts(codestream):
+                output.append(_transcode.OutputTilePart(
+                    tile_part.tile, b'', tile_part.packet_offsets,
+                    tile_part.packet_lengths, ifile))
+            _transcode.write_codestream(ofile, header, output, tlm=True)
+
+        j = Jp2k(self.tfile3.name)
+        codestream = j.get_codestream(header_only=False)
+        parts = _packets.tile_parts(codestream)
+        tlm = [seg for seg in codestream.segment if seg.marker_id == 'TLM']
+        self.assertEqual(list(tlm[0].ttlm), [tp.tile for tp in parts])
+        self.assertEqual(list(tlm[0].ptlm),
+                         [tp.end - tp.offset for tp in parts])
+        np.testing.assert_array_equal(j[:], jp2[:])
+
+    def test_without_packet_lengths(self):
+        """
+        Without PLT segments, the packets are found from their headers.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             cratios=[20, 5])
+        jp2 = Jp2k(self.tfile1.name)
+        j = jp2.truncate(self.tfile3.name, max_layers=1)
+        np.testing.assert_array_equal(j[:], jp2.read_bands(layer=1))
+
+    def test_too_many_levels(self):
+        jp2 = self._source()
+        with self.assertRaises(IOError):
+            jp2.truncate(self.tfile3.name, reduce=4)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestReindex(unittest.TestCase):
+    """
+    Writing TLM and PLT segments for codestreams that lack them.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def setUp(self):
+        self.tfile1 = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.tfile2 = tempfile.NamedTemporaryFile(suffix='.j2k')
+
+    def tearDown(self):
+        self.tfile1.close()
+        self.tfile2.close()
+
+    def _verify(self, jp2, j):
+        codestream = j.get_codestream(header_only=False)
+        ids = [seg.marker_id for seg in codestream.segment]
+        self.assertIn('TLM', ids)
+        self.assertIn('PLT', ids)
+
+        params = _packets.CodingParameters(codestream)
+        for tile in range(params.num_tiles[0] * params.num_tiles[1]):
+            index = _packets.packet_index(codestream, tile, params=params)
+            self.assertEqual(len(index), len(params.packets(tile)))
+        np.testing.assert_array_equal(j[:], jp2[:])
+
+    def test_j2k(self):
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             psizes=[(64, 64)], cbsize=(16, 16), numres=4,
+             cratios=[40, 10, 1], prog='RPCL')
+        jp2 = Jp2k(self.tfile1.name)
+        j = glymur.reindex(self.tfile1.name, self.tfile2.name)
+        self._verify(jp2, j)
+
+    def test_jp2(self):
+        """
+        A JP2 file keeps its boxes.
+        """
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile1, \
+                tempfile.NamedTemporaryFile(suffix='.jp2') as tfile2:
+            Jp2k(tfile1.name, data=self.data, tilesize=(256, 256))
+            jp2 = Jp2k(tfile1.name)
+            j = jp2.reindex(tfile2.name)
+            self.assertEqual([box.box_id for box in j.box],
+                             [box.box_id for box in jp2.box])
+            self._verify(jp2, j)
+
+    def test_idempotent(self):
+        """
+        Existing index segments are replaced rather than duplicated.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256))
+        j = glymur.reindex(self.tfile1.name, self.tfile2.name)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            j2 = glymur.reindex(self.tfile2.name, tfile.name)
+            self.assertEqual(j2.length, j.length)
+
+    def test_command_line(self):
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256))
+        with patch('sys.argv', ['', self.tfile1.name, self.tfile2.name]):
+            command_line.reindex()
+        self._verify(Jp2k(self.tfile1.name), Jp2k(self.tfile2.name))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestReorder(unittest.TestCase):
+    """
+    Changing the progression order without decoding.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def setUp(self):
+        self.tfile1 = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.tfile2 = tempfile.NamedTemporaryFile(suffix='.j2k')
+
+    def tearDown(self):
+        self.tfile1.close()
+        self.tfile2.close()
+
+    def test_orders(self):
+        """
+        Every order gives the same image, at every resolution and layer.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             psizes=[(64, 64)], cbsize=(16, 16), numres=4,
+             cratios=[40, 10, 1], prog='LRCP', sop=True)
+        jp2 = Jp2k(self.tfile1.name)
+        for prog in ['RLCP', 'RPCL', 'PCRL', 'CPRL', 'LRCP']:
+            j = jp2.reorder(self.tfile2.name, prog)
+
+            codestream = j.get_codestream(header_only=False)
+            cod = codestream.segment[2]
+            self.assertEqual(cod.prog_order,
+                             glymur.core.PROGRESSION_ORDER[prog])
+            self.assertEqual(j.length, jp2.length)
+
+            np.testing.assert_array_equal(j[:], jp2[:])
+            np.testing.assert_array_equal(j.read(rlevel=2, layer=1),
+                                          jp2.read(rlevel=2, layer=1))
+
+    def test_resolution_progressive(self):
+        """
+        After reordering to RPCL, the packets of each tile are found in
+        order of resolution.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             cratios=[20, 5], prog='LRCP')
+        j = Jp2k(self.tfile1.name).reorder(self.tfile2.name, 'RPCL')
+
+        codestream = j.get_codestream(header_only=False)
+        params = _packets.CodingParameters(codestream)
+        with open(self.tfile2.name, 'rb') as f:
+            parts = _packets.scan_packet_lengths(codestream, f,
+                                                 params=params)
+        for tile in range(params.num_tiles[0] * params.num_tiles[1]):
+            index = _packets.packet_index(codestream, tile, params=params,
+                                          parts=parts)
+            self.assertTrue((np.diff(index['resolution']) >= 0).all())
+            self.assertTrue((np.diff(index['offset']) > 0).all())
+
+    def test_in_place(self):
+        """
+        A file can be rewritten onto itself.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+             cratios=[20, 5], prog='LRCP')
+        jp2 = Jp2k(self.tfile1.name)
+        expected = jp2[:]
+
+        j = jp2.reorder(self.tfile1.name, 'RPCL')
+        self.assertEqual(j.codestream.segment[2].prog_order,
+                         glymur.core.PROGRESSION_ORDER['RPCL'])
+        np.testing.assert_array_equal(j[:], expected)
+
+        j = j.reindex(self.tfile1.name)
+        np.testing.assert_array_equal(j[:], expected)
+
+        j = j.truncate(self.tfile1.name, max_layers=1)
+        self.assertEqual(j.codestream.segment[2].layers, 1)
+        self.assertEqual(j.shape, expected.shape)
+
+    def test_restated_coding_style(self):
+        """
+        Tile-part COC segments that repeat the main header are allowed.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            j = jp2.reorder(tfile.name, 'rpcl')
+            self.assertEqual([box.box_id for box in j.box],
+                             [box.box_id for box in jp2.box])
+            np.testing.assert_array_equal(j.read(rlevel=1),
+                                          jp2.read(rlevel=1))
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+@unittest.skipIf(sys.hexversion < 0x03020000, "Requires Python 3.2")
+class TestParallelEncoding(unittest.TestCase):
+    """
+    Tiles encoded separately and stitched into a single codestream.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.data = Jp2k(glymur.data.goodstuff())[:]
+
+    def setUp(self):
+        self.tfile1 = tempfile.NamedTemporaryFile(suffix='.j2k')
+        self.tfile2 = tempfile.NamedTemporaryFile(suffix='.j2k')
+
+    def tearDown(self):
+        self.tfile1.close()
+        self.tfile2.close()
+
+    def _compare(self, **kwargs):
+        """
+        The stitched codestream is the same as the one encoded at once.
+        """
+        Jp2k(self.tfile1.name, data=self.data, tilesize=(128, 128),
+             **kwargs)
+        Jp2k(self.tfile2.name, data=self.data, tilesize=(128, 128),
+             workers=3, **kwargs)
+        with open(self.tfile1.name, 'rb') as f1, \
+                open(self.tfile2.name, 'rb') as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_lossless(self):
+        self._compare()
+
+    def test_coding_options(self):
+        self._compare(psizes=[(64, 64)], cbsize=(16, 16), numres=4,
+                      prog='RPCL', sop=True, eph=True)
+
+    def test_grid_offset(self):
+        self._compare(grid_offset=(50, 70), irreversible=True)
+
+    def test_subsampling(self):
+        self._compare(subsam=(2, 2))
+
+    def test_layers(self):
+        """
+        Rates are allocated tile by tile either way, but the main header is
+        accounted for differently, so just the images are compared.
+        """
+        j1 = Jp2k(self.tfile1.name, data=self.data, tilesize=(128, 128),
+                  cratios=[40, 10, 1])
+        j2 = Jp2k(self.tfile2.name, data=self.data, tilesize=(128, 128),
+                  cratios=[40, 10, 1], workers=2)
+        self.assertEqual(j2.get_codestream().segment[2].layers, 3)
+        self.assertAlmostEqual(j2.length / j1.length, 1, places=2)
+
+        expected = np.abs(j1[:].astype(np.int32) - self.data).max()
+        actual = np.abs(j2[:].astype(np.int32) - self.data).max()
+        self.assertEqual(actual, expected)
+
+    def test_tlm(self):
+        j = Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+                 workers=2, tlm=True)
+        codestream = j.get_codestream(header_only=False)
+        parts = _packets.tile_parts(codestream)
+        tlm = [seg for seg in codestream.segment if seg.marker_id == 'TLM']
+        self.assertEqual(list(tlm[0].ttlm), list(range(8)))
+        self.assertEqual(list(tlm[0].ptlm),
+                         [tp.end - tp.offset for tp in parts])
+        np.testing.assert_array_equal(j[:], self.data)
+
+    def test_jp2(self):
+        data = self.data[:, :, 0]
+        with tempfile.NamedTemporaryFile(suffix='.jp2') as tfile:
+            j = Jp2k(tfile.name, data=data, tilesize=(256, 256), workers=2)
+            self.assertEqual([box.box_id for box in j.box],
+                             ['jP  ', 'ftyp', 'jp2h', 'jp2c'])
+            ihdr, colr = j.box[2].box
+            self.assertEqual((ihdr.height, ihdr.width), (800, 480))
+            self.assertEqual(colr.colorspace, glymur.core.GREYSCALE)
+            np.testing.assert_array_equal(j[:], data)
+
+    def test_without_tiles(self):
+        with self.assertRaises(IOError):
+            Jp2k(self.tfile1.name, data=self.data, workers=2)
+
+    def test_python2(self):
+        with patch.object(sys, 'hexversion', 0x02070000):
+            with self.assertRaises(IOError):
+                Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+                     workers=2)
+
+    def test_tlm_without_workers(self):
+        with self.assertRaises(IOError):
+            Jp2k(self.tfile1.name, data=self.data, tilesize=(256, 256),
+                 tlm=True)
@@ -0,0 +1,147 @@
+"""
+Tests for lazily indexed views and the array protocol of Jp2k objects.
+"""
+# Standard library imports ...
+import doctest
+import sys
+import tempfile
+import unittest
+if sys.hexversion >= 0x03030000:
+    from unittest.mock import patch
+else:
+    from mock import patch
+
+# Third party library imports ...
+import numpy as np
+
+# Local imports ...
+import glymur
+from glymur import Jp2k
+from .fixtures import OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG
+from .fixtures import WINDOWS_TMP_FILE_MSG
+
+
+def load_tests(loader, tests, ignore):
+    """Run doc tests as well."""
+    if not OPENJPEG_NOT_AVAILABLE:
+        tests.addTests(doctest.DocTestSuite('glymur._view'))
+    return tests
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+class TestArray(unittest.TestCase):
+    """
+    Array attributes known without decoding.
+    """
+    def test_rgb(self):
+        jp2 = Jp2k(glymur.data.nemo())
+        with patch.object(Jp2k, '_read') as mock_read:
+            self.assertEqual(jp2.dtype, np.uint8)
+            self.assertEqual(jp2.ndim, 3)
+            self.assertEqual(jp2.size, 1456 * 2592 * 3)
+            self.assertEqual(jp2.nbytes, 1456 * 2592 * 3)
+        self.assertEqual(mock_read.call_count, 0)
+
+        image = np.asarray(jp2)
+        self.assertEqual(image.shape, jp2.shape)
+        self.assertEqual(image.dtype, jp2.dtype)
+        np.testing.assert_array_equal(image, jp2[:])
+
+    def test_precision(self):
+        data = np.zeros((256, 128), dtype=np.uint16)
+        with tempfile.NamedTemporaryFile(suffix='.j2k') as tfile:
+            Jp2k(tfile.name, data=data)
+            jp2 = Jp2k(tfile.name)
+            self.assertEqual(jp2.dtype, np.uint16)
+            self.assertEqual(jp2.ndim, 2)
+            self.assertEqual(jp2.nbytes, 256 * 128 * 2)
+            self.assertEqual(np.asarray(jp2, dtype=np.float64).dtype,
+                             np.float64)
+
+        jp2 = Jp2k(glymur.data.nemo())
+        jp2.codestream.segment[1].signed = (True, True, True)
+        self.assertEqual(jp2.dtype, np.int8)
+
+    def test_copy(self):
+        """
+        Decoding always makes a new array, as with NumPy 2's copy keyword.
+        """
+        jp2 = Jp2k(glymur.data.nemo())
+        for obj in [jp2, jp2.lazy[::2, ::2][:100]]:
+            first = obj.__array__(copy=True)
+            second = obj.__array__(copy=None)
+            self.assertTrue(first.flags.writeable)
+            self.assertFalse(np.shares_memory(first, second))
+            with self.assertRaises(ValueError):
+                obj.__array__(copy=False)
+            self.assertEqual(obj.__array__(np.float32, copy=True).dtype,
+                             np.float32)
+
+    def test_palette(self):
+        """
+        Palette indices are expanded into the datatype of the palette.
+        """
+        jp2 = Jp2k(glymur.data.jpxfile())
+        self.assertEqual(jp2.dtype, jp2.find('jp2h/pclr').palette.dtype)
+        self.assertEqual(np.asarray(jp2).dtype, jp2.dtype)
+
+
+@unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
+@unittest.skipIf(glymur.version.openjpeg_version_tuple[0] < 2,
+                 "Requires as least v2.0")
+@unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
+class TestLazy(unittest.TestCase):
+    """
+    Indices composed before decoding.
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.jp2 = Jp2k(glymur.data.nemo())
+
+    def test_single_decode(self):
+        """
+        Only the final area is decoded, at the lowest resolution possible.
+        """
+        view = self.jp2.lazy[::2, ::2][100:200, 300:500]
+        self.assertEqual(view.shape, (100, 200, 3))
+        with patch.object(Jp2k, '_read', wraps=self.jp2._read) as mock_read:
+            image = np.asarray(view)
+        self.assertEqual(mock_read.call_count, 1)
+        self.assertEqual(mock_read.call_args[1],
+                         {'area': (200, 600, 400, 1000), 'rlevel': 1})
+        np.testing.assert_array_equal(image,
+                                      self.jp2[::2, ::2][100:200, 300:500])
+
+    def test_compose(self):
+        view = self.jp2.lazy[10:, :, 1:][:, 5:-5, 0][::2, ::2]
+        self.assertEqual(view.shape, (723, 1291))
+        np.testing.assert_array_equal(view[:],
+                                      self.jp2[10::2, 5:2587:2, 1])
+
+        view = self.jp2.lazy[..., [2, 0]][7:20]
+        self.assertEqual(view.shape, (13, 2592, 2))
+        np.testing.assert_array_equal(np.asarray(view),
+                                      self.jp2[7:20, :, [2, 0]])
+
+    def test_integer_index(self):
+        """
+        Integer rows and columns are picked out of the decoded data.
+        """
+        image = self.jp2.lazy[::2, ::2][3]
+        self.assertIsInstance(image, np.ndarray)
+        np.testing.assert_array_equal(image, self.jp2[::2, ::2][3])
+
+    def test_empty(self):
+        view = self.jp2.lazy[100:200][50:10]
+        self.assertEqual(view.shape, (0, 2592, 3))
+        self.assertEqual(np.asarray(view).shape, (0, 2592, 3))
+
+    def test_bad_strides(self):
+        with self.assertRaises(IndexError):
+            self.jp2.lazy[::2]
+        with self.assertRaises(IndexError):
+            self.jp2.lazy[::3, ::3]
+        with self.assertRaises(IndexError):
+            self.jp2.lazy[:, :, 0, 0]
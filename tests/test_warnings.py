@@ -88,16 +88,18 @@ class TestSuite(unittest.TestCase):
         fptr.write(payload)
         fptr.seek(0)
 
+        # The XML is not parsed until accessed.
+        box = glymur.jp2box.XMLBox.parse(fptr, 0, 8 + len(payload))
         if sys.hexversion < 0x03000000:
             pass
             with warnings.catch_warnings(record=True) as w:
-                box = glymur.jp2box.XMLBox.parse(fptr, 0, 8 + len(payload))
+                xml = box.xml
             assert issubclass(w[-1].category, UserWarning)
         else:
             with self.assertWarns(UserWarning):
-                box = glymur.jp2box.XMLBox.parse(fptr, 0, 8 + len(payload))
+                xml = box.xml
 
-        self.assertIsNone(box.xml)
+        self.assertIsNone(xml)
 
     @unittest.skipIf(os.name == "nt", "Temporary file issue on window.")
     def test_unknown_marker_segment(self):
@@ -611,8 +613,9 @@ class TestSuite(unittest.TestCase):
                 tfile.write(write_buffer)
                 tfile.flush()
 
+            jp2 = Jp2k(bad_xml_file)
             with self.assertWarns(UserWarning):
-                Jp2k(bad_xml_file)
+                jp2.box[3].xml
 
     def test_deurl_child_of_dtbl(self):
         """
@@ -691,8 +694,10 @@ class TestSuite(unittest.TestCase):
             tfile.write(struct.pack('<HHI4s', 171, 2, 3, b'HTC\x00'))
             tfile.flush()
 
+            # The Exif payload is not interpreted until accessed.
+            jp2 = glymur.Jp2k(tfile.name)
             with self.assertWarns(UserWarning):
-                glymur.Jp2k(tfile.name)
+                jp2.box[-1].data
 
     @unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
     def test_bad_tag_datatype(self):
@@ -717,8 +722,10 @@ class TestSuite(unittest.TestCase):
             tfile.write(struct.pack('<HHI4s', 271, 2000, 3, b'HTC\x00'))
             tfile.flush()
 
+            # The Exif payload is not interpreted until accessed.
+            jp2 = glymur.Jp2k(tfile.name)
             with self.assertWarns(UserWarning):
-                glymur.Jp2k(tfile.name)
+                jp2.box[-1].data
 
     @unittest.skipIf(sys.platform == 'win32', WINDOWS_TMP_FILE_MSG)
     def test_bad_tiff_header_byte_order_indication(self):
@@ -743,8 +750,10 @@ class TestSuite(unittest.TestCase):
             tfile.write(struct.pack('<HHI4s', 271, 2, 3, b'HTC\x00'))
             tfile.flush()
 
+            # The Exif payload is not interpreted until accessed.
+            jp2 = glymur.Jp2k(tfile.name)
             with self.assertWarns(UserWarning):
-                glymur.Jp2k(tfile.name)
+                jp2.box[-1].data
 
     @unittest.skipIf(OPENJPEG_NOT_AVAILABLE, OPENJPEG_NOT_AVAILABLE_MSG)
     def test_warn_if_using_read_method(self):